@@ -24,8 +24,13 @@
  * SOFTWARE.
  */
 
+#define PY_SSIZE_T_CLEAN
+
 #include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
 #include "Python.h"
+#include "structmember.h"
 #include "portaudio.h"
 #include "_portaudiomodule.h"
 
@@ -36,6 +41,28 @@
 #define DEFAULT_FRAMES_PER_BUFFER 1024
 /* #define VERBOSE */
 
+/* Acquire/release accessors for the ring buffer positions, which are
+   shared between PortAudio's callback thread and Python without a
+   lock. */
+#if defined(_MSC_VER)
+#include <windows.h>
+static size_t _ring_load_acquire(volatile size_t *ptr) {
+  size_t value = *ptr;
+  MemoryBarrier();
+  return value;
+}
+static void _ring_store_release(volatile size_t *ptr, size_t value) {
+  MemoryBarrier();
+  *ptr = value;
+}
+#define RING_LOAD_ACQUIRE(ptr) _ring_load_acquire(ptr)
+#define RING_STORE_RELEASE(ptr, value) _ring_store_release(ptr, value)
+#else
+#define RING_LOAD_ACQUIRE(ptr) __atomic_load_n(ptr, __ATOMIC_ACQUIRE)
+#define RING_STORE_RELEASE(ptr, value) \
+  __atomic_store_n(ptr, value, __ATOMIC_RELEASE)
+#endif
+
 #define min(a, b)           \
   ({                        \
     __typeof__(a) _a = (a); \
@@ -51,6 +78,7 @@
  * II. Python Object Wrappers
  *     - PaDeviceInfo
  *     - PaHostInfo
+ *     - CallbackBuffer / CallbackTimeInfo
  *     - PaStream
  * III. PortAudio Method Implementations
  *     - Initialization/Termination
@@ -109,6 +137,8 @@ static PyMethodDef paMethods[] = {
 
     {"get_device_info", pa_get_device_info, METH_VARARGS,
      "get device information"},
+    {"get_device_snapshot", pa_get_device_snapshot, METH_VARARGS,
+     "get all host api and device information in one call"},
 
     /* stream open/close */
     {"open", (PyCFunction)pa_open, METH_VARARGS | METH_KEYWORDS,
@@ -136,6 +166,12 @@ static PyMethodDef paMethods[] = {
     /* stream read/write */
     {"write_stream", pa_write_stream, METH_VARARGS, "write to stream"},
     {"read_stream", pa_read_stream, METH_VARARGS, "read from stream"},
+    {"read_stream_into", pa_read_stream_into, METH_VARARGS,
+     "read from stream into a writable buffer"},
+    {"drain_stream", pa_drain_stream, METH_VARARGS,
+     "copy buffered frames out of a ring buffer stream"},
+    {"get_stream_ring_stats", pa_get_stream_ring_stats, METH_VARARGS,
+     "get ring buffer stream statistics"},
 
     {"get_stream_write_available", pa_get_stream_write_available, METH_VARARGS,
      "get buffer available for writing"},
@@ -741,6 +777,184 @@ static PyTypeObject _pyAudio_MacOSX_hostApiSpecificStreamInfoType = {
 };
 #endif
 
+/*************************************************************
+ * Callback Buffer : reusable buffer-protocol view of the
+ * PortAudio input/output buffers, for fast callback mode
+ *************************************************************/
+
+typedef struct {
+  // clang-format off
+  PyObject_HEAD
+  // clang-format on
+  char *buf;
+  Py_ssize_t len;
+  int readonly;
+  Py_ssize_t exports;
+} _pyAudio_CallbackBuffer;
+
+static int _pyAudio_CallbackBuffer_getbuffer(_pyAudio_CallbackBuffer *self,
+                                             Py_buffer *view, int flags) {
+  if (self->buf == NULL) {
+    PyErr_SetString(PyExc_BufferError,
+                    "Callback buffer is only valid inside the stream "
+                    "callback");
+    view->obj = NULL;
+    return -1;
+  }
+
+  if (PyBuffer_FillInfo(view, (PyObject *)self, self->buf, self->len,
+                        self->readonly, flags) < 0) {
+    return -1;
+  }
+
+  self->exports++;
+  return 0;
+}
+
+static void _pyAudio_CallbackBuffer_releasebuffer(
+    _pyAudio_CallbackBuffer *self, Py_buffer *view) {
+  self->exports--;
+}
+
+static Py_ssize_t _pyAudio_CallbackBuffer_length(
+    _pyAudio_CallbackBuffer *self) {
+  return self->len;
+}
+
+static void _pyAudio_CallbackBuffer_dealloc(_pyAudio_CallbackBuffer *self) {
+  self->buf = NULL;
+  Py_TYPE(self)->tp_free((PyObject *)self);
+}
+
+static PyBufferProcs _pyAudio_CallbackBuffer_as_buffer = {
+    (getbufferproc)_pyAudio_CallbackBuffer_getbuffer,
+    (releasebufferproc)_pyAudio_CallbackBuffer_releasebuffer,
+};
+
+static PySequenceMethods _pyAudio_CallbackBuffer_as_sequence = {
+    (lenfunc)_pyAudio_CallbackBuffer_length, /* sq_length */
+};
+
+static PyTypeObject _pyAudio_CallbackBufferType = {
+    // clang-format off
+  PyVarObject_HEAD_INIT(NULL, 0)
+    // clang-format on
+    "_portaudio.CallbackBuffer",                 /*tp_name*/
+    sizeof(_pyAudio_CallbackBuffer),             /*tp_basicsize*/
+    0,                                           /*tp_itemsize*/
+    (destructor)_pyAudio_CallbackBuffer_dealloc, /*tp_dealloc*/
+    0,                                           /*tp_print*/
+    0,                                           /*tp_getattr*/
+    0,                                           /*tp_setattr*/
+    0,                                           /*tp_compare*/
+    0,                                           /*tp_repr*/
+    0,                                           /*tp_as_number*/
+    &_pyAudio_CallbackBuffer_as_sequence,        /*tp_as_sequence*/
+    0,                                           /*tp_as_mapping*/
+    0,                                           /*tp_hash */
+    0,                                           /*tp_call*/
+    0,                                           /*tp_str*/
+    0,                                           /*tp_getattro*/
+    0,                                           /*tp_setattro*/
+    &_pyAudio_CallbackBuffer_as_buffer,          /*tp_as_buffer*/
+    Py_TPFLAGS_DEFAULT,                          /*tp_flags*/
+    "Port Audio Callback Buffer",                /* tp_doc */
+};
+
+static _pyAudio_CallbackBuffer *_create_CallbackBuffer_object(int readonly) {
+  _pyAudio_CallbackBuffer *obj;
+
+  /* don't allow subclassing */
+  obj = (_pyAudio_CallbackBuffer *)PyObject_New(_pyAudio_CallbackBuffer,
+                                                &_pyAudio_CallbackBufferType);
+  if (obj) {
+    obj->buf = NULL;
+    obj->len = 0;
+    obj->readonly = readonly;
+    obj->exports = 0;
+  }
+  return obj;
+}
+
+/*************************************************************
+ * Callback Time Info : preallocated, updated in place for
+ * every fast-mode callback
+ *************************************************************/
+
+typedef struct {
+  // clang-format off
+  PyObject_HEAD
+  // clang-format on
+  double input_buffer_adc_time;
+  double current_time;
+  double output_buffer_dac_time;
+} _pyAudio_CallbackTimeInfo;
+
+static PyMemberDef _pyAudio_CallbackTimeInfo_members[] = {
+    {"input_buffer_adc_time", T_DOUBLE,
+     offsetof(_pyAudio_CallbackTimeInfo, input_buffer_adc_time), READONLY,
+     "input buffer ADC time"},
+    {"current_time", T_DOUBLE,
+     offsetof(_pyAudio_CallbackTimeInfo, current_time), READONLY,
+     "current time"},
+    {"output_buffer_dac_time", T_DOUBLE,
+     offsetof(_pyAudio_CallbackTimeInfo, output_buffer_dac_time), READONLY,
+     "output buffer DAC time"},
+    {NULL}};
+
+static void _pyAudio_CallbackTimeInfo_dealloc(
+    _pyAudio_CallbackTimeInfo *self) {
+  Py_TYPE(self)->tp_free((PyObject *)self);
+}
+
+static PyTypeObject _pyAudio_CallbackTimeInfoType = {
+    // clang-format off
+  PyVarObject_HEAD_INIT(NULL, 0)
+    // clang-format on
+    "_portaudio.CallbackTimeInfo",                 /*tp_name*/
+    sizeof(_pyAudio_CallbackTimeInfo),             /*tp_basicsize*/
+    0,                                             /*tp_itemsize*/
+    (destructor)_pyAudio_CallbackTimeInfo_dealloc, /*tp_dealloc*/
+    0,                                             /*tp_print*/
+    0,                                             /*tp_getattr*/
+    0,                                             /*tp_setattr*/
+    0,                                             /*tp_compare*/
+    0,                                             /*tp_repr*/
+    0,                                             /*tp_as_number*/
+    0,                                             /*tp_as_sequence*/
+    0,                                             /*tp_as_mapping*/
+    0,                                             /*tp_hash */
+    0,                                             /*tp_call*/
+    0,                                             /*tp_str*/
+    0,                                             /*tp_getattro*/
+    0,                                             /*tp_setattro*/
+    0,                                             /*tp_as_buffer*/
+    Py_TPFLAGS_DEFAULT,                            /*tp_flags*/
+    "Port Audio Callback Time Info",               /* tp_doc */
+    0,                                             /* tp_traverse */
+    0,                                             /* tp_clear */
+    0,                                             /* tp_richcompare */
+    0,                                             /* tp_weaklistoffset */
+    0,                                             /* tp_iter */
+    0,                                             /* tp_iternext */
+    0,                                             /* tp_methods */
+    _pyAudio_CallbackTimeInfo_members,             /* tp_members */
+};
+
+static _pyAudio_CallbackTimeInfo *_create_CallbackTimeInfo_object(void) {
+  _pyAudio_CallbackTimeInfo *obj;
+
+  /* don't allow subclassing */
+  obj = (_pyAudio_CallbackTimeInfo *)PyObject_New(
+      _pyAudio_CallbackTimeInfo, &_pyAudio_CallbackTimeInfoType);
+  if (obj) {
+    obj->input_buffer_adc_time = 0;
+    obj->current_time = 0;
+    obj->output_buffer_dac_time = 0;
+  }
+  return obj;
+}
+
 /*************************************************************
  * Stream Wrapper Python Object
  *************************************************************/
@@ -749,8 +963,30 @@ typedef struct {
   PyObject *callback;
   long main_thread_id;
   unsigned int frame_size;
+  /* fast callback mode only; NULL otherwise */
+  _pyAudio_CallbackBuffer *in_buffer;
+  _pyAudio_CallbackBuffer *out_buffer;
+  _pyAudio_CallbackTimeInfo *time_info;
+  PyObject *py_frame_count;
+  unsigned long frame_count;
 } PyAudioCallbackContext;
 
+/* Single-producer (PortAudio callback) / single-consumer (Python)
+   ring of input frames. Positions are free-running byte counters;
+   only the producer writes write_pos and the counters, only the
+   consumer writes read_pos. */
+typedef struct {
+  char *data;
+  size_t capacity;
+  unsigned int frame_size;
+  volatile size_t write_pos;
+  volatile size_t read_pos;
+  volatile size_t overruns;
+  volatile size_t overrun_frames;
+  volatile size_t input_overflows;
+  volatile size_t total_frames;
+} PyAudioRingBuffer;
+
 typedef struct {
   // clang-format off
   PyObject_HEAD
@@ -760,6 +996,7 @@ typedef struct {
   PaStreamParameters *outputParameters;
   PaStreamInfo *streamInfo;
   PyAudioCallbackContext *callbackContext;
+  PyAudioRingBuffer *ringBuffer;
   int is_open;
 } _pyAudio_Stream;
 
@@ -789,10 +1026,21 @@ static void _cleanup_Stream_object(_pyAudio_Stream *streamObject) {
 
   if (streamObject->callbackContext != NULL) {
     Py_XDECREF(streamObject->callbackContext->callback);
+    Py_XDECREF(streamObject->callbackContext->in_buffer);
+    Py_XDECREF(streamObject->callbackContext->out_buffer);
+    Py_XDECREF(streamObject->callbackContext->time_info);
+    Py_XDECREF(streamObject->callbackContext->py_frame_count);
     free(streamObject->callbackContext);
     streamObject->callbackContext = NULL;
   }
 
+  /* the stream is closed, so the callback no longer touches the ring */
+  if (streamObject->ringBuffer != NULL) {
+    free(streamObject->ringBuffer->data);
+    free(streamObject->ringBuffer);
+    streamObject->ringBuffer = NULL;
+  }
+
   streamObject->is_open = 0;
 }
 
@@ -940,6 +1188,9 @@ static _pyAudio_Stream *_create_Stream_object(void) {
 
   /* don't allow subclassing */
   obj = (_pyAudio_Stream *)PyObject_New(_pyAudio_Stream, &_pyAudio_StreamType);
+  if (obj) {
+    obj->ringBuffer = NULL;
+  }
   return obj;
 }
 
@@ -1240,6 +1491,112 @@ static PyObject *pa_get_device_info(PyObject *self, PyObject *args) {
   return (PyObject *)py_info;
 }
 
+/* Decode a device name the same way PyAudio._make_device_info_dictionary
+   does: UTF-8, then cp1252, else leave it as bytes. */
+static PyObject *_decode_device_name(const char *name) {
+  PyObject *py_name;
+  Py_ssize_t len = (Py_ssize_t)strlen(name);
+
+  py_name = PyUnicode_DecodeUTF8(name, len, "strict");
+  if (py_name == NULL) {
+    PyErr_Clear();
+    py_name = PyUnicode_Decode(name, len, "cp1252", "strict");
+  }
+  if (py_name == NULL) {
+    PyErr_Clear();
+    py_name = PyBytes_FromStringAndSize(name, len);
+  }
+  return py_name;
+}
+
+static PyObject *pa_get_device_snapshot(PyObject *self, PyObject *args) {
+  PaHostApiIndex api_count, api_index;
+  PaDeviceIndex device_count, device_index;
+  const PaHostApiInfo *api_info;
+  const PaDeviceInfo *dev_info;
+  PyObject *host_apis = NULL;
+  PyObject *devices = NULL;
+  PyObject *entry, *py_name;
+
+  if (!PyArg_ParseTuple(args, "")) {
+    return NULL;
+  }
+
+  api_count = Pa_GetHostApiCount();
+  device_count = Pa_GetDeviceCount();
+  if (api_count < 0 || device_count < 0) {
+    PaError err = (api_count < 0) ? api_count : device_count;
+    PyErr_SetObject(PyExc_IOError,
+                    Py_BuildValue("(i,s)", err, Pa_GetErrorText(err)));
+    return NULL;
+  }
+
+  host_apis = PyTuple_New(api_count);
+  devices = PyTuple_New(device_count);
+  if (!host_apis || !devices) {
+    goto error;
+  }
+
+  for (api_index = 0; api_index < api_count; api_index++) {
+    api_info = Pa_GetHostApiInfo(api_index);
+    if (!api_info) {
+      PyErr_SetObject(PyExc_IOError, Py_BuildValue("(i,s)", paInvalidHostApi,
+                                                   "Invalid host api info"));
+      goto error;
+    }
+
+    entry = Py_BuildValue(
+        "{s:i,s:i,s:i,s:s,s:i,s:i,s:i}", "index", api_index, "structVersion",
+        api_info->structVersion, "type", api_info->type, "name",
+        api_info->name, "deviceCount", api_info->deviceCount,
+        "defaultInputDevice", api_info->defaultInputDevice,
+        "defaultOutputDevice", api_info->defaultOutputDevice);
+    if (!entry) {
+      goto error;
+    }
+    PyTuple_SET_ITEM(host_apis, api_index, entry);
+  }
+
+  for (device_index = 0; device_index < device_count; device_index++) {
+    dev_info = Pa_GetDeviceInfo(device_index);
+    if (!dev_info) {
+      PyErr_SetObject(PyExc_IOError, Py_BuildValue("(i,s)", paInvalidDevice,
+                                                   "Invalid device info"));
+      goto error;
+    }
+
+    py_name = _decode_device_name(dev_info->name);
+    if (!py_name) {
+      goto error;
+    }
+
+    entry = Py_BuildValue(
+        "{s:i,s:i,s:N,s:i,s:i,s:i,s:d,s:d,s:d,s:d,s:d}", "index",
+        device_index, "structVersion", dev_info->structVersion, "name",
+        py_name, "hostApi", dev_info->hostApi, "maxInputChannels",
+        dev_info->maxInputChannels, "maxOutputChannels",
+        dev_info->maxOutputChannels, "defaultLowInputLatency",
+        dev_info->defaultLowInputLatency, "defaultLowOutputLatency",
+        dev_info->defaultLowOutputLatency, "defaultHighInputLatency",
+        dev_info->defaultHighInputLatency, "defaultHighOutputLatency",
+        dev_info->defaultHighOutputLatency, "defaultSampleRate",
+        dev_info->defaultSampleRate);
+    if (!entry) {
+      goto error;
+    }
+    PyTuple_SET_ITEM(devices, device_index, entry);
+  }
+
+  return Py_BuildValue("(NNiii)", host_apis, devices, Pa_GetDefaultHostApi(),
+                       Pa_GetDefaultInputDevice(),
+                       Pa_GetDefaultOutputDevice());
+
+error:
+  Py_XDECREF(host_apis);
+  Py_XDECREF(devices);
+  return NULL;
+}
+
 /*************************************************************
  * Stream Open / Close / Supported
  *************************************************************/
@@ -1291,7 +1648,7 @@ int _stream_callback_cfunction(const void *input, void *output,
   PyObject *py_status_flags = PyLong_FromUnsignedLong(statusFlags);
   PyObject *py_input_data = Py_None;
   const char *pData;
-  unsigned output_len;
+  Py_ssize_t output_len;
   PyObject *py_result;
 
   if (input) {
@@ -1364,10 +1721,11 @@ int _stream_callback_cfunction(const void *input, void *output,
   // Copy bytes for playback only if this is an output stream:
   if (output) {
     char *output_data = (char *)output;
-    memcpy(output_data, pData, min(output_len, bytes_per_frame * frameCount));
+    memcpy(output_data, pData,
+           min((size_t)output_len, (size_t)bytes_per_frame * frameCount));
     // Pad out the rest of the buffer with 0s if callback returned
     // too few frames (and assume paComplete).
-    if (output_len < (frameCount * bytes_per_frame)) {
+    if ((size_t)output_len < (frameCount * bytes_per_frame)) {
       memset(output_data + output_len, 0,
              (frameCount * bytes_per_frame) - output_len);
       return_val = paComplete;
@@ -1390,9 +1748,210 @@ end:
   return return_val;
 }
 
+/* Release a memoryview handed to a fast callback. Returns -1 (with no
+   error set) if the callback still holds a view derived from it. */
+static int _release_callback_view(PyObject *view) {
+  PyObject *result;
+
+  if (view == NULL) {
+    return 0;
+  }
+
+  result = PyObject_CallMethod(view, "release", NULL);
+  if (result == NULL) {
+    PyErr_Clear();
+    return -1;
+  }
+  Py_DECREF(result);
+  return 0;
+}
+
+/* Fast callback mode: no per-call bytes, dict or output copy. The
+   callback gets memoryviews of reusable buffer objects that point
+   straight at PortAudio's buffers for the duration of the call, plus a
+   preallocated time info object, and returns only a
+   PaStreamCallbackResult. The views are released when the callback
+   returns, so using them afterwards raises ValueError. */
+int _stream_fast_callback_cfunction(const void *input, void *output,
+                                    unsigned long frameCount,
+                                    const PaStreamCallbackTimeInfo *timeInfo,
+                                    PaStreamCallbackFlags statusFlags,
+                                    void *userData) {
+  int return_val = paAbort;
+  PyGILState_STATE _state = PyGILState_Ensure();
+
+  PyAudioCallbackContext *context = (PyAudioCallbackContext *)userData;
+  unsigned int bytes_per_frame = context->frame_size;
+  long main_thread_id = context->main_thread_id;
+  _pyAudio_CallbackBuffer *in_buffer = context->in_buffer;
+  _pyAudio_CallbackBuffer *out_buffer = context->out_buffer;
+  PyObject *py_input = NULL;
+  PyObject *py_output = NULL;
+  PyObject *py_status_flags;
+  PyObject *py_result = NULL;
+  PyObject *err_type, *err_value, *err_traceback;
+  int views_released;
+  long result;
+
+  /* frame count is normally constant: only rebuild it when it changes */
+  if (context->py_frame_count == NULL || context->frame_count != frameCount) {
+    Py_XDECREF(context->py_frame_count);
+    context->py_frame_count = PyLong_FromUnsignedLong(frameCount);
+    context->frame_count = frameCount;
+  }
+
+  context->time_info->input_buffer_adc_time = timeInfo->inputBufferAdcTime;
+  context->time_info->current_time = timeInfo->currentTime;
+  context->time_info->output_buffer_dac_time = timeInfo->outputBufferDacTime;
+
+  /* small ints are cached, so this does not allocate for 0 */
+  py_status_flags = PyLong_FromUnsignedLong(statusFlags);
+
+  if (input && in_buffer) {
+    in_buffer->buf = (char *)input;
+    in_buffer->len = (Py_ssize_t)bytes_per_frame * frameCount;
+    py_input = PyMemoryView_FromObject((PyObject *)in_buffer);
+  }
+
+  if (output && out_buffer) {
+    out_buffer->buf = (char *)output;
+    out_buffer->len = (Py_ssize_t)bytes_per_frame * frameCount;
+    py_output = PyMemoryView_FromObject((PyObject *)out_buffer);
+  }
+
+  if (context->py_frame_count && py_status_flags &&
+      (py_input || !input || !in_buffer) &&
+      (py_output || !output || !out_buffer)) {
+    py_result = PyObject_CallFunctionObjArgs(
+        context->callback, py_input ? py_input : Py_None,
+        py_output ? py_output : Py_None, context->py_frame_count,
+        (PyObject *)context->time_info, py_status_flags, NULL);
+  }
+
+  /* The PortAudio buffers are only valid during this call: release the
+     views (keeping any error raised by the callback) and detach the
+     buffer objects from PortAudio's memory */
+  PyErr_Fetch(&err_type, &err_value, &err_traceback);
+  views_released = _release_callback_view(py_input) == 0;
+  views_released = _release_callback_view(py_output) == 0 && views_released;
+  PyErr_Restore(err_type, err_value, err_traceback);
+  Py_XDECREF(py_input);
+  Py_XDECREF(py_output);
+
+  if (in_buffer) {
+    in_buffer->buf = NULL;
+    in_buffer->len = 0;
+  }
+  if (out_buffer) {
+    out_buffer->buf = NULL;
+    out_buffer->len = 0;
+  }
+
+  if (py_result == NULL) {
+#ifdef VERBOSE
+    fprintf(stderr, "An error occured while using the portaudio stream\n");
+    fprintf(stderr, "Error message: Could not call callback function\n");
+#endif
+    goto error;
+  }
+
+  if (!views_released || (in_buffer && in_buffer->exports) ||
+      (out_buffer && out_buffer->exports)) {
+    PyErr_SetString(PyExc_BufferError,
+                    "A view of a callback buffer outlived the callback; "
+                    "copy the data instead of keeping a reference");
+    goto error;
+  }
+
+  if (py_result == Py_None) {
+    return_val = paContinue;
+  } else {
+    result = PyLong_AsLong(py_result);
+    if (result == -1 && PyErr_Occurred()) {
+      goto error;
+    }
+    return_val = (int)result;
+  }
+
+  if ((return_val != paComplete) && (return_val != paAbort) &&
+      (return_val != paContinue)) {
+    PyErr_SetString(PyExc_ValueError,
+                    "Invalid PaStreamCallbackResult from callback");
+    goto error;
+  }
+
+  goto end;
+
+error:
+  if (PyErr_Occurred()) {
+    PyThreadState_SetAsyncExc(main_thread_id, PyErr_Occurred());
+    // Print out a stack trace to help debugging.
+    PyErr_Print();
+  }
+  return_val = paAbort;
+
+end:
+  Py_XDECREF(py_result);
+  Py_XDECREF(py_status_flags);
+
+  PyGILState_Release(_state);
+  return return_val;
+}
+
+/* Ring buffer mode: runs entirely without the GIL, so Python pauses
+   (GC, other threads) cannot stall PortAudio's real-time thread. Frames
+   that do not fit are dropped and counted as an overrun. */
+int _stream_ring_callback_cfunction(const void *input, void *output,
+                                    unsigned long frameCount,
+                                    const PaStreamCallbackTimeInfo *timeInfo,
+                                    PaStreamCallbackFlags statusFlags,
+                                    void *userData) {
+  PyAudioRingBuffer *ring = (PyAudioRingBuffer *)userData;
+  size_t write_pos = ring->write_pos;
+  size_t read_pos = RING_LOAD_ACQUIRE(&ring->read_pos);
+  size_t free_bytes = ring->capacity - (write_pos - read_pos);
+  size_t bytes = (size_t)frameCount * ring->frame_size;
+  size_t offset, first;
+
+  if (statusFlags & paInputOverflow) {
+    RING_STORE_RELEASE(&ring->input_overflows, ring->input_overflows + 1);
+  }
+
+  if (input == NULL) {
+    return paContinue;
+  }
+
+  if (bytes > free_bytes) {
+    /* keep whole frames only */
+    size_t kept = free_bytes - (free_bytes % ring->frame_size);
+    RING_STORE_RELEASE(&ring->overruns, ring->overruns + 1);
+    RING_STORE_RELEASE(&ring->overrun_frames,
+                       ring->overrun_frames +
+                           (bytes - kept) / ring->frame_size);
+    bytes = kept;
+  }
+
+  if (bytes > 0) {
+    offset = write_pos % ring->capacity;
+    first = ring->capacity - offset;
+    if (first > bytes) {
+      first = bytes;
+    }
+    memcpy(ring->data + offset, input, first);
+    memcpy(ring->data, (const char *)input + first, bytes - first);
+    RING_STORE_RELEASE(&ring->total_frames,
+                       ring->total_frames + bytes / ring->frame_size);
+    RING_STORE_RELEASE(&ring->write_pos, write_pos + bytes);
+  }
+
+  return paContinue;
+}
+
 static PyObject *pa_open(PyObject *self, PyObject *args, PyObject *kwargs) {
   int rate, channels;
   int input, output, frames_per_buffer;
+  int fast_callback = 0;
+  long ring_buffer_frames = 0;
   int input_device_index = -1;
   int output_device_index = -1;
   PyObject *input_device_index_arg = NULL;
@@ -1407,6 +1966,7 @@ static PyObject *pa_open(PyObject *self, PyObject *args, PyObject *kwargs) {
   PaStream *stream = NULL;
   PaStreamInfo *streamInfo = NULL;
   PyAudioCallbackContext *context = NULL;
+  PyAudioRingBuffer *ring = NULL;
   _pyAudio_Stream *streamObject;
 
   static char *kwlist[] = {"rate",
@@ -1420,6 +1980,8 @@ static PyObject *pa_open(PyObject *self, PyObject *args, PyObject *kwargs) {
                            "input_host_api_specific_stream_info",
                            "output_host_api_specific_stream_info",
                            "stream_callback",
+                           "fast_callback",
+                           "ring_buffer_frames",
                            NULL};
 
 #ifdef MACOSX
@@ -1440,9 +2002,9 @@ static PyObject *pa_open(PyObject *self, PyObject *args, PyObject *kwargs) {
   // clang-format off
   if (!PyArg_ParseTupleAndKeywords(args, kwargs,
 #ifdef MACOSX
-                                   "iik|iiOOiO!O!O",
+                                   "iik|iiOOiO!O!Oil",
 #else
-                                   "iik|iiOOiOOO",
+                                   "iik|iiOOiOOOil",
 #endif
                                    kwlist,
                                    &rate, &channels, &format,
@@ -1458,7 +2020,9 @@ static PyObject *pa_open(PyObject *self, PyObject *args, PyObject *kwargs) {
                                    &_pyAudio_MacOSX_hostApiSpecificStreamInfoType,
 #endif
                                    &outputHostSpecificStreamInfo,
-                                   &stream_callback)) {
+                                   &stream_callback,
+                                   &fast_callback,
+                                   &ring_buffer_frames)) {
 
     return NULL;
   }
@@ -1469,6 +2033,23 @@ static PyObject *pa_open(PyObject *self, PyObject *args, PyObject *kwargs) {
     return NULL;
   }
 
+  if (fast_callback && !stream_callback) {
+    PyErr_SetString(PyExc_ValueError, "fast_callback requires stream_callback");
+    return NULL;
+  }
+
+  if (ring_buffer_frames < 0) {
+    PyErr_SetString(PyExc_ValueError, "Invalid ring buffer size");
+    return NULL;
+  }
+
+  if (ring_buffer_frames && (stream_callback || !input || output)) {
+    PyErr_SetString(PyExc_ValueError,
+                    "ring_buffer_frames requires an input-only stream "
+                    "without stream_callback");
+    return NULL;
+  }
+
   if ((input_device_index_arg == NULL) || (input_device_index_arg == Py_None)) {
 #ifdef VERBOSE
     printf("Using default input device\n");
@@ -1598,6 +2179,51 @@ static PyObject *pa_open(PyObject *self, PyObject *args, PyObject *kwargs) {
     context->callback = (PyObject *)stream_callback;
     context->main_thread_id = PyThreadState_Get()->thread_id;
     context->frame_size = Pa_GetSampleSize(format) * channels;
+    context->in_buffer = NULL;
+    context->out_buffer = NULL;
+    context->time_info = NULL;
+    context->py_frame_count = NULL;
+    context->frame_count = 0;
+
+    if (fast_callback) {
+      context->time_info = _create_CallbackTimeInfo_object();
+      if (input) {
+        context->in_buffer = _create_CallbackBuffer_object(1);
+      }
+      if (output) {
+        context->out_buffer = _create_CallbackBuffer_object(0);
+      }
+
+      if (!context->time_info || (input && !context->in_buffer) ||
+          (output && !context->out_buffer)) {
+        Py_XDECREF(context->in_buffer);
+        Py_XDECREF(context->out_buffer);
+        Py_XDECREF(context->time_info);
+        Py_DECREF(stream_callback);
+        free(context);
+        free(inputParameters);
+        free(outputParameters);
+        return PyErr_NoMemory();
+      }
+    }
+  }
+
+  if (ring_buffer_frames) {
+    ring = (PyAudioRingBuffer *)calloc(1, sizeof(PyAudioRingBuffer));
+    if (ring) {
+      ring->frame_size = Pa_GetSampleSize(format) * channels;
+      ring->capacity = (size_t)ring_buffer_frames * ring->frame_size;
+      ring->data = (char *)malloc(ring->capacity);
+    }
+
+    if (!ring || !ring->data) {
+      if (ring) {
+        free(ring);
+      }
+      free(inputParameters);
+      free(outputParameters);
+      return PyErr_NoMemory();
+    }
   }
 
   // clang-format off
@@ -1614,9 +2240,13 @@ static PyObject *pa_open(PyObject *self, PyObject *args, PyObject *kwargs) {
                          so don't bother clipping them */
                       paClipOff,
                       /* callback, if specified */
-                      (stream_callback) ? (_stream_callback_cfunction) : (NULL),
+                      (stream_callback)
+                          ? ((fast_callback) ? (_stream_fast_callback_cfunction)
+                                             : (_stream_callback_cfunction))
+                          : ((ring) ? (_stream_ring_callback_cfunction)
+                                    : (NULL)),
                       /* callback userData, if applicable */
-                      context);
+                      (ring) ? ((void *)ring) : ((void *)context));
   Py_END_ALLOW_THREADS
   // clang-format on
 
@@ -1627,6 +2257,11 @@ static PyObject *pa_open(PyObject *self, PyObject *args, PyObject *kwargs) {
     fprintf(stderr, "Error message: %s\n", Pa_GetErrorText(err));
 #endif
 
+    if (ring) {
+      free(ring->data);
+      free(ring);
+    }
+
     PyErr_SetObject(PyExc_IOError,
                     Py_BuildValue("(i,s)", err, Pa_GetErrorText(err)));
     return NULL;
@@ -1648,6 +2283,7 @@ static PyObject *pa_open(PyObject *self, PyObject *args, PyObject *kwargs) {
   streamObject->is_open = 1;
   streamObject->streamInfo = streamInfo;
   streamObject->callbackContext = context;
+  streamObject->ringBuffer = ring;
   return (PyObject *)streamObject;
 }
 
@@ -2039,45 +2675,104 @@ static PyObject *pa_get_stream_cpu_load(PyObject *self, PyObject *args) {
 
 static PyObject *pa_write_stream(PyObject *self, PyObject *args) {
   const char *data;
-  int total_size;
-  int total_frames;
+  Py_ssize_t total_size;
+  long total_frames;
+  long max_frames;
+  int frame_size;
   int err;
   int should_throw_exception = 0;
+  int have_buffer = 0;
+  Py_buffer buffer;
 
   PyObject *stream_arg;
+  PyObject *data_arg;
+  PyObject *frames_arg = NULL;
   _pyAudio_Stream *streamObject;
+  PaStreamParameters *outputParameters;
 
   // clang-format off
-  if (!PyArg_ParseTuple(args, "O!s#i|i",
+  if (!PyArg_ParseTuple(args, "O!O|Oi",
                         &_pyAudio_StreamType,
                         &stream_arg,
-                        &data,
-                        &total_size,
-                        &total_frames,
+                        &data_arg,
+                        &frames_arg,
                         &should_throw_exception)) {
     return NULL;
   }
   // clang-format on
 
-  if (total_frames < 0) {
-    PyErr_SetString(PyExc_ValueError, "Invalid number of frames");
-    return NULL;
+  if (PyUnicode_Check(data_arg)) {
+    /* str is still accepted (as UTF-8), as with the old "s#" format */
+    data = PyUnicode_AsUTF8AndSize(data_arg, &total_size);
+    if (data == NULL) {
+      return NULL;
+    }
+  } else {
+    /* any C-contiguous buffer: bytes, bytearray, memoryview slices,
+       array.array, NumPy arrays, ... -- no copy is made */
+    if (PyObject_GetBuffer(data_arg, &buffer, PyBUF_C_CONTIGUOUS) < 0) {
+      return NULL;
+    }
+    have_buffer = 1;
+    data = (const char *)buffer.buf;
+    total_size = buffer.len;
   }
 
   streamObject = (_pyAudio_Stream *)stream_arg;
 
   if (!_is_open(streamObject)) {
+    if (have_buffer) PyBuffer_Release(&buffer);
     PyErr_SetObject(PyExc_IOError,
                     Py_BuildValue("(i,s)", paBadStreamPtr, "Stream closed"));
     return NULL;
   }
 
+  outputParameters = streamObject->outputParameters;
+  if (outputParameters == NULL) {
+    if (have_buffer) PyBuffer_Release(&buffer);
+    PyErr_SetObject(PyExc_IOError,
+                    Py_BuildValue("(i,s)", paCanNotWriteToAnInputOnlyStream,
+                                  "Not output stream"));
+    return NULL;
+  }
+
+  frame_size = (outputParameters->channelCount) *
+               (Pa_GetSampleSize(outputParameters->sampleFormat));
+  max_frames = (long)(total_size / frame_size);
+
+  if ((frames_arg == NULL) || (frames_arg == Py_None)) {
+    total_frames = max_frames;
+  } else {
+    total_frames = PyLong_AsLong(frames_arg);
+    if (total_frames == -1 && PyErr_Occurred()) {
+      if (have_buffer) PyBuffer_Release(&buffer);
+      return NULL;
+    }
+
+    if (total_frames < 0) {
+      if (have_buffer) PyBuffer_Release(&buffer);
+      PyErr_SetString(PyExc_ValueError, "Invalid number of frames");
+      return NULL;
+    }
+
+    if (total_frames > max_frames) {
+      if (have_buffer) PyBuffer_Release(&buffer);
+      PyErr_SetString(PyExc_ValueError,
+                      "Not enough data for requested number of frames");
+      return NULL;
+    }
+  }
+
   // clang-format off
   Py_BEGIN_ALLOW_THREADS
   err = Pa_WriteStream(streamObject->stream, data, total_frames);
   Py_END_ALLOW_THREADS
   // clang-format on
 
+  if (have_buffer) {
+    PyBuffer_Release(&buffer);
+  }
+
   if (err != paNoError) {
     if (err == paOutputUnderflowed) {
       if (should_throw_exception) {
@@ -2189,6 +2884,114 @@ error:
   return NULL;
 }
 
+static PyObject *pa_read_stream_into(PyObject *self, PyObject *args) {
+  int err;
+  long total_frames;
+  long max_frames;
+  int frame_size;
+  int should_raise_exception = 0;
+  Py_buffer buffer;
+
+  PyObject *stream_arg;
+  PyObject *frames_arg = NULL;
+  _pyAudio_Stream *streamObject;
+  PaStreamParameters *inputParameters;
+
+  // clang-format off
+  if (!PyArg_ParseTuple(args, "O!w*|Oi",
+                        &_pyAudio_StreamType,
+                        &stream_arg,
+                        &buffer,
+                        &frames_arg,
+                        &should_raise_exception)) {
+    return NULL;
+  }
+  // clang-format on
+
+  streamObject = (_pyAudio_Stream *)stream_arg;
+
+  if (!_is_open(streamObject)) {
+    PyBuffer_Release(&buffer);
+    PyErr_SetObject(PyExc_IOError,
+                    Py_BuildValue("(i,s)", paBadStreamPtr, "Stream closed"));
+    return NULL;
+  }
+
+  inputParameters = streamObject->inputParameters;
+  if (inputParameters == NULL) {
+    PyBuffer_Release(&buffer);
+    PyErr_SetObject(PyExc_IOError,
+                    Py_BuildValue("(i,s)", paCanNotReadFromAnOutputOnlyStream,
+                                  "Not input stream"));
+    return NULL;
+  }
+
+  frame_size = (inputParameters->channelCount) *
+               (Pa_GetSampleSize(inputParameters->sampleFormat));
+  max_frames = (long)(buffer.len / frame_size);
+
+  if ((frames_arg == NULL) || (frames_arg == Py_None)) {
+    total_frames = max_frames;
+  } else {
+    total_frames = PyLong_AsLong(frames_arg);
+    if (total_frames == -1 && PyErr_Occurred()) {
+      PyBuffer_Release(&buffer);
+      return NULL;
+    }
+
+    if (total_frames < 0) {
+      PyBuffer_Release(&buffer);
+      PyErr_SetString(PyExc_ValueError, "Invalid number of frames");
+      return NULL;
+    }
+
+    if (total_frames > max_frames) {
+      PyBuffer_Release(&buffer);
+      PyErr_SetString(PyExc_ValueError,
+                      "Buffer too small for requested number of frames");
+      return NULL;
+    }
+  }
+
+#ifdef VERBOSE
+  fprintf(stderr, "Reading %ld frames into %zd byte buffer\n", total_frames,
+          buffer.len);
+#endif
+
+  // clang-format off
+  Py_BEGIN_ALLOW_THREADS
+  err = Pa_ReadStream(streamObject->stream, buffer.buf, total_frames);
+  Py_END_ALLOW_THREADS
+  // clang-format on
+
+  PyBuffer_Release(&buffer);
+
+  if (err != paNoError) {
+    if (err == paInputOverflowed) {
+      if (should_raise_exception) {
+        goto error;
+      }
+    } else {
+      goto error;
+    }
+  }
+
+  return PyLong_FromLong(total_frames);
+
+error:
+  _cleanup_Stream_object(streamObject);
+  PyErr_SetObject(PyExc_IOError,
+                  Py_BuildValue("(i,s)", err, Pa_GetErrorText(err)));
+
+#ifdef VERBOSE
+  fprintf(stderr, "An error occured while using the portaudio stream\n");
+  fprintf(stderr, "Error number: %d\n", err);
+  fprintf(stderr, "Error message: %s\n", Pa_GetErrorText(err));
+#endif
+
+  return NULL;
+}
+
 static PyObject *pa_get_stream_write_available(PyObject *self, PyObject *args) {
   signed long frames;
   PyObject *stream_arg;
@@ -2241,6 +3044,107 @@ static PyObject *pa_get_stream_read_available(PyObject *self, PyObject *args) {
   return PyLong_FromLong(frames);
 }
 
+/*************************************************************
+ * Ring Buffer Streams
+ *************************************************************/
+
+static PyObject *pa_drain_stream(PyObject *self, PyObject *args) {
+  size_t write_pos, read_pos, bytes, offset, first;
+  Py_buffer buffer;
+
+  PyObject *stream_arg;
+  _pyAudio_Stream *streamObject;
+  PyAudioRingBuffer *ring;
+
+  // clang-format off
+  if (!PyArg_ParseTuple(args, "O!w*",
+                        &_pyAudio_StreamType,
+                        &stream_arg,
+                        &buffer)) {
+    return NULL;
+  }
+  // clang-format on
+
+  streamObject = (_pyAudio_Stream *)stream_arg;
+
+  if (!_is_open(streamObject)) {
+    PyBuffer_Release(&buffer);
+    PyErr_SetObject(PyExc_IOError,
+                    Py_BuildValue("(i,s)", paBadStreamPtr, "Stream closed"));
+    return NULL;
+  }
+
+  ring = streamObject->ringBuffer;
+  if (ring == NULL) {
+    PyBuffer_Release(&buffer);
+    PyErr_SetString(PyExc_ValueError, "Stream has no ring buffer");
+    return NULL;
+  }
+
+  read_pos = ring->read_pos;
+  write_pos = RING_LOAD_ACQUIRE(&ring->write_pos);
+  bytes = write_pos - read_pos;
+  if ((size_t)buffer.len < bytes) {
+    bytes = (size_t)buffer.len;
+  }
+  bytes -= bytes % ring->frame_size;
+
+  if (bytes > 0) {
+    offset = read_pos % ring->capacity;
+    first = ring->capacity - offset;
+    if (first > bytes) {
+      first = bytes;
+    }
+
+    /* Copy with the GIL held: close() frees the ring under the GIL, and
+       a memcpy of at most the ring's capacity is too short to be worth
+       releasing it for */
+    memcpy(buffer.buf, ring->data + offset, first);
+    memcpy((char *)buffer.buf + first, ring->data, bytes - first);
+
+    RING_STORE_RELEASE(&ring->read_pos, read_pos + bytes);
+  }
+
+  PyBuffer_Release(&buffer);
+  return PyLong_FromSize_t(bytes / ring->frame_size);
+}
+
+static PyObject *pa_get_stream_ring_stats(PyObject *self, PyObject *args) {
+  PyObject *stream_arg;
+  _pyAudio_Stream *streamObject;
+  PyAudioRingBuffer *ring;
+  size_t available;
+
+  if (!PyArg_ParseTuple(args, "O!", &_pyAudio_StreamType, &stream_arg)) {
+    return NULL;
+  }
+
+  streamObject = (_pyAudio_Stream *)stream_arg;
+
+  if (!_is_open(streamObject)) {
+    PyErr_SetObject(PyExc_IOError,
+                    Py_BuildValue("(i,s)", paBadStreamPtr, "Stream closed"));
+    return NULL;
+  }
+
+  ring = streamObject->ringBuffer;
+  if (ring == NULL) {
+    PyErr_SetString(PyExc_ValueError, "Stream has no ring buffer");
+    return NULL;
+  }
+
+  available = RING_LOAD_ACQUIRE(&ring->write_pos) - ring->read_pos;
+
+  return Py_BuildValue(
+      "{s:n,s:n,s:n,s:n,s:n,s:n}", "capacity",
+      (Py_ssize_t)(ring->capacity / ring->frame_size), "available",
+      (Py_ssize_t)(available / ring->frame_size), "overruns",
+      (Py_ssize_t)RING_LOAD_ACQUIRE(&ring->overruns), "overrun_frames",
+      (Py_ssize_t)RING_LOAD_ACQUIRE(&ring->overrun_frames), "input_overflows",
+      (Py_ssize_t)RING_LOAD_ACQUIRE(&ring->input_overflows), "total_frames",
+      (Py_ssize_t)RING_LOAD_ACQUIRE(&ring->total_frames));
+}
+
 /************************************************************
  *
  * IV. Python Module Init
@@ -2292,6 +3196,14 @@ init_portaudio(void)
     return ERROR_INIT;
   }
 
+  if (PyType_Ready(&_pyAudio_CallbackBufferType) < 0) {
+    return ERROR_INIT;
+  }
+
+  if (PyType_Ready(&_pyAudio_CallbackTimeInfoType) < 0) {
+    return ERROR_INIT;
+  }
+
 #ifdef MACOSX
   _pyAudio_MacOSX_hostApiSpecificStreamInfoType.tp_new = PyType_GenericNew;
   if (PyType_Ready(&_pyAudio_MacOSX_hostApiSpecificStreamInfoType) < 0) {
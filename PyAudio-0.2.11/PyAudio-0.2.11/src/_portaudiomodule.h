@@ -72,6 +72,9 @@ pa_get_default_output_device(PyObject *self, PyObject *args);
 static PyObject *
 pa_get_device_info(PyObject *self, PyObject *args);
 
+static PyObject *
+pa_get_device_snapshot(PyObject *self, PyObject *args);
+
 /* stream open/close */
 
 static PyObject *
@@ -118,6 +121,15 @@ pa_write_stream(PyObject *self, PyObject *args);
 static PyObject *
 pa_read_stream(PyObject *self, PyObject *args);
 
+static PyObject *
+pa_read_stream_into(PyObject *self, PyObject *args);
+
+static PyObject *
+pa_drain_stream(PyObject *self, PyObject *args);
+
+static PyObject *
+pa_get_stream_ring_stats(PyObject *self, PyObject *args);
+
 static PyObject *
 pa_get_stream_write_available(PyObject *self, PyObject *args);
 
@@ -36,7 +36,8 @@ Overview
 --------
 
 **Classes**
-  :py:class:`PyAudio`, :py:class:`Stream`
+  :py:class:`PyAudio`, :py:class:`Stream`, :py:class:`AsyncStream`,
+  :py:class:`DeviceSnapshot`
 
 .. only:: pamac
 
@@ -44,7 +45,8 @@ Overview
      :py:class:`PaMacCoreStreamInfo`
 
 **Stream Conversion Convenience Functions**
-  :py:func:`get_sample_size`, :py:func:`get_format_from_width`
+  :py:func:`get_sample_size`, :py:func:`get_format_from_width`,
+  :py:func:`get_numpy_dtype`
 
 **PortAudio version**
   :py:func:`get_portaudio_version`, :py:func:`get_portaudio_version_text`
@@ -109,7 +111,15 @@ __author__ = "Hubert Pham"
 __version__ = "0.2.11"
 __docformat__ = "restructuredtext en"
 
+import collections
 import sys
+import threading
+import time
+
+try:
+    from types import MappingProxyType as _frozen_dict
+except ImportError:
+    _frozen_dict = dict
 
 # attempt to import PortAudio
 try:
@@ -236,6 +246,35 @@ def get_format_from_width(width, unsigned=True):
     else:
         raise ValueError("Invalid width: %d" % width)
 
+# NumPy dtype names per sample format; paInt24 has no NumPy equivalent
+_NUMPY_DTYPES = {
+    paFloat32: 'float32',
+    paInt32: 'int32',
+    paInt16: 'int16',
+    paInt8: 'int8',
+    paUInt8: 'uint8',
+}
+
+def get_numpy_dtype(format):
+    """
+    Returns the NumPy dtype matching the specified sample *format*.
+
+    NumPy is imported on first use only.
+
+    :param format: A |PaSampleFormat| constant.
+    :raises ValueError: when *format* has no NumPy equivalent
+       (:py:data:`paInt24`, :py:data:`paCustomFormat`).
+    :rtype: ``numpy.dtype``
+    """
+
+    try:
+        name = _NUMPY_DTYPES[format]
+    except KeyError:
+        raise ValueError("No NumPy dtype for sample format: %r" % format)
+
+    import numpy
+    return numpy.dtype(name)
+
 
 ############################################################
 # Versioning
@@ -282,7 +321,9 @@ class Stream:
       :py:func:`is_stopped`
 
     **Input Output**
-      :py:func:`write`, :py:func:`read`, :py:func:`get_read_available`,
+      :py:func:`write`, :py:func:`read`, :py:func:`read_into`,
+      :py:func:`write_array`, :py:func:`read_array`, :py:func:`drain`,
+      :py:func:`ring_stats`, :py:func:`get_read_available`,
       :py:func:`get_write_available`
     """
 
@@ -299,7 +340,9 @@ class Stream:
                  start=True,
                  input_host_api_specific_stream_info=None,
                  output_host_api_specific_stream_info=None,
-                 stream_callback=None):
+                 stream_callback=None,
+                 fast_callback=False,
+                 ring_buffer_frames=None):
         """
         Initialize a stream; this should be called by
         :py:func:`PyAudio.open`. A stream can either be input, output,
@@ -389,13 +432,61 @@ class Stream:
             **See:** PortAudio's callback signature for additional
             details: http://portaudio.com/docs/v19-doxydocs/portaudio_8h.html#a8a60fb2a5ec9cbade3f54a9c978e2710
 
-        :raise ValueError: Neither input nor output are set True.
+        :param fast_callback: Call ``stream_callback`` in fast mode.
+            Defaults to ``False``. Fast mode avoids allocating a bytes
+            object, a ``time_info`` dictionary and a result tuple on
+            every callback, and writes output in place instead of
+            copying it. The callback must then conform to:
+
+            .. code-block:: python
+
+               callback(in_buffer,    # read-only memoryview if
+                                      # input=True; else None
+                        out_buffer,   # writable memoryview if
+                                      # output=True; else None
+                        frame_count,  # number of frames
+                        time_info,    # object with input_buffer_adc_time,
+                                      # current_time, output_buffer_dac_time
+                        status_flags) # PaCallbackFlags
+
+            and return :py:data:`paContinue`, :py:data:`paComplete` or
+            :py:data:`paAbort` (``None`` means :py:data:`paContinue`).
+            ``in_buffer`` and ``out_buffer`` are memoryviews pointing
+            directly at PortAudio's buffers (wrap them with e.g.
+            ``numpy.frombuffer``); fill ``out_buffer`` in place.  They are
+            released when the callback returns, so using them later raises
+            ``ValueError``, and ``time_info`` is reused between calls: copy
+            any data you want to keep, and release every view derived from
+            the buffers before returning (one that is still held raises
+            ``BufferError`` and aborts the stream).
+
+        :param ring_buffer_frames: Capture into a lock-free ring buffer
+            of this many frames. Defaults to ``None`` (disabled). Only
+            valid for input-only streams without a ``stream_callback``.
+            Frames are copied into the ring on PortAudio's callback
+            thread without taking the GIL, so pauses in Python (garbage
+            collection, busy threads) do not cause dropouts as long as
+            the ring does not fill up. Retrieve frames in bulk with
+            :py:func:`Stream.drain`; frames that arrive while the ring is
+            full are dropped and counted in :py:func:`Stream.ring_stats`.
+
+        :raise ValueError: Neither input nor output are set True,
+            ``fast_callback`` is set without a ``stream_callback``, or
+            ``ring_buffer_frames`` is used with an output stream or a
+            ``stream_callback``.
         """
 
         # no stupidity allowed
         if not (input or output):
             raise ValueError("Must specify an input or output " + "stream.")
 
+        if fast_callback and not stream_callback:
+            raise ValueError("fast_callback requires a stream_callback")
+
+        if ring_buffer_frames and (output or stream_callback):
+            raise ValueError("ring_buffer_frames requires an input-only "
+                             "stream without stream_callback")
+
         # remember parent
         self._parent = PA_manager
 
@@ -437,6 +528,12 @@ class Stream:
         if stream_callback:
             arguments['stream_callback'] = stream_callback
 
+        if fast_callback:
+            arguments['fast_callback'] = True
+
+        if ring_buffer_frames:
+            arguments['ring_buffer_frames'] = ring_buffer_frames
+
         # calling pa.open returns a stream object
         self._stream = pa.open(**arguments)
 
@@ -524,6 +621,19 @@ class Stream:
         pa.stop_stream(self._stream)
         self._is_running = False
 
+    def abort_stream(self):
+        """
+        Stop the stream immediately, discarding any output still
+        queued (unlike :py:func:`stop_stream`, which waits for it to
+        play). Call :py:func:`start_stream` to resume the stream.
+        """
+
+        if not self._is_running:
+            return
+
+        pa.abort_stream(self._stream)
+        self._is_running = False
+
     def is_active(self):
         """
         Returns whether the stream is active.
@@ -555,11 +665,14 @@ class Stream:
         *non-blocking* mode.
 
         :param frames:
-           The frames of data.
+           The frames of data. Any C-contiguous object supporting the
+           buffer protocol is accepted (e.g., ``bytes``, ``bytearray``,
+           a ``memoryview`` slice, ``array.array`` or a NumPy array);
+           it is passed to PortAudio without being copied.
         :param num_frames:
            The number of frames to write.
            Defaults to None, in which this value will be
-           automatically computed.
+           automatically computed from the size in bytes of `frames`.
         :param exception_on_underflow:
            Specifies whether an IOError exception should be thrown
            (or silently ignored) on buffer underflow. Defaults
@@ -568,6 +681,8 @@ class Stream:
 
         :raises IOError: if the stream is not an output stream
            or if the write operation was unsuccessful.
+        :raises ValueError: if `frames` holds fewer than `num_frames`
+           frames.
 
         :rtype: `None`
         """
@@ -576,12 +691,6 @@ class Stream:
             raise IOError("Not output stream",
                           paCanNotWriteToAnInputOnlyStream)
 
-        if num_frames == None:
-            # determine how many frames to read
-            width = get_sample_size(self._format)
-            num_frames = int(len(frames) / (self._channels * width))
-            #print len(frames), self._channels, self._width, num_frames
-
         pa.write_stream(self._stream, frames, num_frames,
                         exception_on_underflow)
 
@@ -607,6 +716,153 @@ class Stream:
 
         return pa.read_stream(self._stream, num_frames, exception_on_overflow)
 
+    def read_into(self, buffer, num_frames=None, exception_on_overflow=True):
+        """
+        Read samples from the stream directly into `buffer`, without
+        allocating a new bytes object. Do not call when using
+        *non-blocking* mode.
+
+        The GIL is released while waiting for audio, so a capture
+        thread can reuse one preallocated buffer indefinitely.
+
+        :param buffer: A writable, C-contiguous object supporting the
+           buffer protocol (e.g., ``bytearray``, ``memoryview``,
+           ``array.array`` or a NumPy array).
+        :param num_frames: The number of frames to read.
+           Defaults to None, in which case as many whole frames as
+           fit in `buffer` are read.
+        :param exception_on_overflow:
+           Specifies whether an IOError exception should be thrown
+           (or silently ignored) on input buffer overflow. Defaults
+           to True.
+        :raises IOError: if stream is not an input stream
+          or if the read operation was unsuccessful.
+        :raises ValueError: if `buffer` cannot hold `num_frames` frames.
+        :raises TypeError: if `buffer` is not writable.
+        :rtype: integer (number of frames read)
+        """
+
+        if not self._is_input:
+            raise IOError("Not input stream",
+                          paCanNotReadFromAnOutputOnlyStream)
+
+        return pa.read_stream_into(self._stream, buffer, num_frames,
+                                   exception_on_overflow)
+
+    def read_array(self, num_frames, exception_on_overflow=True):
+        """
+        Read samples from the stream into a new NumPy array of shape
+        ``(num_frames, channels)``, with the dtype matching the stream
+        format. Do not call when using *non-blocking* mode.
+
+        PortAudio writes straight into the array's memory; no
+        intermediate bytes object is created.
+
+        :param num_frames: The number of frames to read.
+        :param exception_on_overflow:
+           Specifies whether an IOError exception should be thrown
+           (or silently ignored) on input buffer overflow. Defaults
+           to True.
+        :raises IOError: if stream is not an input stream
+          or if the read operation was unsuccessful.
+        :raises ValueError: if the stream format has no NumPy dtype
+          (see :py:func:`get_numpy_dtype`).
+        :rtype: ``numpy.ndarray``
+        """
+
+        if not self._is_input:
+            raise IOError("Not input stream",
+                          paCanNotReadFromAnOutputOnlyStream)
+
+        import numpy
+        arr = numpy.empty((num_frames, self._channels),
+                          dtype=get_numpy_dtype(self._format))
+        self.read_into(arr, num_frames, exception_on_overflow)
+        return arr
+
+    def write_array(self, arr, exception_on_underflow=False):
+        """
+        Write a NumPy array of samples to the stream.  Do not call when
+        using *non-blocking* mode.
+
+        A C-contiguous array whose dtype matches the stream format is
+        handed to PortAudio without copying; anything else is converted
+        first, allowing only safe or same-kind casts (e.g. ``float64`` to
+        ``float32``, but not ``float64`` to ``int16``).
+
+        :param arr: Samples of shape ``(frames, channels)``, or a 1-D
+           array of interleaved samples.
+        :param exception_on_underflow:
+           Specifies whether an IOError exception should be thrown
+           (or silently ignored) on buffer underflow. Defaults
+           to False.
+        :raises IOError: if the stream is not an output stream
+           or if the write operation was unsuccessful.
+        :raises ValueError: if the shape does not match the stream's
+           channel count, or the stream format has no NumPy dtype.
+        :raises TypeError: if `arr` cannot be cast to the stream dtype.
+        :rtype: `None`
+        """
+
+        if not self._is_output:
+            raise IOError("Not output stream",
+                          paCanNotWriteToAnInputOnlyStream)
+
+        import numpy
+        dtype = get_numpy_dtype(self._format)
+        arr = numpy.asarray(arr)
+
+        if arr.ndim == 2:
+            if arr.shape[1] != self._channels:
+                raise ValueError("Array has %d channels, stream has %d" %
+                                 (arr.shape[1], self._channels))
+        elif arr.ndim != 1 or arr.size % self._channels:
+            raise ValueError("Array shape %r does not match %d channels" %
+                             (arr.shape, self._channels))
+
+        if arr.dtype != dtype:
+            arr = arr.astype(dtype, casting='same_kind')
+        arr = numpy.ascontiguousarray(arr)
+
+        self.write(arr, None, exception_on_underflow)
+
+    def drain(self, buffer):
+        """
+        Move the frames captured so far from the stream's ring buffer
+        into `buffer`, without waiting. Only valid for streams opened
+        with ``ring_buffer_frames``.
+
+        The copy runs with the GIL held (it is a single short memcpy,
+        and ``close()`` frees the ring under the GIL).
+
+        :param buffer: A writable, C-contiguous object supporting the
+           buffer protocol. At most as many whole frames as fit are
+           copied; the rest stay in the ring for the next call.
+        :raises ValueError: if the stream has no ring buffer.
+        :raises TypeError: if `buffer` is not writable.
+        :rtype: integer (number of frames copied, possibly 0)
+        """
+
+        return pa.drain_stream(self._stream, buffer)
+
+    def ring_stats(self):
+        """
+        Return ring buffer statistics for a stream opened with
+        ``ring_buffer_frames``.
+
+        Keys (all in frames unless noted): ``capacity``, ``available``
+        (waiting to be drained), ``overruns`` (callbacks that found the
+        ring full), ``overrun_frames`` (frames dropped because of that),
+        ``input_overflows`` (callbacks flagged with
+        :py:data:`paInputOverflow` by PortAudio) and ``total_frames``
+        (frames stored since the stream was opened).
+
+        :raises ValueError: if the stream has no ring buffer.
+        :rtype: dict
+        """
+
+        return pa.get_stream_ring_stats(self._stream)
+
     def get_read_available(self):
         """
         Return the number of frames that can be read without waiting.
@@ -630,6 +886,506 @@ class Stream:
 
 
 
+############################################################
+# asyncio Adapter
+############################################################
+
+class AsyncStream:
+    """
+    asyncio interface to a PortAudio stream. Obtain one with
+    :py:func:`PyAudio.open_async` from a running event loop.
+
+    Capture with ``async for chunk in stream`` (or ``await
+    stream.read()``); play back with ``await stream.write(data)``. No
+    thread per consumer is needed: the stream runs in fast callback mode
+    (see :py:func:`Stream.__init__`) and only hands chunks to the event
+    loop.
+
+    Captured chunks go into a queue of at most `max_queued_chunks`
+    chunks; when the consumer falls behind, the oldest chunk is dropped
+    and counted as an overrun. Written data is queued for the callback;
+    ``await stream.write()`` returns once no more than
+    `max_queued_chunks` chunks are pending, which throttles producers to
+    the playback rate. When the callback runs out of written data, it
+    plays silence and counts an underrun; await :py:func:`flush` at the
+    end of playback so that the silence after it is not counted.
+
+    This class avoids ``async def`` so that the module stays importable
+    on interpreters without asyncio; all coroutine-style methods return
+    awaitable futures.
+
+    **Input Output**
+      :py:func:`read`, :py:func:`write`, :py:func:`flush`
+
+    **Stream Management**
+      :py:func:`close`, :py:func:`stats`, :py:attr:`stream`
+    """
+
+    def __init__(self, PA_manager, rate, channels, format, input=False,
+                 output=False, frames_per_buffer=1024, max_queued_chunks=16,
+                 loop=None, **kwargs):
+        """
+        Open the underlying stream and start it. This should be called
+        by :py:func:`PyAudio.open_async`.
+
+        :param PA_manager: The managing :py:class:`PyAudio` instance
+        :param rate: Sampling rate
+        :param channels: Number of channels
+        :param format: Sampling size and format. See |PaSampleFormat|.
+        :param input: Specifies whether this is an input stream.
+        :param output: Specifies whether this is an output stream.
+        :param frames_per_buffer: Frames per callback, i.e. per chunk.
+        :param max_queued_chunks: Capacity of the capture queue and
+            backpressure limit of the playback queue, in chunks.
+            Defaults to 16.
+        :param loop: Event loop to deliver to. Defaults to the running
+            loop.
+        :param kwargs: Further :py:func:`Stream.__init__` arguments,
+            e.g. ``input_device_index``. ``stream_callback``,
+            ``fast_callback`` and ``start`` are set by this class.
+        :raise ValueError: Neither input nor output are set True.
+        """
+
+        import asyncio
+
+        if loop is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except AttributeError:
+                loop = asyncio.get_event_loop()
+
+        self._loop = loop
+        self._frame_size = get_sample_size(format) * channels
+        self._max_queued_chunks = max_queued_chunks
+        self._out_limit = max_queued_chunks * frames_per_buffer * \
+            self._frame_size
+        self._silence = bytes(bytearray(frames_per_buffer * self._frame_size))
+        self._closed = False
+
+        # capture queue, filled on PortAudio's thread
+        self._in_lock = threading.Lock()
+        self._in_chunks = collections.deque()
+        self._read_futures = collections.deque()
+        self._reader_waiting = False
+
+        # playback queue, drained on PortAudio's thread
+        self._out_lock = threading.Lock()
+        self._out_pending = bytearray()
+        self._write_futures = []
+        self._flush_futures = []
+        self._writer_waiting = False
+        self._output_started = False
+
+        self.chunks_captured = 0
+        self.overruns = 0
+        self.overrun_frames = 0
+        self.underruns = 0
+        self.underrun_frames = 0
+        self.input_overflows = 0
+
+        kwargs.update(stream_callback=self._callback, fast_callback=True,
+                      start=False)
+        self.stream = PA_manager.open(rate=rate, channels=channels,
+                                      format=format, input=input,
+                                      output=output,
+                                      frames_per_buffer=frames_per_buffer,
+                                      **kwargs)
+        self.stream.start_stream()
+
+    ############################################################
+    # PortAudio thread
+    ############################################################
+
+    def _callback(self, in_buffer, out_buffer, frame_count, time_info,
+                  status_flags):
+        if status_flags & paInputOverflow:
+            self.input_overflows += 1
+
+        if in_buffer is not None:
+            data = bytes(in_buffer)
+            with self._in_lock:
+                if len(self._in_chunks) >= self._max_queued_chunks:
+                    self._in_chunks.popleft()
+                    self.overruns += 1
+                    self.overrun_frames += frame_count
+                self._in_chunks.append(data)
+                self.chunks_captured += 1
+                wake_reader = self._reader_waiting
+                self._reader_waiting = False
+            if wake_reader:
+                self._call_in_loop(self._wake_readers)
+
+        if out_buffer is not None:
+            with self._out_lock:
+                needed = len(out_buffer)
+                available = min(needed, len(self._out_pending))
+                with memoryview(out_buffer) as out_view:
+                    with memoryview(self._out_pending) as pending_view:
+                        out_view[:available] = pending_view[:available]
+                    if available < needed:
+                        with memoryview(self._silence) as silence_view:
+                            out_view[available:] = \
+                                silence_view[:needed - available]
+                del self._out_pending[:available]
+
+                # running dry while flushing is the expected end of
+                # playback, not an underrun
+                if available < needed and self._output_started and \
+                        not self._flush_futures:
+                    self.underruns += 1
+                    self.underrun_frames += \
+                        (needed - available) // self._frame_size
+
+                wake_writer = self._writer_waiting and \
+                    len(self._out_pending) <= self._out_limit
+                if wake_writer:
+                    self._writer_waiting = False
+            if wake_writer:
+                self._call_in_loop(self._wake_writers)
+
+        return paContinue
+
+    def _call_in_loop(self, fn):
+        try:
+            self._loop.call_soon_threadsafe(fn)
+        except RuntimeError:
+            # event loop already closed
+            pass
+
+    ############################################################
+    # Event loop thread
+    ############################################################
+
+    def _wake_readers(self):
+        with self._in_lock:
+            while self._read_futures and \
+                    (self._in_chunks or self._closed):
+                future = self._read_futures.popleft()
+                if future.done():
+                    continue
+                if self._in_chunks:
+                    future.set_result(self._in_chunks.popleft())
+                else:
+                    future.set_exception(StopAsyncIteration())
+            self._reader_waiting = bool(self._read_futures)
+
+    def _wake_writers(self):
+        with self._out_lock:
+            pending = len(self._out_pending)
+            if pending <= self._out_limit or self._closed:
+                waiting, self._write_futures = self._write_futures, []
+                for future in waiting:
+                    if not future.done():
+                        future.set_result(None)
+            if pending == 0 or self._closed:
+                if self._flush_futures:
+                    # playback finished: silence is no longer an underrun
+                    self._output_started = False
+                waiting, self._flush_futures = self._flush_futures, []
+                for future in waiting:
+                    if not future.done():
+                        future.set_result(None)
+            self._writer_waiting = bool(self._write_futures or
+                                        self._flush_futures)
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        return self.read()
+
+    def __aenter__(self):
+        future = self._loop.create_future()
+        future.set_result(self)
+        return future
+
+    def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+        future = self._loop.create_future()
+        future.set_result(False)
+        return future
+
+    def read(self):
+        """
+        Wait for the next captured chunk of `frames_per_buffer` frames.
+
+        :raises StopAsyncIteration: (when awaited) once the stream is
+            closed and the queue is empty.
+        :rtype: awaitable resolving to bytes
+        """
+
+        future = self._loop.create_future()
+        with self._in_lock:
+            self._read_futures.append(future)
+            self._reader_waiting = True
+        self._wake_readers()
+        return future
+
+    def write(self, data):
+        """
+        Queue `data` for playback. Awaiting the result waits until the
+        playback queue is back within `max_queued_chunks` chunks.
+
+        :param data: A bytes-like object of whole frames.
+        :raises IOError: if the stream is closed.
+        :rtype: awaitable
+        """
+
+        if self._closed:
+            raise IOError("Stream closed", paBadStreamPtr)
+
+        future = self._loop.create_future()
+        with self._out_lock:
+            self._out_pending += data
+            self._output_started = True
+            if len(self._out_pending) <= self._out_limit:
+                future.set_result(None)
+            else:
+                self._write_futures.append(future)
+                self._writer_waiting = True
+        return future
+
+    def flush(self):
+        """
+        Wait until all queued playback data has been handed to
+        PortAudio.
+
+        :rtype: awaitable
+        """
+
+        future = self._loop.create_future()
+        with self._out_lock:
+            if not self._out_pending or self._closed:
+                self._output_started = False
+                future.set_result(None)
+            else:
+                self._flush_futures.append(future)
+                self._writer_waiting = True
+        return future
+
+    def stats(self):
+        """
+        Return queue and overrun/underrun counters.
+
+        Keys: ``queued_chunks`` (captured, not yet read),
+        ``pending_bytes`` (written, not yet played), ``chunks_captured``,
+        ``overruns``, ``overrun_frames``, ``underruns``,
+        ``underrun_frames`` and ``input_overflows``.
+
+        :rtype: dict
+        """
+
+        with self._in_lock:
+            queued = len(self._in_chunks)
+        with self._out_lock:
+            pending = len(self._out_pending)
+        return {'queued_chunks': queued,
+                'pending_bytes': pending,
+                'chunks_captured': self.chunks_captured,
+                'overruns': self.overruns,
+                'overrun_frames': self.overrun_frames,
+                'underruns': self.underruns,
+                'underrun_frames': self.underrun_frames,
+                'input_overflows': self.input_overflows}
+
+    def close(self):
+        """
+        Stop and close the underlying stream. Pending reads finish with
+        the chunks still queued, then with ``StopAsyncIteration``;
+        pending writes and flushes complete immediately.
+        """
+
+        if self._closed:
+            return
+
+        self._closed = True
+        self.stream.close()
+        self._wake_readers()
+        self._wake_writers()
+
+
+############################################################
+# Device Snapshot
+############################################################
+
+class DeviceSnapshot:
+    """
+    Immutable view of every PortAudio Host API and device, taken with a
+    single call into PortAudio. Obtain one with
+    :py:func:`PyAudio.snapshot_devices`.
+
+    Host API and device entries are read-only mappings with the same
+    keys as :py:func:`PyAudio.get_host_api_info_by_index` and
+    :py:func:`PyAudio.get_device_info_by_index`.
+
+    **Host API**
+      :py:attr:`host_apis`, :py:func:`get_host_api_info_by_index`,
+      :py:func:`get_host_api_info_by_name`,
+      :py:func:`get_host_api_info_by_type`,
+      :py:func:`get_default_host_api_info`
+
+    **Device API**
+      :py:attr:`devices`, :py:func:`get_device_info_by_index`,
+      :py:func:`get_device_info_by_name`, :py:func:`input_devices`,
+      :py:func:`output_devices`, :py:func:`get_default_input_device_info`,
+      :py:func:`get_default_output_device_info`
+    """
+
+    def __init__(self, host_apis, devices, default_host_api,
+                 default_input_device, default_output_device):
+        """
+        Build a snapshot from the result of
+        ``_portaudio.get_device_snapshot()``. Use
+        :py:func:`PyAudio.snapshot_devices` instead of calling this
+        directly.
+        """
+
+        self.host_apis = tuple(_frozen_dict(api) for api in host_apis)
+        self.devices = tuple(_frozen_dict(dev) for dev in devices)
+        self.default_host_api_index = default_host_api
+        self.default_input_device_index = default_input_device
+        self.default_output_device_index = default_output_device
+        self.taken_at = time.time()
+
+        self._devices_by_name = {}
+        for dev in self.devices:
+            self._devices_by_name.setdefault(dev['name'], []).append(dev)
+
+    def __len__(self):
+        return len(self.devices)
+
+    def __iter__(self):
+        return iter(self.devices)
+
+    def __repr__(self):
+        def describe(index):
+            if 0 <= index < len(self.devices):
+                return "%d %r" % (index, self.devices[index]['name'])
+            return "none"
+
+        return ("<DeviceSnapshot %d host APIs, %d devices "
+                "(%d in, %d out), default in=%s, out=%s>" %
+                (len(self.host_apis), len(self.devices),
+                 len(self.input_devices()), len(self.output_devices()),
+                 describe(self.default_input_device_index),
+                 describe(self.default_output_device_index)))
+
+    def get_host_api_info_by_index(self, host_api_index):
+        """
+        Return the Host API entry at `host_api_index`.
+
+        :raises IOError: for invalid `host_api_index`
+        :rtype: mapping
+        """
+
+        if not 0 <= host_api_index < len(self.host_apis):
+            raise IOError("Invalid host api info", paInvalidHostApi)
+        return self.host_apis[host_api_index]
+
+    def get_host_api_info_by_name(self, name):
+        """
+        Return the Host API entry named `name` (e.g. ``"ALSA"``).
+
+        :raises KeyError: if no Host API has that name
+        :rtype: mapping
+        """
+
+        for api in self.host_apis:
+            if api['name'] == name:
+                return api
+        raise KeyError(name)
+
+    def get_host_api_info_by_type(self, host_api_type):
+        """
+        Return the Host API entry of the given |PaHostAPI| type.
+
+        :raises IOError: if the Host API is not available
+        :rtype: mapping
+        """
+
+        for api in self.host_apis:
+            if api['type'] == host_api_type:
+                return api
+        raise IOError("Host API not found", paHostApiNotFound)
+
+    def get_default_host_api_info(self):
+        """
+        Return the default Host API entry.
+
+        :raises IOError: if there is no default Host API
+        :rtype: mapping
+        """
+
+        return self.get_host_api_info_by_index(self.default_host_api_index)
+
+    def get_device_info_by_index(self, device_index):
+        """
+        Return the device entry at `device_index`.
+
+        :raises IOError: Invalid `device_index`.
+        :rtype: mapping
+        """
+
+        if not 0 <= device_index < len(self.devices):
+            raise IOError("Invalid device info", paInvalidDevice)
+        return self.devices[device_index]
+
+    def get_device_info_by_name(self, name, host_api_index=None):
+        """
+        Return the first device entry named `name`, optionally
+        restricted to one Host API.
+
+        :raises KeyError: if no such device exists
+        :rtype: mapping
+        """
+
+        for dev in self._devices_by_name.get(name, ()):
+            if host_api_index is None or dev['hostApi'] == host_api_index:
+                return dev
+        raise KeyError(name)
+
+    def input_devices(self):
+        """
+        Return the entries of all devices with input channels.
+
+        :rtype: tuple
+        """
+
+        return tuple(dev for dev in self.devices
+                     if dev['maxInputChannels'] > 0)
+
+    def output_devices(self):
+        """
+        Return the entries of all devices with output channels.
+
+        :rtype: tuple
+        """
+
+        return tuple(dev for dev in self.devices
+                     if dev['maxOutputChannels'] > 0)
+
+    def get_default_input_device_info(self):
+        """
+        Return the default input device entry.
+
+        :raises IOError: No default input device available.
+        :rtype: mapping
+        """
+
+        return self.get_device_info_by_index(self.default_input_device_index)
+
+    def get_default_output_device_info(self):
+        """
+        Return the default output device entry.
+
+        :raises IOError: No default output device available.
+        :rtype: mapping
+        """
+
+        return self.get_device_info_by_index(
+            self.default_output_device_index)
+
+
 ############################################################
 # Main Export
 ############################################################
@@ -647,7 +1403,7 @@ class PyAudio:
     Use this class to open and close streams.
 
     **Stream Management**
-      :py:func:`open`, :py:func:`close`
+      :py:func:`open`, :py:func:`open_async`, :py:func:`close`
 
     **Host API**
       :py:func:`get_host_api_count`, :py:func:`get_default_host_api_info`,
@@ -659,7 +1415,8 @@ class PyAudio:
       :py:func:`get_device_count`, :py:func:`is_format_supported`,
       :py:func:`get_default_input_device_info`,
       :py:func:`get_default_output_device_info`,
-      :py:func:`get_device_info_by_index`
+      :py:func:`get_device_info_by_index`, :py:func:`snapshot_devices`,
+      :py:func:`invalidate_device_snapshot`
 
     **Stream Format Conversion**
       :py:func:`get_sample_size`, :py:func:`get_format_from_width`
@@ -676,6 +1433,7 @@ class PyAudio:
 
         pa.initialize()
         self._streams = set()
+        self._device_snapshot = None
 
     def terminate(self):
         """
@@ -689,6 +1447,7 @@ class PyAudio:
             stream.close()
 
         self._streams = set()
+        self._device_snapshot = None
 
         pa.terminate()
 
@@ -751,6 +1510,17 @@ class PyAudio:
         self._streams.add(stream)
         return stream
 
+    def open_async(self, *args, **kwargs):
+        """
+        Open a new stream for use with asyncio. Call from a running
+        event loop. See :py:func:`AsyncStream.__init__` for parameter
+        details.
+
+        :returns: A new, started :py:class:`AsyncStream`
+        """
+
+        return AsyncStream(self, *args, **kwargs)
+
     def close(self, stream):
         """
         Close a stream. Typically use :py:func:`Stream.close` instead.
@@ -980,6 +1750,33 @@ class PyAudio:
             pa.get_device_info(device_index)
             )
 
+    def snapshot_devices(self, refresh=False):
+        """
+        Return a :py:class:`DeviceSnapshot` of every Host API and device,
+        fetched with one call into PortAudio and cached on this
+        instance.
+
+        PortAudio only rescans devices when it is (re)initialized, so the
+        cached snapshot stays accurate until then; pass ``refresh=True``
+        or call :py:func:`invalidate_device_snapshot` to fetch a new one
+        anyway.
+
+        :param refresh: Ignore the cached snapshot. Defaults to ``False``.
+        :raises IOError: if PortAudio cannot enumerate devices.
+        :rtype: :py:class:`DeviceSnapshot`
+        """
+
+        if refresh or self._device_snapshot is None:
+            self._device_snapshot = DeviceSnapshot(*pa.get_device_snapshot())
+        return self._device_snapshot
+
+    def invalidate_device_snapshot(self):
+        """
+        Drop the snapshot cached by :py:func:`snapshot_devices`.
+        """
+
+        self._device_snapshot = None
+
     def _make_device_info_dictionary(self, index, device_info):
         """
         Internal method to create Device Info dictionary that mirrors
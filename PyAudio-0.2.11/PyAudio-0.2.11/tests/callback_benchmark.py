@@ -0,0 +1,90 @@
+"""
+Microbenchmark: per-callback overhead of the default and fast callback
+modes.
+
+Opens a full-duplex stream on the default devices and runs a pass-through
+("wire") callback in each mode. PortAudio's CPU load estimate covers the
+whole time spent in the callback, including PyAudio's C wrapper, so
+``cpu_load * buffer_duration`` gives the average cost of one callback.
+Small buffer sizes make the wrapper overhead dominate.
+
+Usage: python callback_benchmark.py [--frames-per-buffer 64] [--seconds 5]
+"""
+
+import argparse
+import time
+
+import pyaudio
+
+
+def legacy_callback(in_data, frame_count, time_info, status):
+    return (in_data, pyaudio.paContinue)
+
+
+def fast_callback(in_buffer, out_buffer, frame_count, time_info, status):
+    with memoryview(in_buffer) as in_view, \
+         memoryview(out_buffer) as out_view:
+        out_view[:] = in_view
+    return pyaudio.paContinue
+
+
+def run(p, args, callback, fast):
+    state = {'count': 0}
+
+    def counting_callback(*cb_args):
+        state['count'] += 1
+        return callback(*cb_args)
+
+    stream = p.open(format=pyaudio.paInt16,
+                    channels=args.channels,
+                    rate=args.rate,
+                    input=True,
+                    output=True,
+                    frames_per_buffer=args.frames_per_buffer,
+                    stream_callback=counting_callback,
+                    fast_callback=fast)
+
+    # Let the stream settle before sampling the load.
+    time.sleep(0.5)
+    loads = []
+    start = time.time()
+    while stream.is_active() and (time.time() - start) < args.seconds:
+        time.sleep(0.1)
+        loads.append(stream.get_cpu_load())
+
+    stream.stop_stream()
+    stream.close()
+
+    cpu_load = sum(loads) / len(loads) if loads else 0.0
+    buffer_seconds = args.frames_per_buffer / float(args.rate)
+    return {
+        'callbacks': state['count'],
+        'cpu_load': cpu_load,
+        'usec_per_callback': cpu_load * buffer_seconds * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--frames-per-buffer', type=int, default=64)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--rate', type=int, default=44100)
+    parser.add_argument('--channels', type=int, default=1)
+    args = parser.parse_args()
+
+    p = pyaudio.PyAudio()
+    try:
+        print("frames_per_buffer=%d rate=%d channels=%d" %
+              (args.frames_per_buffer, args.rate, args.channels))
+        for name, callback, fast in (('legacy', legacy_callback, False),
+                                     ('fast', fast_callback, True)):
+            result = run(p, args, callback, fast)
+            print("%-7s callbacks=%-6d cpu_load=%.4f  %.1f us/callback" %
+                  (name, result['callbacks'], result['cpu_load'],
+                   result['usec_per_callback']))
+    finally:
+        p.terminate()
+
+
+if __name__ == '__main__':
+    main()
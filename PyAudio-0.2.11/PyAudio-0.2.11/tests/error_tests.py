@@ -63,6 +63,79 @@ class PyAudioErrorTests(unittest.TestCase):
                                  input=True)
             stream.read(-1)
 
+    def test_error_read_into_readonly_buffer(self):
+        with self.assertRaises(TypeError):
+            stream = self.p.open(channels=1,
+                                 rate=44100,
+                                 format=pyaudio.paInt16,
+                                 input=True)
+            stream.read_into(b'\x00' * 8)
+
+    def test_error_read_into_buffer_too_small(self):
+        with self.assertRaises(ValueError):
+            stream = self.p.open(channels=1,
+                                 rate=44100,
+                                 format=pyaudio.paInt16,
+                                 input=True)
+            stream.read_into(bytearray(8), 5)
+
+    def test_error_write_more_frames_than_data(self):
+        with self.assertRaises(ValueError):
+            stream = self.p.open(channels=1,
+                                 rate=44100,
+                                 format=pyaudio.paInt16,
+                                 output=True)
+            stream.write(b'\x00' * 4, num_frames=3)
+
+    def test_error_drain_without_ring_buffer(self):
+        with self.assertRaises(ValueError):
+            stream = self.p.open(channels=1,
+                                 rate=44100,
+                                 format=pyaudio.paInt16,
+                                 input=True)
+            stream.drain(bytearray(8))
+
+    def test_error_ring_buffer_output_stream(self):
+        with self.assertRaises(ValueError):
+            self.p.open(channels=1,
+                        rate=44100,
+                        format=pyaudio.paInt16,
+                        output=True,
+                        ring_buffer_frames=1024)
+
+    def test_error_write_array_channel_mismatch(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest("write_array() requires NumPy")
+
+        with self.assertRaises(ValueError):
+            stream = self.p.open(channels=1,
+                                 rate=44100,
+                                 format=pyaudio.paInt16,
+                                 output=True)
+            stream.write_array(numpy.zeros((4, 2), dtype=numpy.int16))
+
+    def test_error_read_array_int24(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest("read_array() requires NumPy")
+
+        with self.assertRaises(ValueError):
+            stream = self.p.open(channels=1,
+                                 rate=44100,
+                                 format=pyaudio.paInt24,
+                                 input=True)
+            stream.read_array(4)
+
+    def test_error_snapshot_invalid_device_index(self):
+        snapshot = self.p.snapshot_devices()
+        with self.assertRaises(IOError):
+            snapshot.get_device_info_by_index(len(snapshot))
+        with self.assertRaises(KeyError):
+            snapshot.get_device_info_by_name('no such device')
+
     def test_invalid_attr_on_closed_stream(self):
         stream = self.p.open(channels=1,
                              rate=44100,
@@ -12,6 +12,8 @@ device. Use examples/system_info.py to identify the name of the loopback
 device.
 """
 
+import array
+import asyncio
 import math
 import struct
 import time
@@ -78,6 +80,25 @@ class PyAudioTests(unittest.TestCase):
         api_info = self.p.get_host_api_info_by_index(0)
         self.assertTrue(len(api_info.items()) > 0)
 
+    def test_device_snapshot(self):
+        """Device snapshot matches per-index device queries"""
+        snapshot = self.p.snapshot_devices()
+        self.assertIs(snapshot, self.p.snapshot_devices())
+        self.assertEqual(len(snapshot.host_apis), self.p.get_host_api_count())
+        self.assertEqual(len(snapshot), self.p.get_device_count())
+        for index, device in enumerate(snapshot):
+            self.assertEqual(dict(device),
+                             self.p.get_device_info_by_index(index))
+            self.assertEqual(
+                snapshot.get_device_info_by_name(device['name'],
+                                                 device['hostApi'])['name'],
+                device['name'])
+        with self.assertRaises(TypeError):
+            snapshot.devices[0]['name'] = 'changed'
+
+        self.p.invalidate_device_snapshot()
+        self.assertIsNot(snapshot, self.p.snapshot_devices())
+
     def test_input_output_blocking(self):
         """Test blocking-based record and playback."""
         rate = 44100 # frames per second
@@ -138,6 +159,155 @@ class PyAudioTests(unittest.TestCase):
             test_signal,
             len(freqs))
 
+    def test_input_output_blocking_read_into(self):
+        """Test blocking-based playback and record into a reused buffer."""
+        rate = 44100 # frames per second
+        width = 2    # bytes per sample
+        channels = 2
+        duration = 3 # seconds
+        frames_per_chunk = 1024
+
+        freqs = [130.81, 329.63, 440.0, 466.16, 587.33, 739.99]
+        test_signal = self.create_reference_signal(freqs, rate, width, duration)
+        audio_chunks = self.signal_to_chunks(
+            test_signal, frames_per_chunk, channels)
+
+        out_stream = self.p.open(
+            format=self.p.get_format_from_width(width),
+            channels=channels,
+            rate=rate,
+            output=True,
+            frames_per_buffer=frames_per_chunk,
+            output_device_index=self.loopback_output_idx)
+        in_stream = self.p.open(
+            format=self.p.get_format_from_width(width),
+            channels=channels,
+            rate=rate,
+            input=True,
+            frames_per_buffer=frames_per_chunk,
+            input_device_index=self.loopback_input_idx)
+
+        buf = bytearray(frames_per_chunk * channels * width)
+        captured = []
+        for chunk in audio_chunks + [b''] * 8:
+            if chunk:
+                out_stream.write(chunk)
+            self.assertEqual(in_stream.read_into(buf), frames_per_chunk)
+            captured.append(bytes(buf))
+
+        in_stream.stop_stream()
+        out_stream.stop_stream()
+
+        captured_signal = self.pcm16_to_numpy(b''.join(captured))
+        self.assert_pcm16_spectrum_nearly_equal(
+            rate,
+            captured_signal[::2],
+            test_signal,
+            len(freqs))
+
+    def test_input_output_blocking_buffer_write(self):
+        """Test blocking playback from memoryview slices of an array."""
+        rate = 44100 # frames per second
+        width = 2    # bytes per sample
+        channels = 2
+        duration = 3 # seconds
+        frames_per_chunk = 1024
+
+        freqs = [130.81, 329.63, 440.0, 466.16, 587.33, 739.99]
+        test_signal = self.create_reference_signal(freqs, rate, width, duration)
+        interleaved = array.array(
+            'h', [x for x in test_signal for _ in range(channels)])
+        samples_per_chunk = frames_per_chunk * channels
+        view = memoryview(interleaved)
+
+        out_stream = self.p.open(
+            format=self.p.get_format_from_width(width),
+            channels=channels,
+            rate=rate,
+            output=True,
+            frames_per_buffer=frames_per_chunk,
+            output_device_index=self.loopback_output_idx)
+        in_stream = self.p.open(
+            format=self.p.get_format_from_width(width),
+            channels=channels,
+            rate=rate,
+            input=True,
+            frames_per_buffer=frames_per_chunk,
+            input_device_index=self.loopback_input_idx)
+
+        captured = []
+        for offset in range(0, len(interleaved), samples_per_chunk):
+            out_stream.write(view[offset:offset + samples_per_chunk])
+            captured.append(in_stream.read(frames_per_chunk))
+        for i in range(8):
+            captured.append(in_stream.read(frames_per_chunk))
+
+        in_stream.stop_stream()
+        out_stream.stop_stream()
+
+        captured_signal = self.pcm16_to_numpy(b''.join(captured))
+        self.assert_pcm16_spectrum_nearly_equal(
+            rate,
+            captured_signal[::2],
+            test_signal,
+            len(freqs))
+
+    def test_input_output_blocking_arrays(self):
+        """Test blocking-based playback and record with NumPy arrays."""
+        rate = 44100 # frames per second
+        width = 2    # bytes per sample
+        channels = 2
+        duration = 3 # seconds
+        frames_per_chunk = 1024
+
+        freqs = [130.81, 329.63, 440.0, 466.16, 587.33, 739.99]
+        test_signal = self.create_reference_signal(freqs, rate, width, duration)
+        audio_chunks = self.signal_to_chunks(
+            test_signal, frames_per_chunk, channels)
+
+        out_stream = self.p.open(
+            format=self.p.get_format_from_width(width),
+            channels=channels,
+            rate=rate,
+            output=True,
+            frames_per_buffer=frames_per_chunk,
+            output_device_index=self.loopback_output_idx)
+        in_stream = self.p.open(
+            format=self.p.get_format_from_width(width),
+            channels=channels,
+            rate=rate,
+            input=True,
+            frames_per_buffer=frames_per_chunk,
+            input_device_index=self.loopback_input_idx)
+
+        captured = []
+        for chunk in audio_chunks:
+            out_stream.write_array(
+                numpy.frombuffer(chunk, dtype=numpy.int16).reshape(
+                    -1, channels))
+            captured.append(in_stream.read_array(frames_per_chunk))
+        # Capture a few more frames, since there is some lag.
+        for i in range(8):
+            captured.append(in_stream.read_array(frames_per_chunk))
+
+        in_stream.stop_stream()
+        out_stream.stop_stream()
+
+        self.assertEqual(captured[0].shape, (frames_per_chunk, channels))
+        self.assertEqual(captured[0].dtype, numpy.int16)
+
+        captured_signal = numpy.concatenate(captured)
+        self.assert_pcm16_spectrum_nearly_equal(
+            rate,
+            captured_signal[:, 0],
+            test_signal,
+            len(freqs))
+        self.assert_pcm16_spectrum_nearly_equal(
+            rate,
+            captured_signal[:, 1],
+            test_signal,
+            len(freqs))
+
     def test_input_output_callback(self):
         """Test callback-based record and playback."""
         rate = 44100 # frames per second
@@ -207,6 +377,211 @@ class PyAudioTests(unittest.TestCase):
             test_signal,
             len(freqs))
 
+    def test_input_output_fast_callback(self):
+        """Test fast-mode callback record and playback."""
+        rate = 44100 # frames per second
+        width = 2    # bytes per sample
+        channels = 2
+        duration = 1 # second
+        frames_per_chunk = 1024
+
+        freqs = [130.81, 329.63, 440.0, 466.16, 587.33, 739.99]
+        test_signal = self.create_reference_signal(freqs, rate, width, duration)
+        audio_chunks = self.signal_to_chunks(
+            test_signal, frames_per_chunk, channels)
+
+        state = {'count': 0}
+        def out_callback(_, out_buffer, frame_count, time_info, status):
+            if state['count'] >= len(audio_chunks):
+                return pyaudio.paComplete
+            chunk = audio_chunks[state['count']]
+            with memoryview(out_buffer) as out_view:
+                out_view[:len(chunk)] = chunk
+            state['count'] += 1
+            return pyaudio.paContinue
+
+        captured = []
+        def in_callback(in_buffer, _, frame_count, time_info, status):
+            # The buffer is only valid during the callback: copy it out.
+            captured.append(bytes(in_buffer))
+            return pyaudio.paContinue
+
+        out_stream = self.p.open(
+            format=self.p.get_format_from_width(width),
+            channels=channels,
+            rate=rate,
+            output=True,
+            frames_per_buffer=frames_per_chunk,
+            output_device_index=self.loopback_output_idx,
+            stream_callback=out_callback,
+            fast_callback=True)
+
+        in_stream = self.p.open(
+            format=self.p.get_format_from_width(width),
+            channels=channels,
+            rate=rate,
+            input=True,
+            frames_per_buffer=frames_per_chunk,
+            input_device_index=self.loopback_input_idx,
+            stream_callback=in_callback,
+            fast_callback=True)
+
+        in_stream.start_stream()
+        out_stream.start_stream()
+        time.sleep(duration + 1)
+        in_stream.stop_stream()
+        out_stream.stop_stream()
+
+        captured_signal = self.pcm16_to_numpy(b''.join(captured))
+        self.assert_pcm16_spectrum_nearly_equal(
+            rate,
+            captured_signal[::2],
+            test_signal,
+            len(freqs))
+        self.assert_pcm16_spectrum_nearly_equal(
+            rate,
+            captured_signal[1::2],
+            test_signal,
+            len(freqs))
+
+    def test_fast_callback_buffer_released(self):
+        """Fast-mode buffers cannot be used after the callback returns."""
+        kept = []
+        def out_callback(_, out_buffer, frame_count, time_info, status):
+            kept.append(out_buffer)
+            out_buffer[:] = b'\x00' * len(out_buffer)
+            return pyaudio.paComplete
+
+        out_stream = self.p.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=44100,
+            output=True,
+            frames_per_buffer=1024,
+            output_device_index=self.loopback_output_idx,
+            stream_callback=out_callback,
+            fast_callback=True)
+        time.sleep(0.5)
+        out_stream.stop_stream()
+        out_stream.close()
+
+        self.assertTrue(kept)
+        self.assertIsInstance(kept[0], memoryview)
+        with self.assertRaises(ValueError):
+            kept[0][0]
+
+    def test_input_output_async(self):
+        """Test asyncio-based record and playback."""
+        rate = 44100 # frames per second
+        width = 2    # bytes per sample
+        channels = 2
+        duration = 1 # second
+        frames_per_chunk = 1024
+
+        freqs = [130.81, 329.63, 440.0, 466.16, 587.33, 739.99]
+        test_signal = self.create_reference_signal(freqs, rate, width, duration)
+        audio_chunks = self.signal_to_chunks(
+            test_signal, frames_per_chunk, channels)
+
+        captured = []
+
+        async def record(in_stream):
+            async for chunk in in_stream:
+                captured.append(chunk)
+
+        async def play_and_record():
+            out_stream = self.p.open_async(
+                format=self.p.get_format_from_width(width),
+                channels=channels,
+                rate=rate,
+                output=True,
+                frames_per_buffer=frames_per_chunk,
+                output_device_index=self.loopback_output_idx)
+            in_stream = self.p.open_async(
+                format=self.p.get_format_from_width(width),
+                channels=channels,
+                rate=rate,
+                input=True,
+                frames_per_buffer=frames_per_chunk,
+                input_device_index=self.loopback_input_idx)
+            recorder = asyncio.ensure_future(record(in_stream))
+
+            for chunk in audio_chunks:
+                await out_stream.write(chunk)
+            await out_stream.flush()
+            await asyncio.sleep(0.5)
+
+            in_stream.close()
+            out_stream.close()
+            await recorder
+            return in_stream.stats(), out_stream.stats()
+
+        in_stats, out_stats = asyncio.run(play_and_record())
+
+        self.assertEqual(in_stats['overruns'], 0)
+        self.assertEqual(out_stats['underruns'], 0)
+
+        captured_signal = self.pcm16_to_numpy(b''.join(captured))
+        self.assert_pcm16_spectrum_nearly_equal(
+            rate,
+            captured_signal[::2],
+            test_signal,
+            len(freqs))
+
+    def test_input_ring_buffer_drain(self):
+        """Test playback with capture into the lock-free ring buffer."""
+        rate = 44100 # frames per second
+        width = 2    # bytes per sample
+        channels = 2
+        duration = 3 # seconds
+        frames_per_chunk = 1024
+
+        freqs = [130.81, 329.63, 440.0, 466.16, 587.33, 739.99]
+        test_signal = self.create_reference_signal(freqs, rate, width, duration)
+        audio_chunks = self.signal_to_chunks(
+            test_signal, frames_per_chunk, channels)
+
+        out_stream = self.p.open(
+            format=self.p.get_format_from_width(width),
+            channels=channels,
+            rate=rate,
+            output=True,
+            frames_per_buffer=frames_per_chunk,
+            output_device_index=self.loopback_output_idx)
+        in_stream = self.p.open(
+            format=self.p.get_format_from_width(width),
+            channels=channels,
+            rate=rate,
+            input=True,
+            frames_per_buffer=frames_per_chunk,
+            input_device_index=self.loopback_input_idx,
+            ring_buffer_frames=rate * 2)
+
+        captured = []
+        buf = bytearray(rate * width * channels)
+        for chunk in audio_chunks:
+            out_stream.write(chunk)
+            frames = in_stream.drain(buf)
+            captured.append(bytes(buf[:frames * width * channels]))
+        # Capture a few more frames, since there is some lag.
+        time.sleep(0.5)
+        frames = in_stream.drain(buf)
+        captured.append(bytes(buf[:frames * width * channels]))
+
+        stats = in_stream.ring_stats()
+        in_stream.stop_stream()
+        out_stream.stop_stream()
+
+        self.assertEqual(stats['overruns'], 0)
+        self.assertEqual(stats['available'], 0)
+
+        captured_signal = self.pcm16_to_numpy(b''.join(captured))
+        self.assert_pcm16_spectrum_nearly_equal(
+            rate,
+            captured_signal[::2],
+            test_signal,
+            len(freqs))
+
     def test_device_lock_gil_order(self):
         """Ensure no deadlock between Pa_{Open,Start,Stop}Stream and GIL."""
         # This test targets OSX/macOS CoreAudio, which seems to use
@@ -322,6 +697,34 @@ class PyAudioTests(unittest.TestCase):
         in_stream.stop_stream()
         out_stream.stop_stream()
 
+    def test_abort_stream(self):
+        """abort_stream() returns without playing the queued output."""
+        rate = 44100 # frames per second
+        width = 2    # bytes per sample
+        channels = 1
+        frames_per_chunk = 1024
+
+        out_stream = self.p.open(
+            format=self.p.get_format_from_width(width),
+            channels=channels,
+            rate=rate,
+            output=True,
+            frames_per_buffer=frames_per_chunk,
+            output_device_index=self.loopback_output_idx)
+        # Blocking write returns with up to a buffer's worth still queued
+        out_stream.write(b'\x00' * width * channels * rate // 2)
+
+        start = time.time()
+        out_stream.abort_stream()
+        self.assertLess(time.time() - start, 0.1)
+        self.assertTrue(out_stream.is_stopped())
+
+        # The stream can be restarted after an abort
+        out_stream.start_stream()
+        out_stream.write(b'\x00' * width * channels * frames_per_chunk)
+        out_stream.stop_stream()
+        out_stream.close()
+
     def test_get_stream_time_gil(self):
         """Ensure no deadlock between PA_GetStreamTime and GIL."""
         rate = 44100 # frames per second
@@ -14,14 +14,31 @@ socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
 
 # Initialize bridge
 bridge = EVABridge()
+# Stream partial transcripts to the UI while the user is speaking
+bridge.on_partial = lambda text: socketio.emit('partial_transcript', {'text': text})
+bridge.on_wake_word = lambda: socketio.emit('wake_word_detected', {'message': 'Yes, listening...'})
 is_listening = False
 listen_thread = None
 
+def deliver_response(command, result):
+    """Show the recognized command and its response, then speak it"""
+    print(f"🗣️ Command: {command}")
+    socketio.emit('speech_recognized', {'text': command})
+    print(f"🤖 Response: {result}")
+    socketio.emit('command_response', {'response': result})
+    # Queued on the TTS worker; an older response still waiting is replaced
+    bridge.speak(result, key='response')
+
 @app.route('/')
 def index():
     """Serve main page"""
     return render_template('index.html')
 
+@app.route('/api/audio_stats')
+def audio_stats():
+    """Live capture / noise-floor metrics for tuning"""
+    return jsonify(bridge.audio_stats())
+
 @socketio.on('connect')
 def handle_connect():
     """Handle client connection"""
@@ -53,68 +70,30 @@ def handle_start_voice():
         """Continuously listen for voice commands"""
         global is_listening
         
+        socketio.emit('listening_status', {'status': 'listening'})
+        
         while is_listening:
             try:
-                print("👂 Listening for speech...")
-                socketio.emit('listening_status', {'status': 'listening'})
+                # Cheap keyword spotting, then the command said with it.
+                # With a spotter, commands need the wake word: speech
+                # without it is no longer recognized (record templates
+                # with `python eva.py enroll`)
+                wake_command = bridge.next_command(timeout=1.0)
                 
-                # Listen for voice input
-                command = bridge.listen()
-                
-                if command and is_listening:
-                    print(f"🗣️ Heard: {command}")
-                    
-                    # Send what user said to frontend
-                    socketio.emit('speech_recognized', {'text': command})
-                    
-                    # Check if it's a wake word
-                    if "eva" in command.lower() or "hey eva" in command.lower():
-                        socketio.emit('wake_word_detected', {'message': 'Yes, listening...'})
-                        
-                        # Speak response
-                        threading.Thread(
-                            target=bridge.speak, 
-                            args=("Yes, I'm listening",), 
-                            daemon=True
-                        ).start()
-                        
-                        # Wait briefly and listen for actual command
-                        time.sleep(0.5)
-                        
-                        print("👂 Listening for actual command...")
-                        actual_command = bridge.listen()
-                        
-                        if actual_command and is_listening:
-                            print(f"🗣️ Command: {actual_command}")
-                            socketio.emit('speech_recognized', {'text': actual_command})
-                            
-                            # Process the command
-                            result = bridge.process_command(actual_command)
-                            
-                            if result:
-                                print(f"🤖 Response: {result}")
-                                socketio.emit('command_response', {'response': result})
-                                
-                                # Speak the response
-                                threading.Thread(
-                                    target=bridge.speak, 
-                                    args=(result,), 
-                                    daemon=True
-                                ).start()
+                # response is set when the command already ran from a
+                # partial transcript and the final one confirmed it
+                if wake_command and is_listening and wake_command.response is not None:
+                    deliver_response(wake_command.text, wake_command.response)
+                elif wake_command and is_listening:
+                    # Process the command
+                    result = bridge.process_command(wake_command.text)
                     
-                    else:
-                        # Direct command without wake word
-                        result = bridge.process_command(command)
-                        if result and result != "Sorry, I didn't understand that command. Please try again.":
-                            print(f"🤖 Response: {result}")
-                            socketio.emit('command_response', {'response': result})
-                            threading.Thread(
-                                target=bridge.speak, 
-                                args=(result,), 
-                                daemon=True
-                            ).start()
+                    if result:
+                        bridge.record_response(wake_command)
+                        deliver_response(wake_command.text, result)
                 
-                time.sleep(0.1)  # Small delay to prevent CPU overload
+                if wake_command:
+                    socketio.emit('listening_status', {'status': 'listening'})
                 
             except Exception as e:
                 print(f"❌ Voice loop error: {e}")
@@ -152,11 +131,7 @@ def handle_text_command(data):
             emit('command_response', {'response': result})
             
             # Speak response in background
-            threading.Thread(
-                target=bridge.speak, 
-                args=(result,), 
-                daemon=True
-            ).start()
+            bridge.speak(result, key='response')
             
     except Exception as e:
         print(f"❌ Text command error: {e}")
@@ -1,5 +1,10 @@
-import speech_recognition as sr
+import pyaudio
 
+audio = pyaudio.PyAudio()
+devices = audio.snapshot_devices()
+audio.terminate()
+
+print(devices)
 print("Available microphones:")
-for i, name in enumerate(sr.Microphone.list_microphone_names()):
-    print(f"{i}: {name}")
+for device in devices.input_devices():
+    print(f"{device['index']}: {device['name']}")
@@ -1,10 +1,30 @@
-import speech_recognition as sr
+import sys
+import os
+
+# `python eva.py transcribe ...` runs batch transcription and
+# `python eva.py enroll ...` records wake word templates instead of the
+# assistant. They run as their own process so that worker processes (which
+# re-import the main module on Windows) do not open the microphone or TTS.
+TOOLS = {"transcribe": "modules.batch_transcribe",
+         "enroll": "modules.wake_word"}
+if __name__ == "__main__" and sys.argv[1:2] and sys.argv[1] in TOOLS:
+    import subprocess
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [backend_dir, env.get("PYTHONPATH")]))
+    sys.exit(subprocess.call(
+        [sys.executable, "-m", TOOLS[sys.argv[1]]] + sys.argv[2:],
+        env=env))
+
 import pyttsx3
 import datetime
-import sys
 import webbrowser
-import os
 import subprocess
+from modules.audio_capture import MicrophoneStream
+from modules.noise_floor import NoiseFloorTracker
+from modules.vad import VADSegmenter, capture_utterance
+from modules.recognizers import load_backend
 
 # ---------------------------------------------------------
 #  TEXT-TO-SPEECH
@@ -31,30 +51,43 @@ def speak(text):
 # ---------------------------------------------------------
 #  LISTEN FUNCTION
 # ---------------------------------------------------------
+microphone = MicrophoneStream()
+noise_floor = NoiseFloorTracker()
+microphone.add_listener(noise_floor.update)
+# 1s of silence ends the phrase, as pause_threshold did before; kept
+# between calls so speech read past the end of a phrase is not lost
+segmenter = VADSegmenter(noise_floor, hangover_ms=1000, max_utterance_s=10)
+stt = load_backend()
+
 def listen():
-    recognizer = sr.Recognizer()
+    if stt is None:
+        print("❌ No speech recognition backend available")
+        return ""
 
     try:
-        with sr.Microphone() as source:
-            print("\n🎤 Listening... (Speak now)")
-            recognizer.adjust_for_ambient_noise(source, duration=0.5)
-            recognizer.pause_threshold = 1
-
-            try:
-                audio = recognizer.listen(source, timeout=5, phrase_time_limit=10)
-                print("🔍 Recognizing...")
-                query = recognizer.recognize_google(audio, language='en-US')
-                print(f"✓ You said: {query}\n")
-                return query.lower()
-
-            except sr.WaitTimeoutError:
-                return ""
-            except sr.UnknownValueError:
-                print("❌ Could not understand audio")
-                return ""
-            except sr.RequestError as e:
-                print(f"❌ Recognition error: {e}")
+        if not microphone.is_running:
+            microphone.start()
+
+        print("\n🎤 Listening... (Speak now)")
+        session = stt.start_session()
+        try:
+            pcm = capture_utterance(
+                microphone, segmenter, timeout=5,
+                on_event=lambda event: event.audio and
+                session.accept(event.audio))
+            if pcm is None:
                 return ""
+            print("🔍 Recognizing...")
+            query, session = session.finish().text, None
+        finally:
+            # Hand a pooled decoder back when nothing was decoded
+            if session is not None:
+                session.cancel()
+        if not query:
+            print("❌ Could not understand audio")
+            return ""
+        print(f"✓ You said: {query}\n")
+        return query.lower()
 
     except Exception as e:
         print(f"❌ Microphone error: {e}")
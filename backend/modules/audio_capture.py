@@ -0,0 +1,232 @@
+"""
+Audio Capture - long-lived microphone stream feeding a PCM ring buffer
+"""
+import collections
+import threading
+import time
+
+import pyaudio
+
+SAMPLE_RATE = 16000   # Hz, what the recognizers want
+SAMPLE_WIDTH = 2      # bytes (paInt16)
+CHANNELS = 1
+CHUNK = 1024          # frames per read, 64 ms at 16 kHz
+
+
+class AudioRingBuffer:
+    """Bounded FIFO of PCM chunks between the capture thread and listeners"""
+
+    def __init__(self, max_chunks):
+        self.max_chunks = max_chunks
+        self._chunks = collections.deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, chunk):
+        """Append a chunk, dropping the oldest one when the buffer is full"""
+        with self._cond:
+            if len(self._chunks) >= self.max_chunks:
+                self._chunks.popleft()
+                self.dropped += 1
+            self._chunks.append(chunk)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """
+        Pop the oldest chunk, waiting for one if the buffer is empty
+
+        Returns:
+            bytes: PCM chunk, or None on timeout / after close()
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._chunks or self._closed,
+                                       timeout):
+                return None
+            if not self._chunks:
+                return None
+            return self._chunks.popleft()
+
+    def clear(self):
+        """Discard everything buffered so far"""
+        with self._cond:
+            self._chunks.clear()
+
+    def close(self):
+        """Wake up any waiting reader; get() returns None from now on"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def reopen(self):
+        with self._cond:
+            self._closed = False
+
+    def __len__(self):
+        with self._cond:
+            return len(self._chunks)
+
+
+class MicrophoneStream:
+    """
+    Owns one PortAudio input stream for the lifetime of the process and
+    copies every chunk it captures into an AudioRingBuffer, so nothing is
+    lost between utterances and listening never waits on a device open.
+    """
+
+    def __init__(self, device_index=None, rate=SAMPLE_RATE, chunk=CHUNK,
+                 buffer_seconds=10, driver_ring_seconds=2):
+        self.device_index = device_index
+        self.rate = rate
+        self.chunk = chunk
+        # PortAudio-side ring filled without the GIL; 0 = blocking reads
+        self.driver_ring_seconds = driver_ring_seconds
+        self.ring = AudioRingBuffer(
+            max(1, int(buffer_seconds * rate / chunk)))
+        self._audio = None
+        self._stream = None
+        self._thread = None
+        self._running = False
+        self._listeners = []
+        self._ring_mode = False
+        self.chunks_captured = 0
+        self.started_at = None
+
+    @property
+    def is_running(self):
+        return self._running
+
+    def add_listener(self, listener):
+        """Call ``listener(chunk)`` from the capture thread for every chunk"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def start(self):
+        """Open the device once and start the capture thread"""
+        if self._running:
+            return
+
+        self._audio = pyaudio.PyAudio()
+        try:
+            self._stream = self._open_stream()
+        except Exception:
+            self._audio.terminate()
+            self._audio = None
+            raise
+
+        self.ring.reopen()
+        self._running = True
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._capture_loop,
+                                        name="eva-capture", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop capturing and release the device"""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        if self._stream is not None:
+            try:
+                self._stream.stop_stream()
+                self._stream.close()
+            except Exception as e:
+                print(f"Capture close error: {e}")
+            self._stream = None
+        if self._audio is not None:
+            self._audio.terminate()
+            self._audio = None
+        self.ring.close()
+
+    def driver_stats(self):
+        """
+        PortAudio ring buffer counters (overruns, dropped frames...)
+
+        Returns:
+            dict: Stream.ring_stats(), or None when using blocking reads
+        """
+        if not self._ring_mode or self._stream is None:
+            return None
+        try:
+            return self._stream.ring_stats()
+        except Exception:
+            return None
+
+    def _open_stream(self):
+        """
+        Prefer the GIL-free ring buffer capture of our PyAudio build; fall
+        back to plain blocking reads on a stock PyAudio
+        """
+        kwargs = dict(format=pyaudio.paInt16,
+                      channels=CHANNELS,
+                      rate=self.rate,
+                      input=True,
+                      input_device_index=self.device_index,
+                      frames_per_buffer=self.chunk)
+        self._ring_mode = False
+        if self.driver_ring_seconds:
+            try:
+                stream = self._audio.open(
+                    ring_buffer_frames=int(self.driver_ring_seconds *
+                                           self.rate),
+                    **kwargs)
+                self._ring_mode = True
+                return stream
+            except TypeError:
+                print("⚠️ PyAudio without ring buffer support, "
+                      "using blocking reads")
+        return self._audio.open(**kwargs)
+
+    def _capture_loop(self):
+        if self._ring_mode:
+            self._drain_loop()
+            return
+
+        while self._running:
+            try:
+                data = self._stream.read(self.chunk,
+                                         exception_on_overflow=False)
+            except Exception as e:
+                print(f"❌ Capture error: {e}")
+                time.sleep(0.1)
+                continue
+
+            self._dispatch(data)
+
+    def _drain_loop(self):
+        """Empty the PortAudio ring in bulk and re-slice it into chunks"""
+        chunk_bytes = self.chunk * SAMPLE_WIDTH * CHANNELS
+        buf = bytearray(int(self.driver_ring_seconds * self.rate) *
+                        SAMPLE_WIDTH * CHANNELS)
+        pending = bytearray()
+        poll = self.chunk / self.rate / 2
+
+        while self._running:
+            try:
+                frames = self._stream.drain(buf)
+            except Exception as e:
+                print(f"❌ Capture error: {e}")
+                time.sleep(0.1)
+                continue
+
+            if not frames:
+                time.sleep(poll)
+                continue
+
+            pending += buf[:frames * SAMPLE_WIDTH * CHANNELS]
+            while len(pending) >= chunk_bytes:
+                self._dispatch(bytes(pending[:chunk_bytes]))
+                del pending[:chunk_bytes]
+
+    def _dispatch(self, data):
+        self.chunks_captured += 1
+        self.ring.put(data)
+        for listener in list(self._listeners):
+            try:
+                listener(data)
+            except Exception as e:
+                print(f"Capture listener error: {e}")
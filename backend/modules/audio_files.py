@@ -0,0 +1,118 @@
+"""
+Audio Files - read WAV / AIFF recordings as mono 16-bit PCM
+"""
+import os
+import sys
+import wave
+
+import numpy as np
+
+from modules.audio_capture import SAMPLE_RATE
+
+try:
+    import aifc_custom
+except ImportError:
+    # Lives at the repository root, next to backend/
+    sys.path.append(os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+    import aifc_custom
+
+AUDIO_EXTENSIONS = (".wav", ".aif", ".aiff", ".aifc")
+
+
+def _to_mono(data, dtype, channels, rate, target_rate):
+    samples = np.frombuffer(data, dtype=dtype).astype(np.float32)
+    if dtype.itemsize == 1:
+        samples = (samples - 128) * 256         # 8-bit WAV is unsigned
+    elif dtype.itemsize == 4:
+        samples = samples / 65536
+    if channels > 1:
+        samples = samples[:len(samples) - len(samples) % channels]
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    if rate != target_rate and len(samples):
+        duration = len(samples) / rate
+        positions = np.arange(int(duration * target_rate)) * rate / target_rate
+        samples = np.interp(positions, np.arange(len(samples)), samples)
+    return np.clip(samples, -32768, 32767).astype(np.int16).tobytes()
+
+
+def read_audio(path, rate=SAMPLE_RATE):
+    """
+    Read a WAV or AIFF(-C) file (detected from its header) as mono 16-bit
+    PCM at ``rate``
+
+    Returns:
+        bytes: PCM samples
+    """
+    with open(path, "rb") as f:
+        is_aiff = f.read(4) == b"FORM"
+
+    if not is_aiff:
+        with wave.open(path, "rb") as f:
+            width = f.getsampwidth()
+            dtype = np.dtype({1: "u1", 2: "<i2", 4: "<i4"}[width])
+            return _to_mono(f.readframes(f.getnframes()), dtype,
+                            f.getnchannels(), f.getframerate(), rate)
+
+    with aifc_custom.open(path, "rb") as f:
+        width = f.getsampwidth()
+        # Uncompressed (and byte-swapped 'sowt') data comes out big-endian,
+        # decoded u-law / A-law / ADPCM comes out native 16-bit. Some
+        # writers tag them in upper case ('SOWT')
+        order = ">" if f.getcomptype().lower() in (b"none", b"sowt") \
+            else "="
+        dtype = np.dtype({1: "i1", 2: order + "i2", 4: order + "i4"}[width])
+        data = f.readframes(f.getnframes())
+        if width == 1:
+            data = (np.frombuffer(data, dtype=np.int8).astype(np.int16)
+                    * 256).tobytes()
+            dtype = np.dtype("=i2")
+        return _to_mono(data, dtype, f.getnchannels(), f.getframerate(),
+                        rate)
+
+
+def write_wav(path, pcm, rate=SAMPLE_RATE):
+    """Write mono 16-bit PCM as a WAV file"""
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(pcm)
+
+
+def wav_complete(path):
+    """
+    Whether ``path`` is a finished WAV file: the header parses and all the
+    frames it declares are there. Writers leave the sizes at zero (or a
+    placeholder) until they close the file.
+
+    Returns:
+        bool: False while it is still being written, and for AIFF
+    """
+    try:
+        size = os.path.getsize(path)
+        with open(path, "rb") as raw, wave.open(raw, "rb") as f:
+            frames = f.getnframes()
+            data_bytes = frames * f.getsampwidth() * f.getnchannels()
+            # wave stops right after the data chunk's header
+            return frames > 0 and size >= raw.tell() + data_bytes
+    except (OSError, EOFError, wave.Error):
+        return False
+
+
+def find_audio_files(inputs):
+    """
+    Expand files and directories (searched recursively) into audio paths
+
+    Returns:
+        list: sorted file paths
+    """
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                paths.extend(os.path.join(root, name) for name in files
+                             if name.lower().endswith(AUDIO_EXTENSIONS))
+        else:
+            paths.append(item)
+    return sorted(paths)
@@ -0,0 +1,134 @@
+"""
+Audio Player - long-lived PortAudio output stream for pre-rendered speech
+"""
+import threading
+
+import pyaudio
+
+PLAYBACK_RATE = 22050       # Hz, what the TTS engines render at
+PLAYBACK_CHUNK = 512        # frames per write, ~23 ms at 22.05 kHz
+
+
+class AudioPlayer:
+    """
+    Keeps one output stream open (and started) for the whole session, so
+    playing cached audio is a buffer write rather than a device open.
+
+    Every chunk written is passed to the listeners (the reference signal
+    for echo / barge-in detection). When playback is cut short, audio
+    still queued in the device is discarded and ``on_stopped`` is called.
+    """
+
+    def __init__(self, rate=PLAYBACK_RATE, chunk=PLAYBACK_CHUNK,
+                 device_index=None):
+        self.rate = rate
+        self.chunk = chunk
+        self.device_index = device_index
+        self._audio = None
+        self._stream = None
+        self._lock = threading.Lock()
+        self._listeners = []
+        self.on_stopped = None      # callback() after playback is cut short
+        self.chunks_played = 0
+        self.aborts = 0
+
+    @property
+    def is_running(self):
+        return self._stream is not None
+
+    def add_listener(self, listener):
+        """Call ``listener(chunk)`` from the playing thread before each write"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def start(self):
+        """Open the device once (no-op if already open)"""
+        if self._stream is not None:
+            return
+        self._audio = pyaudio.PyAudio()
+        try:
+            self._stream = self._audio.open(
+                format=pyaudio.paInt16,
+                channels=1,
+                rate=self.rate,
+                output=True,
+                output_device_index=self.device_index,
+                frames_per_buffer=self.chunk)
+        except Exception:
+            self._audio.terminate()
+            self._audio = None
+            raise
+
+    def stop(self):
+        """Close the stream and release the device"""
+        with self._lock:
+            if self._stream is not None:
+                try:
+                    self._stream.stop_stream()
+                    self._stream.close()
+                except Exception as e:
+                    print(f"Playback close error: {e}")
+                self._stream = None
+            if self._audio is not None:
+                self._audio.terminate()
+                self._audio = None
+
+    def play(self, pcm, should_stop=None, on_start=None):
+        """
+        Write mono 16-bit PCM to the stream one chunk at a time
+
+        Args:
+            should_stop: optional callable checked between chunks; playback
+                ends early when it returns True
+            on_start: optional callback() right before the first write
+
+        Returns:
+            bool: True if all of ``pcm`` was played
+        """
+        self.start()
+        step = self.chunk * 2
+        with self._lock:
+            for offset in range(0, len(pcm), step):
+                if should_stop is not None and should_stop():
+                    self._discard()
+                    if self.on_stopped is not None:
+                        self.on_stopped()
+                    return False
+                if offset == 0 and on_start is not None:
+                    on_start()
+                chunk = pcm[offset:offset + step]
+                # Published before the write: it cannot be heard earlier
+                for listener in list(self._listeners):
+                    try:
+                        listener(chunk)
+                    except Exception as e:
+                        print(f"Playback listener error: {e}")
+                self._stream.write(chunk, exception_on_underflow=False)
+                self.chunks_played += 1
+        return True
+
+    def _discard(self):
+        """
+        Drop what the device has queued so playback stops now; needs the
+        abort_stream() of our PyAudio build (a stock one lets it drain)
+        """
+        abort = getattr(self._stream, 'abort_stream', None)
+        if abort is None:
+            return
+        try:
+            abort()
+            self._stream.start_stream()
+            self.aborts += 1
+        except Exception as e:
+            print(f"Playback abort error: {e}")
+
+    def stats(self):
+        return {
+            'running': self.is_running,
+            'rate': self.rate,
+            'chunks_played': self.chunks_played,
+            'aborts': self.aborts,
+        }
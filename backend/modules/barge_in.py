@@ -0,0 +1,187 @@
+"""
+Barge-In - stop EVA's speech as soon as the user talks over it
+
+The AudioPlayer publishes every chunk it writes as a reference signal.
+While that reference is live, each captured frame is compared with the
+echo it predicts: a frame well above both the noise threshold and the
+expected echo of EVA's own voice is the user talking (double talk), and
+a short run of them interrupts playback.
+"""
+import collections
+import threading
+import time
+
+import numpy as np
+
+from modules.audio_capture import SAMPLE_RATE
+from modules.noise_floor import chunk_rms
+from modules.recognition_race import LatencyHistogram
+from modules.vad import frame_features
+
+# Onset-to-stop buckets; the target is tens of milliseconds
+BARGE_IN_BUCKETS_MS = (25, 50, 75, 100, 150, 250, 500)
+
+
+class BargeInDetector:
+    """
+    Geigel-style double-talk detector with a learned echo gain.
+
+    The echo expected in a frame is the loudest reference level of the
+    last ``echo_window_s`` (covering output and acoustic delay) times
+    ``echo_gain``, which follows the mic / reference ratio while only EVA
+    is talking. It rises by at most ``gain_attack`` per frame, so the
+    onset of the user's voice (not yet ``margin_db`` above the echo)
+    does not teach it to expect the user. ``hold_frames`` frames in a row more than ``margin_db``
+    above it (and above the noise threshold) call ``on_barge_in``.
+
+    Register ``reference`` as an AudioPlayer listener, ``process`` as a
+    MicrophoneStream listener and ``playback_stopped`` as the player's
+    on_stopped callback. ``on_barge_in`` may return False when nothing was
+    speaking after all (the echo tail of a finished utterance).
+    """
+
+    def __init__(self, noise_floor, on_barge_in=None, rate=SAMPLE_RATE,
+                 frame_ms=20, margin_db=6.0, hold_frames=2,
+                 echo_window_s=0.4, tail_s=0.5, initial_gain=0.5,
+                 gain_decay=0.99, gain_attack=1.02, write_gap_s=0.05):
+        self.noise_floor = noise_floor
+        self.on_barge_in = on_barge_in      # callback(), capture thread
+        self.rate = rate
+        self.frame_samples = int(rate * frame_ms / 1000)
+        self.margin = 10 ** (margin_db / 20)
+        self.hold_frames = hold_frames
+        self.echo_window_s = echo_window_s
+        self.tail_s = tail_s        # echo still expected after playback
+        self.write_gap_s = write_gap_s  # longer without a write = silent
+        self.gain_decay = gain_decay
+        self.gain_attack = gain_attack
+        self.echo_gain = initial_gain
+        self._reference = collections.deque()   # (time written, rms)
+        self._lock = threading.Lock()
+        self._run = 0               # double-talk frames in a row
+        self._run_start = None
+        self._triggered = False     # once per stretch of playback
+        self._onset = None          # onset of the barge-in being stopped
+        # time.monotonic() the user started talking over the latest
+        # barge-in (set before on_barge_in is called)
+        self.last_onset = None
+        self.barge_ins = 0
+        self.onset_to_stop = LatencyHistogram(BARGE_IN_BUCKETS_MS)
+
+    # ---------------------------
+    # PLAYBACK SIDE
+    # ---------------------------
+    def reference(self, pcm):
+        """Record the level of a chunk about to be written to the output"""
+        now = time.monotonic()
+        with self._lock:
+            self._reference.append((now, chunk_rms(pcm)))
+            while now - self._reference[0][0] > \
+                    self.echo_window_s + self.tail_s:
+                self._reference.popleft()
+
+    def playback_stopped(self):
+        """Playback was cut short; completes the onset-to-stop timing"""
+        with self._lock:
+            onset, self._onset = self._onset, None
+        if onset is not None:
+            self._record_stop(onset)
+
+    def _record_stop(self, onset):
+        latency = time.monotonic() - onset
+        self.onset_to_stop.record(latency)
+        print(f"⏱️ Barge-in onset to playback stop: {latency * 1000:.0f} ms")
+
+    @property
+    def playing(self):
+        with self._lock:
+            return bool(self._reference) and \
+                time.monotonic() - self._reference[-1][0] <= self.tail_s
+
+    # ---------------------------
+    # CAPTURE SIDE
+    # ---------------------------
+    def process(self, chunk):
+        """Check one captured chunk for the user talking over EVA"""
+        now = time.monotonic()
+        with self._lock:
+            if not self._reference or \
+                    now - self._reference[-1][0] > self.tail_s:
+                # EVA is silent: nothing to barge in on
+                self._run = 0
+                self._triggered = False
+                self._onset = None
+                return
+            reference = list(self._reference)
+        times = np.array([t for t, _ in reference])
+        levels = np.array([rms for _, rms in reference])
+
+        samples = np.frombuffer(chunk[:len(chunk) - len(chunk) % 2],
+                                dtype=np.int16)
+        rms, _ = frame_features(samples, self.frame_samples)
+        frame_s = self.frame_samples / self.rate
+        start = now - len(samples) / self.rate
+        threshold = self.noise_floor.energy_threshold
+
+        for i, level in enumerate(rms):
+            t = start + i * frame_s
+            window = (times >= t - self.echo_window_s) & \
+                (times <= t + frame_s)
+            echo = levels[window].max() if window.any() else 0.0
+            if level > threshold and level > self.echo_gain * echo * \
+                    self.margin:
+                if self._run == 0:
+                    self._run_start = t
+                self._run += 1
+                if self._run >= self.hold_frames and not self._triggered:
+                    self._trigger(self._run_start, now)
+                continue
+            self._run = 0
+            if echo > 0 and level > threshold:
+                # Only EVA is audible (as far as we can tell): track how
+                # loud her echo comes back, slowly in both directions
+                self.echo_gain = max(
+                    self.echo_gain * self.gain_decay,
+                    min(float(level / echo),
+                        self.echo_gain * self.gain_attack))
+
+    def _trigger(self, onset, now):
+        self._triggered = True
+        self.last_onset = onset
+        with self._lock:
+            # Set first: playback may stop before the callback returns
+            self._onset = onset
+        if self.on_barge_in:
+            try:
+                interrupted = self.on_barge_in()
+            except Exception as e:
+                print(f"Barge-in callback error: {e}")
+                interrupted = False
+            if interrupted is False:
+                with self._lock:
+                    self._onset = None
+                return
+        self.barge_ins += 1
+        print("✋ Barge-in: user speech over playback")
+        with self._lock:
+            # Between chunks (next one still rendering) the output is
+            # already silent and playback_stopped() will not be called
+            silent = self._onset is not None and \
+                now - self._reference[-1][0] > self.write_gap_s
+            if silent:
+                self._onset = None
+        if silent:
+            self._record_stop(onset)
+
+    def stats(self):
+        """
+        Returns:
+            dict: barge-in count, learned echo gain and onset-to-stop
+            latency
+        """
+        return {
+            'playing': self.playing,
+            'barge_ins': self.barge_ins,
+            'echo_gain': round(self.echo_gain, 3),
+            'onset_to_stop': self.onset_to_stop.stats(),
+        }
@@ -0,0 +1,233 @@
+"""
+Batch Transcribe - run recognition over recorded WAV / AIFF files
+
+    python eva.py transcribe recordings/ -o results.jsonl -j 4
+
+Each file is resampled to 16 kHz mono, cut into utterances with the same
+noise floor tracker and VAD as live capture, and decoded in a process
+pool where every worker loads its own copy of the model once. One JSON
+line is written per file, and the overall real-time factor (wall clock /
+audio duration) is printed at the end.
+"""
+import argparse
+import concurrent.futures
+import json
+import os
+import sys
+import time
+
+from modules.audio_capture import SAMPLE_RATE, SAMPLE_WIDTH
+from modules.audio_files import find_audio_files, read_audio
+from modules.noise_floor import NoiseFloorTracker
+from modules.recognizers import load_backend
+from modules.vad import SPEECH_END, SPEECH_START, VADSegmenter
+
+# Set in each worker by _init_worker()
+_backend = None
+
+
+# ---------------------------
+# SEGMENTING
+# ---------------------------
+def segment_utterances(pcm, segmenter=None):
+    """
+    Cut a recording into utterances the way live capture does, feeding
+    one VAD frame at a time so boundaries are frame-accurate
+
+    Returns:
+        list: (start_seconds, end_seconds, pcm) tuples
+    """
+    noise_floor = NoiseFloorTracker()
+    segmenter = segmenter or VADSegmenter(noise_floor, hangover_ms=600,
+                                          max_utterance_s=15)
+    step = segmenter.frame_bytes
+    bytes_per_second = SAMPLE_RATE * SAMPLE_WIDTH
+    segments = []
+    audio = []
+
+    for offset in range(0, len(pcm), step):
+        frame = pcm[offset:offset + step]
+        noise_floor.update(frame)
+        for event in segmenter.process(frame):
+            if event.kind == SPEECH_END:
+                end = offset + len(frame)
+                data = b"".join(audio)
+                segments.append(((end - len(data)) / bytes_per_second,
+                                 end / bytes_per_second, data))
+                audio = []
+                continue
+            if event.kind == SPEECH_START:
+                audio = []
+            audio.append(event.audio)
+
+    if segmenter.in_speech and audio:
+        data = b"".join(audio)
+        segments.append(((len(pcm) - len(data)) / bytes_per_second,
+                         len(pcm) / bytes_per_second, data))
+    return segments
+
+
+# ---------------------------
+# WORKERS
+# ---------------------------
+def _init_worker(backend_name, grammar):
+    global _backend
+    _backend = load_backend((backend_name,), grammar)
+    if _backend is None:
+        raise RuntimeError(f"Speech backend {backend_name} unavailable")
+
+
+def _worker_ready():
+    return _backend is not None
+
+
+def transcribe_file(path):
+    """
+    Decode one file with the worker's backend
+
+    Returns:
+        dict: JSON-serialisable result (with 'error' if it failed)
+    """
+    started = time.monotonic()
+    try:
+        pcm = read_audio(path)
+    except Exception as e:
+        return {'file': path, 'error': f"{type(e).__name__}: {e}"}
+    duration = len(pcm) / (SAMPLE_RATE * SAMPLE_WIDTH)
+    read_seconds = time.monotonic() - started
+
+    segments = []
+    decode_started = time.monotonic()
+    try:
+        for start, end, audio in segment_utterances(pcm):
+            result = _backend.recognize(audio)
+            segments.append({
+                'start': round(start, 3),
+                'end': round(end, 3),
+                'text': result.text,
+                'confidence': round(result.confidence, 3),
+                'backend': result.backend,
+                'latency': round(result.latency, 3),
+            })
+    except Exception as e:
+        return {'file': path, 'duration': round(duration, 3),
+                'error': f"{type(e).__name__}: {e}"}
+    decode_seconds = time.monotonic() - decode_started
+
+    return {
+        'file': path,
+        'duration': round(duration, 3),
+        'text': " ".join(s['text'] for s in segments if s['text']),
+        'segments': segments,
+        'read_seconds': round(read_seconds, 3),
+        'decode_seconds': round(decode_seconds, 3),
+        'rtf': round(decode_seconds / duration, 4) if duration else None,
+        'worker': os.getpid(),
+    }
+
+
+def transcribe_files(paths, output, workers=None, backend="vosk",
+                     grammar=None):
+    """
+    Transcribe ``paths`` in a process pool, writing one JSON line per file
+    to ``output`` (a text file object) as results come in
+
+    Raises:
+        RuntimeError: if the backend cannot be loaded (checked with a
+            first task, so it is reported once instead of per file)
+
+    Returns:
+        dict: files, failed, audio_seconds, wall_seconds and rtf
+    """
+    started = time.monotonic()
+    audio_seconds = 0.0
+    failed = 0
+    # Only the workers load the model: spawn-started ones (Windows) would
+    # not inherit a copy loaded here anyway
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker,
+            initargs=(backend, grammar)) as pool:
+        try:
+            pool.submit(_worker_ready).result()
+        except concurrent.futures.BrokenExecutor as e:
+            raise RuntimeError(f"Speech backend {backend} unavailable") \
+                from e
+        futures = {pool.submit(transcribe_file, path): path
+                   for path in paths}
+        for done, future in enumerate(
+                concurrent.futures.as_completed(futures), 1):
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker died (e.g. BrokenProcessPool)
+                result = {'file': futures[future],
+                          'error': f"{type(e).__name__}: {e}"}
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+            if 'error' in result:
+                failed += 1
+                print(f"❌ {result['file']}: {result['error']}",
+                      file=sys.stderr)
+            else:
+                audio_seconds += result['duration']
+            print(f"[{done}/{len(paths)}] {result['file']}", file=sys.stderr)
+
+    wall_seconds = time.monotonic() - started
+    return {
+        'files': len(paths),
+        'failed': failed,
+        'audio_seconds': round(audio_seconds, 1),
+        'wall_seconds': round(wall_seconds, 1),
+        'rtf': round(wall_seconds / audio_seconds, 4) if audio_seconds
+        else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="eva.py transcribe",
+        description="Transcribe recorded WAV / AIFF files to JSONL")
+    parser.add_argument("inputs", nargs="+",
+                        help="audio files or directories")
+    parser.add_argument("-o", "--output", default="-",
+                        help="JSONL output file (default: stdout)")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--backend", default="vosk",
+                        help="speech backend in every worker")
+    parser.add_argument("--grammar", action="store_true",
+                        help="decode against the command grammar, "
+                             "as the assistant does")
+    args = parser.parse_args(argv)
+
+    paths = find_audio_files(args.inputs)
+    if not paths:
+        print("❌ No audio files found", file=sys.stderr)
+        return 1
+
+    grammar = None
+    if args.grammar:
+        from modules.command_handler import command_grammar
+        grammar = command_grammar()
+
+    output = sys.stdout if args.output == "-" else \
+        open(args.output, "w", encoding="utf-8")
+    try:
+        summary = transcribe_files(paths, output, args.workers,
+                                   args.backend, grammar)
+    except RuntimeError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(f"✅ {summary['files']} files ({summary['failed']} failed), "
+          f"{summary['audio_seconds']}s of audio in "
+          f"{summary['wall_seconds']}s, RTF {summary['rtf']}",
+          file=sys.stderr)
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
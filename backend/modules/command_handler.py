@@ -1,4 +1,8 @@
+import collections
+import concurrent.futures
 import os
+import threading
+import time
 from modules.open_camera import open_camera
 from modules.get_time_date import get_time, get_date
 from modules.open_website import open_website
@@ -7,111 +11,354 @@ try:
 except:
     universal_open = None
 
+# phrases: substrings that trigger the command (checked in registration order)
+# handler: callable(command) -> response string
+# examples: full utterances used to build the recognizer grammar
+# early: may be dispatched from a partial transcript (see EarlyDispatcher)
+# responses: what the handler says, as format strings whose fields are
+#     slot types from tts_templates ("The current time is {time}")
+Command = collections.namedtuple("Command",
+                                 "phrases handler examples early responses")
+
+COMMANDS = []
+
+
+def command(*phrases, examples=None, early=True, responses=()):
+    """
+    Register a handler for commands containing any of ``phrases``.
+
+    Commands are tried in the order they are registered, first match wins.
+    ``examples`` are the spoken forms added to the recognition grammar
+    (defaults to the phrases themselves). Pass ``early=False`` for
+    commands that must wait for the final transcript. ``responses`` are
+    the handler's known replies, prerendered by the TTS cache.
+    """
+    def register(handler):
+        COMMANDS.append(Command(phrases, handler, tuple(examples or phrases),
+                                early, tuple(responses)))
+        return handler
+    return register
 
-def handle_command(command):
-    """Main backend command handler. Must return a string response."""
-    
-    if not command:
-        return "No command detected."
 
+def match_command(command):
+    """
+    Returns:
+        Command: the first registered command ``command`` triggers, or None
+    """
     command = command.lower()
+    for cmd in COMMANDS:
+        if any(phrase in command for phrase in cmd.phrases):
+            return cmd
+    return None
 
-    # ---------------------------
-    # GREETINGS
-    # ---------------------------
-    if "hello" in command or "hi" in command:
-        return "Hello! How can I assist you?"
 
-    # ---------------------------
-    # TIME & DATE
-    # ---------------------------
-    if "time" in command:
-        return f"The current time is {get_time()}"
+def early_match(partial):
+    """
+    Command that a partial transcript already names unambiguously: it
+    matches a command registered with early=True, and no registered
+    phrase or example is a longer continuation of it ("open" could still
+    become "open notepad", "open youtube" cannot become anything else)
 
-    if "date" in command:
-        return f"Today's date is {get_date()}"
+    Returns:
+        Command: or None
+    """
+    partial = partial.lower().strip()
+    cmd = match_command(partial) if partial else None
+    if cmd is None or not cmd.early:
+        return None
+    for other in COMMANDS:
+        for phrase in other.phrases + other.examples:
+            if phrase != partial and phrase.startswith(partial):
+                return None
+    return cmd
 
-    # ---------------------------
-    # UNIVERSAL OPEN (if available)
-    # ---------------------------
-    if "open" in command and universal_open is not None:
+
+def command_grammar():
+    """
+    Phrase list for grammar-constrained recognition of the registered
+    commands
+
+    Returns:
+        list: unique lower-case phrases, in registration order
+    """
+    phrases = []
+    for cmd in COMMANDS:
+        for phrase in cmd.examples:
+            if phrase not in phrases:
+                phrases.append(phrase)
+    return phrases
+
+
+def response_templates():
+    """
+    Known replies of the registered commands, for TTS prerendering
+
+    Returns:
+        list: unique response format strings, in registration order
+    """
+    templates = []
+    for cmd in COMMANDS:
+        for template in cmd.responses:
+            if template not in templates:
+                templates.append(template)
+    return templates
+
+
+# ---------------------------
+# GREETINGS
+# ---------------------------
+@command("hello", "hi", examples=("hello", "hi", "hello eva", "hi eva"),
+         responses=("Hello! How can I assist you?",))
+def greet(command):
+    return "Hello! How can I assist you?"
+
+# ---------------------------
+# TIME & DATE
+# ---------------------------
+@command("time", examples=("what time is it", "what is the time", "time"),
+         responses=("The current time is {time}",))
+def tell_time(command):
+    return f"The current time is {get_time()}"
+
+@command("date", examples=("what is the date", "what is the date today",
+                           "date"),
+         responses=("Today's date is {date}",))
+def tell_date(command):
+    return f"Today's date is {get_date()}"
+
+# ---------------------------
+# UNIVERSAL OPEN (if available)
+# ---------------------------
+if universal_open is not None:
+    @command("open")
+    def open_anything(command):
         return universal_open(command)
 
-    # ---------------------------
-    # CAMERA OPERATIONS
-    # ---------------------------
-    if "capture photo" in command or "take photo" in command:
-        from modules.open_camera import capture_photo
-        result = capture_photo()
-        return f"Photo captured successfully: {result}"
-
-    if "record video" in command:
-        from modules.open_camera import record_video
-        result = record_video(5)
-        return f"Video recorded successfully: {result}"
-
-    if "switch camera" in command:
-        from modules.open_camera import switch_camera
-        camera_id = switch_camera(0)
-        result = open_camera(camera_id)
-        return f"Camera switched: {result}"
+# ---------------------------
+# CAMERA OPERATIONS
+# ---------------------------
+@command("capture photo", "take photo")
+def take_photo(command):
+    from modules.open_camera import capture_photo
+    result = capture_photo()
+    return f"Photo captured successfully: {result}"
 
-    # ---------------------------
-    # OPEN WINDOWS APPLICATIONS
-    # ---------------------------
-    if "open notepad" in command:
-        os.system("notepad")
-        return "Opening Notepad"
+@command("record video")
+def take_video(command):
+    from modules.open_camera import record_video
+    result = record_video(5)
+    return f"Video recorded successfully: {result}"
 
-    if "open calculator" in command or "open calc" in command:
-        os.system("calc")
-        return "Opening Calculator"
+@command("switch camera")
+def change_camera(command):
+    from modules.open_camera import switch_camera
+    camera_id = switch_camera(0)
+    result = open_camera(camera_id)
+    return f"Camera switched: {result}"
 
-    if "open paint" in command:
-        os.system("mspaint")
-        return "Opening Paint"
+# ---------------------------
+# OPEN WINDOWS APPLICATIONS
+# ---------------------------
+@command("open notepad", responses=("Opening Notepad",))
+def open_notepad(command):
+    os.system("notepad")
+    return "Opening Notepad"
 
-    if "open command prompt" in command or "open cmd" in command:
-        os.system("start cmd")
-        return "Opening Command Prompt"
+@command("open calculator", "open calc",
+         responses=("Opening Calculator",))
+def open_calculator(command):
+    os.system("calc")
+    return "Opening Calculator"
 
-    if "open file explorer" in command or "open explorer" in command:
-        os.system("explorer")
-        return "Opening File Explorer"
+@command("open paint", responses=("Opening Paint",))
+def open_paint(command):
+    os.system("mspaint")
+    return "Opening Paint"
 
-    # ---------------------------
-    # OPEN WEBSITES
-    # ---------------------------
-    if "open google" in command:
-        return open_website("google.com", "Google")
+@command("open command prompt", "open cmd",
+         responses=("Opening Command Prompt",))
+def open_cmd(command):
+    os.system("start cmd")
+    return "Opening Command Prompt"
 
-    if "open youtube" in command:
-        return open_website("youtube.com", "YouTube")
+@command("open file explorer", "open explorer",
+         responses=("Opening File Explorer",))
+def open_explorer(command):
+    os.system("explorer")
+    return "Opening File Explorer"
 
-    if "open github" in command:
-        return open_website("github.com", "GitHub")
+# ---------------------------
+# OPEN WEBSITES
+# ---------------------------
+@command("open google", responses=("Opening Google",))
+def open_google(command):
+    return open_website("google.com", "Google")
 
-    if "open stack overflow" in command:
-        return open_website("stackoverflow.com", "Stack Overflow")
+@command("open youtube", responses=("Opening YouTube",))
+def open_youtube(command):
+    return open_website("youtube.com", "YouTube")
 
-    # ---------------------------
-    # SYSTEM CONTROLS
-    # ---------------------------
-    if "shutdown" in command:
-        os.system("shutdown /s /t 1")
-        return "Shutting down the system."
+@command("open github", responses=("Opening GitHub",))
+def open_github(command):
+    return open_website("github.com", "GitHub")
 
-    if "restart" in command:
-        os.system("shutdown /r /t 1")
-        return "Restarting the system."
+@command("open stack overflow",
+         responses=("Opening Stack Overflow",))
+def open_stack_overflow(command):
+    return open_website("stackoverflow.com", "Stack Overflow")
 
-    # ---------------------------
-    # EXIT / QUIT
-    # ---------------------------
-    if "exit" in command or "quit" in command or "bye" in command:
-        return "exit"
+# ---------------------------
+# SYSTEM CONTROLS
+# ---------------------------
+@command("shutdown", early=False,
+         responses=("Shutting down the system.",))
+def shutdown(command):
+    os.system("shutdown /s /t 1")
+    return "Shutting down the system."
+
+@command("restart", early=False,
+         responses=("Restarting the system.",))
+def restart(command):
+    os.system("shutdown /r /t 1")
+    return "Restarting the system."
+
+# ---------------------------
+# EXIT / QUIT
+# ---------------------------
+@command("exit", "quit", "bye", examples=("exit", "quit", "bye", "goodbye"),
+         early=False)
+def exit_assistant(command):
+    return "exit"
+
+
+def handle_command(command):
+    """Main backend command handler. Must return a string response."""
+
+    if not command:
+        return "No command detected."
+
+    command = command.lower()
+
+    cmd = match_command(command)
+    if cmd is not None:
+        return cmd.handler(command)
 
     # ---------------------------
     # UNKNOWN COMMAND
     # ---------------------------
     return f"I'm not sure how to handle '{command}'."
+
+
+class EarlyDispatcher:
+    """
+    Runs a command as soon as a partial transcript names it, instead of
+    waiting for the recognizer's endpoint.
+
+    A partial is acted on once the same text has been seen
+    ``stable_partials`` times in a row and early_match() accepts it. Its
+    response is held until the final transcript is checked with
+    resolve(): if that names the same command the response is returned
+    for the caller to deliver (no second dispatch); if it names another
+    command, or none, the response is dropped (and the dispatch
+    cancelled if it has not started) and the final transcript should be
+    dispatched as usual. Call resolve("") when there is no final
+    transcript.
+
+    Side effects of an early dispatch that already ran (an opened app or
+    website) cannot be undone when the final result disagrees, which is
+    why commands like shutdown are registered with early=False.
+    """
+
+    def __init__(self, run=handle_command, stable_partials=2):
+        self.run = run                      # callable(command) -> response
+        self.stable_partials = stable_partials
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="early-dispatch")
+        self._lock = threading.Lock()
+        self.dispatched = 0
+        self.confirmed = 0
+        self.mismatched = 0
+        self.cancelled = 0          # mismatched before the command ran
+        self.saved_seconds = 0.0    # dispatch -> final, when confirmed
+        self.start()
+
+    def start(self):
+        """Forget the previous utterance"""
+        self._last = None
+        self._seen = 0
+        self._command = None
+        self._text = None
+        self._future = None
+        self._dispatched_at = None
+        self.answered_at = None     # time.monotonic() the response was ready
+
+    def partial(self, text):
+        """
+        Feed a partial transcript (wake phrase already stripped)
+
+        Returns:
+            bool: True if this partial was dispatched
+        """
+        if self._command is not None or not text:
+            return False
+        if text == self._last:
+            self._seen += 1
+        else:
+            self._last, self._seen = text, 1
+        if self._seen < self.stable_partials:
+            return False
+
+        cmd = early_match(text)
+        if cmd is None:
+            return False
+        print(f"⚡ Early dispatch: {text}")
+        self._command, self._text = cmd, text
+        self._dispatched_at = time.monotonic()
+        self._future = self._executor.submit(self._run, text)
+        with self._lock:
+            self.dispatched += 1
+        return True
+
+    def resolve(self, final_text):
+        """
+        Check the final transcript against the early dispatch, if any
+
+        Returns:
+            str: the early response if it stands (deliver it and do not
+            dispatch again; it was ready at ``answered_at``), or None if
+            nothing was dispatched early or the final transcript does not
+            name the same command
+        """
+        command, self._command = self._command, None
+        if command is None:
+            return None
+        final = match_command(final_text) if final_text else None
+        if final is not command:
+            print(f"⚠️ Final '{final_text}' disagrees with early dispatch "
+                  f"'{self._text}': dropping its response")
+            cancelled = self._future.cancel()
+            with self._lock:
+                self.mismatched += 1
+                self.cancelled += cancelled
+            return None
+        with self._lock:
+            self.confirmed += 1
+            self.saved_seconds += time.monotonic() - self._dispatched_at
+        return self._future.result()
+
+    def _run(self, text):
+        response = self.run(text)
+        self.answered_at = time.monotonic()
+        return response
+
+    def stats(self):
+        with self._lock:
+            return {
+                'dispatched': self.dispatched,
+                'confirmed': self.confirmed,
+                'mismatched': self.mismatched,
+                'cancelled': self.cancelled,
+                'mean_saved_ms': round(self.saved_seconds /
+                                       self.confirmed * 1000, 1)
+                if self.confirmed else None,
+            }
@@ -0,0 +1,216 @@
+"""
+Model Pool - process-wide cache of loaded recognizer models and a warm
+pool of decoder sessions per model
+"""
+import collections
+import os
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def _rss():
+    """
+    Returns:
+        int: resident set size of this process in bytes, or None without
+        psutil
+    """
+    return psutil.Process().memory_info().rss if psutil else None
+
+
+class _ModelEntry:
+    def __init__(self, path, model, load_time, resident_bytes=None):
+        self.path = path
+        self.model = model
+        self.load_time = load_time
+        # RSS growth while it loaded (approximate if other threads
+        # allocated at the same time)
+        self.resident_bytes = resident_bytes
+        self.loaded_at = time.time()
+        self.last_used = time.monotonic()
+        self.pools = collections.defaultdict(list)   # key -> idle sessions
+        self.handed_out = set()     # ids of sessions from acquire()
+
+    @property
+    def in_use(self):
+        return len(self.handed_out)
+
+    def close(self):
+        self.pools.clear()
+        self.handed_out.clear()
+
+
+class ModelRegistry:
+    """
+    Loads each model once per process and hands out pooled sessions.
+
+    Models are keyed by path. Sessions are created by a caller-supplied
+    factory and pooled per (model, key) so that e.g. a grammar-constrained
+    and an open-vocabulary decoder are pooled separately. An evicted model
+    is loaded again by the next acquire().
+    """
+
+    def __init__(self, max_idle_sessions=2):
+        self.max_idle_sessions = max_idle_sessions
+        self._lock = threading.Lock()
+        self._load_locks = collections.defaultdict(threading.Lock)
+        self._models = {}
+        self._loaders = {}          # path -> loader, kept across evictions
+        self.reloads = 0
+
+    def get_model(self, path, loader):
+        """
+        Return the model at ``path``, calling ``loader(path)`` only the
+        first time
+
+        Returns:
+            object: the loaded model
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            entry = self._models.get(path)
+            load_lock = self._load_locks[path]
+            self._loaders.setdefault(path, loader)
+        if entry is not None:
+            entry.last_used = time.monotonic()
+            return entry.model
+
+        # One loader per path; other callers wait for it instead of
+        # loading a second copy
+        with load_lock:
+            with self._lock:
+                entry = self._models.get(path)
+            if entry is not None:
+                return entry.model
+
+            rss_before = _rss()
+            started = time.monotonic()
+            model = loader(path)
+            load_time = time.monotonic() - started
+            resident = max(0, _rss() - rss_before) \
+                if rss_before is not None else None
+            entry = _ModelEntry(path, model, load_time, resident)
+            size = f", {resident / 2**20:.0f} MB" if resident is not None \
+                else ""
+            print(f"✅ Loaded model {os.path.basename(path)} "
+                  f"in {entry.load_time:.2f}s{size}")
+            with self._lock:
+                self._models[path] = entry
+            return model
+
+    def acquire(self, path, key, factory):
+        """
+        Take an idle session for (model, key) from the warm pool, or
+        create one with ``factory(model)``. A model evicted since it was
+        first loaded is loaded again.
+
+        Returns:
+            object: session; hand it back with release()
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            entry = self._models.get(path)
+            loader = self._loaders.get(path)
+        if entry is None:
+            if loader is None:
+                raise KeyError(f"Model not loaded: {path}")
+            print(f"🔁 Reloading evicted model {os.path.basename(path)}")
+            self.get_model(path, loader)
+            with self._lock:
+                self.reloads += 1
+            return self.acquire(path, key, factory)
+
+        with self._lock:
+            entry.last_used = time.monotonic()
+            pool = entry.pools[key]
+            session = pool.pop() if pool else None
+        if session is None:
+            session = factory(entry.model)
+        with self._lock:
+            entry.handed_out.add(id(session))
+        return session
+
+    def release(self, path, key, session):
+        """
+        Return a session to the pool (dropped if the pool is full, or if
+        its model was evicted after it was handed out)
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            entry = self._models.get(path)
+            if entry is None or id(session) not in entry.handed_out:
+                return
+            entry.handed_out.discard(id(session))
+            entry.last_used = time.monotonic()
+            pool = entry.pools[key]
+            if len(pool) < self.max_idle_sessions:
+                pool.append(session)
+
+    def prewarm(self, path, key, factory, count=1):
+        """Create ``count`` idle sessions ahead of the first request"""
+        sessions = [self.acquire(path, key, factory) for _ in range(count)]
+        for session in sessions:
+            self.release(path, key, session)
+
+    def evict(self, path):
+        """
+        Forget a model and its pooled sessions; it is freed once the
+        sessions still in use are released, and loaded again on demand.
+
+        Returns:
+            bool: True if the model was loaded
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            entry = self._models.pop(path, None)
+        if entry is None:
+            return False
+        entry.close()
+        print(f"🗑️ Evicted model {os.path.basename(path)}")
+        return True
+
+    def evict_idle(self, max_idle_seconds):
+        """
+        Evict models with no session in use for ``max_idle_seconds``
+
+        Returns:
+            list: paths of evicted models
+        """
+        now = time.monotonic()
+        with self._lock:
+            idle = [path for path, entry in self._models.items()
+                    if entry.in_use == 0 and
+                    now - entry.last_used > max_idle_seconds]
+        return [path for path in idle if self.evict(path)]
+
+    def stats(self):
+        """
+        Returns:
+            dict: per-model load_time, resident_bytes (RSS growth while
+            it loaded), idle_seconds, sessions_in_use and pooled_sessions,
+            plus reloads and the process rss_bytes (byte counts are None
+            without psutil)
+        """
+        now = time.monotonic()
+        with self._lock:
+            models = {
+                os.path.basename(path): {
+                    'load_time': round(entry.load_time, 3),
+                    'resident_bytes': entry.resident_bytes,
+                    'idle_seconds': round(now - entry.last_used, 1),
+                    'sessions_in_use': entry.in_use,
+                    'pooled_sessions': sum(len(p) for p in
+                                           entry.pools.values()),
+                }
+                for path, entry in self._models.items()
+            }
+            reloads = self.reloads
+        return {'models': models, 'reloads': reloads, 'rss_bytes': _rss()}
+
+
+# Shared by every backend in the process
+registry = ModelRegistry()
@@ -0,0 +1,137 @@
+"""
+Noise Floor - continuously tracks background level on the captured audio
+"""
+import collections
+import threading
+import time
+
+import numpy as np
+
+
+def chunk_rms(chunk):
+    """
+    Root-mean-square energy of a 16-bit PCM chunk
+
+    Returns:
+        float: RMS in raw sample units (same scale as sr energy_threshold)
+    """
+    samples = np.frombuffer(chunk, dtype=np.int16).astype(np.float32)
+    if samples.size == 0:
+        return 0.0
+    return float(np.sqrt(np.mean(samples * samples)))
+
+
+class NoiseFloorTracker:
+    """
+    Exponential moving average of the RMS of chunks classified as silence.
+
+    Register ``update`` as a MicrophoneStream listener; the energy
+    threshold is then always current and listening can start without an
+    adjust_for_ambient_noise() pause.
+    """
+
+    def __init__(self, alpha=0.05, threshold_ratio=2.5, speech_ratio=3.0,
+                 min_threshold=100.0, initial_floor=300.0,
+                 warmup_chunks=8, rate_window=5.0, rewarm_chunks=150,
+                 rewarm_max_rise=1.1):
+        self.alpha = alpha                      # EMA weight of a new chunk
+        self.threshold_ratio = threshold_ratio  # threshold = floor * ratio
+        self.speech_ratio = speech_ratio        # louder than this is speech
+        self.min_threshold = min_threshold
+        self.warmup_chunks = warmup_chunks
+        self.rate_window = rate_window
+        # This many "speech" chunks in a row (~10 s at 64 ms) means the
+        # ambience got louder, not that someone is talking: start over
+        self.rewarm_chunks = rewarm_chunks
+        # The chunks after a re-warm may still be the tail of long TTS
+        # playback or loud speech: the floor rises by at most this factor
+        # per chunk while re-warming
+        self.rewarm_max_rise = rewarm_max_rise
+
+        self._lock = threading.Lock()
+        self._floor = initial_floor
+        self._chunks_seen = 0
+        self._silent_chunks = 0
+        self._warmup_left = warmup_chunks
+        self._loud_run = 0
+        self._rewarming = False
+        self.rewarms = 0
+        self._update_times = collections.deque()
+
+    def update(self, chunk):
+        """Feed one captured chunk; returns True if it moved the floor"""
+        rms = chunk_rms(chunk)
+        now = time.monotonic()
+
+        with self._lock:
+            self._chunks_seen += 1
+            warming_up = self._warmup_left > 0
+            if warming_up:
+                self._warmup_left -= 1
+            else:
+                self._rewarming = False
+            if not warming_up and rms > self._floor * self.speech_ratio:
+                self._loud_run += 1
+                if self._loud_run >= self.rewarm_chunks:
+                    # Re-run the warm-up so the floor converges on the
+                    # new level within a few chunks
+                    self._warmup_left = self.warmup_chunks
+                    self._rewarming = True
+                    self._loud_run = 0
+                    self.rewarms += 1
+                return False
+            self._loud_run = 0
+
+            # Converge quickly at start-up, then follow slowly
+            alpha = 0.5 if warming_up else self.alpha
+            floor = self._floor + alpha * (rms - self._floor)
+            if self._rewarming:
+                floor = min(floor, self._floor * self.rewarm_max_rise)
+            self._floor = floor
+            self._silent_chunks += 1
+
+            self._update_times.append(now)
+            while self._update_times and \
+                    now - self._update_times[0] > self.rate_window:
+                self._update_times.popleft()
+            return True
+
+    @property
+    def noise_floor(self):
+        with self._lock:
+            return self._floor
+
+    @property
+    def energy_threshold(self):
+        with self._lock:
+            return max(self.min_threshold, self._floor * self.threshold_ratio)
+
+    def is_speech(self, rms):
+        """Whether an RMS value is above the current energy threshold"""
+        return rms > self.energy_threshold
+
+    def stats(self):
+        """
+        Current estimator state for logging / tuning
+
+        Returns:
+            dict: noise_floor, energy_threshold, update_rate (updates per
+            second over the last ``rate_window`` seconds), silence_ratio,
+            chunks_seen and rewarms
+        """
+        with self._lock:
+            now = time.monotonic()
+            recent = sum(1 for t in self._update_times
+                         if now - t <= self.rate_window)
+            return {
+                'noise_floor': round(self._floor, 1),
+                'energy_threshold': round(
+                    max(self.min_threshold,
+                        self._floor * self.threshold_ratio), 1),
+                'update_rate': round(recent / self.rate_window, 2),
+                'silence_ratio': round(
+                    self._silent_chunks / self._chunks_seen, 3)
+                if self._chunks_seen else 0.0,
+                'chunks_seen': self._chunks_seen,
+                'rewarms': self.rewarms,
+            }
@@ -0,0 +1,273 @@
+"""
+Recognition Cache - reuse transcripts of utterances that sound the same
+"""
+import collections
+import itertools
+import math
+import threading
+import time
+
+import numpy as np
+
+from modules.audio_capture import SAMPLE_RATE
+from modules.recognizers import RecognitionResult, RecognizerBackend
+from modules.vad import frame_features
+
+# duration: seconds of audio between the trimmed ends
+# energy: log-energy envelope in dB below the peak, clipped to the range
+# crossings: zero-crossing rate envelope
+Fingerprint = collections.namedtuple("Fingerprint",
+                                     "duration energy crossings")
+
+# Utterances whose durations differ by more than this never match
+MAX_STRETCH = 1.25
+
+
+def fingerprint(pcm, rate=SAMPLE_RATE, frame_ms=20, points=32,
+                range_db=30.0, floor_margin_db=6.0):
+    """
+    Acoustic fingerprint of a segmented utterance, compared with
+    fingerprint_distance().
+
+    Leading and trailing frames more than ``range_db`` below the loudest
+    one, or within ``floor_margin_db`` of the recording's own noise floor
+    (its quietest frames), are trimmed, so pre-roll and background noise
+    do not move the ends. The log-energy envelope relative to the peak
+    (so loudness does not matter) and the zero-crossing envelope are
+    resampled to ``points`` values.
+
+    Returns:
+        Fingerprint: or None if the audio is too short to fingerprint
+    """
+    frame_samples = int(rate * frame_ms / 1000)
+    samples = np.frombuffer(pcm[:len(pcm) - len(pcm) % 2], dtype=np.int16)
+    rms, zcr = frame_features(samples, frame_samples)
+    if len(rms) < 2:
+        return None
+
+    db = 20 * np.log10(np.maximum(rms, 1.0))
+    floor = np.percentile(db, 10)
+    loud = np.nonzero((db > db.max() - range_db) &
+                      (db > floor + floor_margin_db))[0]
+    if len(loud) < 2:
+        return None
+    db = db[loud[0]:loud[-1] + 1]
+    zcr = zcr[loud[0]:loud[-1] + 1]
+
+    positions = np.linspace(0, len(db) - 1, points)
+    energy = np.interp(positions, np.arange(len(db)),
+                       np.maximum(db - db.max(), -range_db))
+    crossings = np.interp(positions, np.arange(len(zcr)), zcr)
+    return Fingerprint(len(db) * frame_ms / 1000, energy, crossings)
+
+
+def fingerprint_distance(a, b, range_db=30.0, max_stretch=MAX_STRETCH):
+    """
+    How different two utterances sound: the mean energy envelope
+    difference (as a fraction of ``range_db``), plus the zero-crossing
+    difference weighted by how loud both are at that point (so noise in
+    the pauses does not count), plus the log duration ratio
+
+    Returns:
+        float: 0.0 for identical fingerprints; inf when the durations
+        differ by more than ``max_stretch``
+    """
+    stretch = max(a.duration, b.duration) / min(a.duration, b.duration)
+    if stretch > max_stretch:
+        return float("inf")
+    energy = np.mean(np.abs(a.energy - b.energy)) / range_db
+    weight = np.minimum(a.energy, b.energy) / range_db + 1
+    crossings = np.sum(weight * np.abs(a.crossings - b.crossings)) / \
+        max(np.sum(weight), 1e-9)
+    return float(energy + 2 * crossings + np.log(stretch))
+
+
+def same_words(a, b):
+    """Whether two transcripts are the same words, ignoring case and spacing"""
+    return a.lower().split() == b.lower().split()
+
+
+class CachedSession:
+    """
+    Passes PCM through to the wrapped backend's session and keeps a copy;
+    finish() answers from the cache when the fingerprint is known and the
+    session's last partial transcript says the same
+    """
+
+    def __init__(self, cache, session):
+        self.cache = cache
+        self.session = session
+        self._chunks = []
+        self._partial = None
+
+    def accept(self, pcm):
+        self._chunks.append(pcm)
+        result = self.session.accept(pcm)
+        if result is not None:
+            self._partial = result.text
+        return result
+
+    def finish(self):
+        started = time.monotonic()
+        key = fingerprint(b"".join(self._chunks), self.cache.rate)
+        cached = self.cache.lookup(key, self._partial)
+        if cached is not None:
+            self.session.cancel()
+            return cached._replace(latency=time.monotonic() - started)
+        result = self.session.finish()
+        self.cache.store(key, result)
+        return result
+
+    def cancel(self):
+        self.session.cancel()
+
+    def recognize(self, pcm):
+        self.accept(pcm)
+        return self.finish()
+
+
+class CachedRecognizer(RecognizerBackend):
+    """
+    LRU cache of final transcripts in front of any RecognizerBackend.
+
+    An utterance is looked up by its nearest stored fingerprint; it is a
+    hit when that is within ``max_distance`` (see fingerprint_distance()),
+    since no two recordings of the same words are sample-identical, and
+    the live session's last partial transcript agrees with the cached
+    text. The envelope alone cannot tell "open google" from "open
+    github", and a hit runs a command without the final decode, so
+    without an agreeing partial (backends that have none included) the
+    final decode runs. Entries are bucketed by duration, so a lookup only
+    measures the distance to utterances of a matching length. Only
+    results with text and ``confidence >= min_confidence`` are
+    stored, so a misrecognition is not repeated back for every later
+    utterance that sounds like it. Streaming backends still decode
+    while the user speaks; a hit saves the final decode (and, for cloud
+    backends, the whole request).
+    """
+
+    name = "cache"
+
+    def __init__(self, backend, max_entries=256, min_confidence=0.85,
+                 max_distance=0.2, rate=SAMPLE_RATE):
+        self.backend = backend
+        self.max_entries = max_entries
+        self.min_confidence = min_confidence
+        self.max_distance = max_distance
+        self.rate = rate
+        # id -> (Fingerprint, result), least recently used first
+        self._entries = collections.OrderedDict()
+        self._buckets = collections.defaultdict(set)    # bucket -> ids
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.unconfirmed = 0    # near match the partial did not agree with
+        self.rejected = 0       # below the confidence gate, not stored
+        self.evictions = 0
+
+    def start_session(self, **kwargs):
+        return CachedSession(self, self.backend.start_session(**kwargs))
+
+    @staticmethod
+    def _bucket(key):
+        """Durations within MAX_STRETCH of each other are at most one
+        bucket apart"""
+        return math.floor(math.log(key.duration) / math.log(MAX_STRETCH))
+
+    def _nearest(self, key):
+        """
+        Returns:
+            tuple: (id, distance) of the closest entry, (None, inf) if
+            no entry has a matching duration
+        """
+        bucket = self._bucket(key)
+        best, best_distance = None, float("inf")
+        for b in (bucket - 1, bucket, bucket + 1):
+            for entry_id in self._buckets.get(b, ()):
+                distance = fingerprint_distance(key,
+                                                self._entries[entry_id][0])
+                if distance < best_distance:
+                    best, best_distance = entry_id, distance
+        return best, best_distance
+
+    def lookup(self, key, partial=None):
+        """
+        Args:
+            partial: the session's last partial transcript; the cached
+                text must be the same words
+
+        Returns:
+            RecognitionResult: cached result (backend="cache") of the
+            nearest utterance within max_distance, or None
+        """
+        with self._lock:
+            entry_id, distance = self._nearest(key) if key \
+                else (None, float("inf"))
+            if distance > self.max_distance:
+                self.misses += 1
+                return None
+            result = self._entries[entry_id][1]
+            if not partial or not same_words(partial, result.text):
+                self.unconfirmed += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(entry_id)
+            self.hits += 1
+            return result
+
+    def store(self, key, result):
+        if not key:
+            return
+        with self._lock:
+            if not result.text or result.confidence < self.min_confidence:
+                self.rejected += 1
+                return
+            # A new recording of a cached utterance replaces it
+            entry_id, distance = self._nearest(key)
+            if distance > self.max_distance:
+                entry_id = next(self._ids)
+            else:
+                self._forget(entry_id)
+            self._entries[entry_id] = (key,
+                                       result._replace(backend=self.name))
+            self._buckets[self._bucket(key)].add(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._forget(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _forget(self, entry_id):
+        stored, _ = self._entries.pop(entry_id)
+        bucket = self._buckets[self._bucket(stored)]
+        bucket.discard(entry_id)
+        if not bucket:
+            del self._buckets[self._bucket(stored)]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def stats(self):
+        """
+        Returns:
+            dict: cache size and hit/miss counters, plus the wrapped
+            backend's stats under 'backend' (if it has any)
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'max_distance': self.max_distance,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups
+                else None,
+                'unconfirmed': self.unconfirmed,
+                'rejected': self.rejected,
+                'evictions': self.evictions,
+            }
+        stats['backend'] = self.backend.stats() \
+            if hasattr(self.backend, 'stats') else None
+        return stats
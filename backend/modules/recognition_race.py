@@ -0,0 +1,256 @@
+"""
+Recognition Race - decode each utterance with several backends at once
+and take the first confident result
+"""
+import bisect
+import concurrent.futures
+import threading
+import time
+
+from modules.recognizers import (RecognitionResult, RecognizerBackend,
+                                 load_backends)
+
+# Upper bucket edges of the latency histograms, in milliseconds
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2000, 5000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram"""
+
+    def __init__(self, buckets_ms=LATENCY_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.counts = [0] * (len(buckets_ms) + 1)   # last: above the top edge
+        self.total_ms = 0.0
+
+    def record(self, seconds):
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.buckets_ms, ms)] += 1
+        self.total_ms += ms
+
+    def stats(self):
+        completed = sum(self.counts)
+        labels = [f"<={edge}ms" for edge in self.buckets_ms] + \
+            [f">{self.buckets_ms[-1]}ms"]
+        return {
+            'completed': completed,
+            'mean_ms': round(self.total_ms / completed, 1) if completed
+            else None,
+            'histogram': dict(zip(labels, self.counts)),
+        }
+
+
+class BackendRaceStats(LatencyHistogram):
+    """Latency histogram of one backend plus its race outcomes"""
+
+    def __init__(self, buckets_ms=LATENCY_BUCKETS_MS):
+        super().__init__(buckets_ms)
+        self.wins = 0
+        self.cancelled = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.skipped = 0        # left out: too many decodes still running
+        self.in_flight = 0
+
+    def stats(self):
+        stats = super().stats()
+        stats.update({
+            'wins': self.wins,
+            'cancelled': self.cancelled,
+            'timeouts': self.timeouts,
+            'errors': self.errors,
+            'skipped': self.skipped,
+            'in_flight': self.in_flight,
+        })
+        return stats
+
+
+class RaceSession:
+    """
+    Feeds the same PCM to one session per backend; finish() decodes all of
+    them in parallel and returns the first confident result
+    """
+
+    def __init__(self, race, sessions):
+        self.race = race
+        self.sessions = sessions    # list of (backend name, session)
+
+    def accept(self, pcm):
+        """
+        Returns:
+            RecognitionResult: partial from the first streaming backend
+            that has one, or None
+        """
+        partial = None
+        for _, session in self.sessions:
+            result = session.accept(pcm)
+            if partial is None and result is not None:
+                partial = result
+        return partial
+
+    def finish(self):
+        return self.race.run(self.sessions)
+
+    def cancel(self):
+        for _, session in self.sessions:
+            session.cancel()
+
+    def recognize(self, pcm):
+        self.accept(pcm)
+        return self.finish()
+
+
+class RacingBackend(RecognizerBackend):
+    """
+    Races several RecognizerBackends on every utterance.
+
+    The first final result with text and ``confidence >= min_confidence``
+    wins and the other sessions are cancelled, including ones already
+    decoding (a streaming upload is dropped, Vosk skips its open-vocabulary
+    retry; a batch HTTP request already sent still runs to completion,
+    with its result discarded). If nothing is confident within
+    ``timeout`` seconds, the most confident result seen so far is
+    returned.
+
+    A backend with ``max_in_flight`` decodes still running (a hung
+    request) sits out the next races until one of them returns, so it
+    holds at most that many executor threads and the other backends
+    always have theirs.
+    """
+
+    name = "race"
+
+    def __init__(self, backends, min_confidence=0.7, timeout=8.0,
+                 max_in_flight=2):
+        self.backends = list(backends)
+        self.min_confidence = min_confidence
+        self.timeout = timeout
+        self.max_in_flight = max_in_flight
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_in_flight * len(self.backends),
+            thread_name_prefix="recognition-race")
+        self._lock = threading.Lock()
+        self._stats = {b.name: BackendRaceStats() for b in self.backends}
+        self._abandoned = set()     # futures whose result is discarded
+        self.races = 0
+        self.unconfident = 0
+
+    def start_session(self):
+        return RaceSession(self, [(b.name, b.start_session())
+                                  for b in self.backends])
+
+    def run(self, sessions):
+        """
+        Finish every session concurrently
+
+        Returns:
+            RecognitionResult: the winning (or most confident) result
+        """
+        started = time.monotonic()
+        futures = {}
+        for name, session in sessions:
+            with self._lock:
+                stats = self._stats[name]
+                if stats.in_flight >= self.max_in_flight:
+                    stats.skipped += 1
+                    session.cancel()
+                    continue
+                stats.in_flight += 1
+            future = self._executor.submit(session.finish)
+            future.add_done_callback(
+                lambda f, name=name: self._record(name, f, started))
+            futures[future] = (name, session)
+
+        best = None
+        winner = winner_name = None
+        try:
+            for future in concurrent.futures.as_completed(
+                    futures, timeout=self.timeout):
+                if future.exception() is not None:
+                    continue
+                result = future.result()
+                if not result.text:
+                    continue
+                if result.confidence >= self.min_confidence:
+                    winner = result
+                    winner_name = futures[future][0]
+                    break
+                if best is None or result.confidence > best.confidence:
+                    best = result
+        except concurrent.futures.TimeoutError:
+            pass
+
+        for future, (name, session) in futures.items():
+            with self._lock:
+                if future.done():
+                    continue
+                self._abandoned.add(future)
+                if winner is not None:
+                    self._stats[name].cancelled += 1
+                else:
+                    self._stats[name].timeouts += 1
+            # Not started yet: never runs. Already decoding: finish()
+            # returns early where the session can be interrupted
+            future.cancel()
+            session.cancel()
+
+        with self._lock:
+            self.races += 1
+            if winner is not None:
+                self._stats[winner_name].wins += 1
+            else:
+                self.unconfident += 1
+
+        result = winner or best or RecognitionResult(
+            "", 0.0, True, self.name, 0.0)
+        return result._replace(latency=time.monotonic() - started)
+
+    def _record(self, name, future, started):
+        with self._lock:
+            self._stats[name].in_flight -= 1
+            if future in self._abandoned:
+                self._abandoned.discard(future)
+                return
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                print(f"❌ {name} recognition failed: {future.exception()}")
+                self._stats[name].errors += 1
+                return
+            self._stats[name].record(time.monotonic() - started)
+
+    def stats(self):
+        """
+        Returns:
+            dict: race counts and per-backend latency histograms with
+            win/cancel/timeout/error/skip counters and decodes in flight
+        """
+        with self._lock:
+            return {
+                'races': self.races,
+                'unconfident': self.unconfident,
+                'min_confidence': self.min_confidence,
+                'backends': {name: hist.stats()
+                             for name, hist in self._stats.items()},
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def load_racing_backend(names=("vosk",), grammar=None,
+                        min_confidence=0.7, timeout=8.0):
+    """
+    Load every available backend in ``names``; race them if there is
+    more than one
+
+    Returns:
+        RacingBackend or RecognizerBackend: None if nothing could be loaded
+    """
+    backends = load_backends(names, grammar)
+    if not backends:
+        return None
+    if len(backends) == 1:
+        return backends[0]
+    print(f"🏁 Racing speech backends: "
+          f"{', '.join(b.name for b in backends)}")
+    return RacingBackend(backends, min_confidence, timeout)
@@ -0,0 +1,407 @@
+"""
+Recognizers - pluggable speech-to-text backends
+
+Every backend hands out sessions that take PCM incrementally:
+
+    session = backend.start_session()
+    session.accept(pcm)      # -> partial RecognitionResult or None
+    session.finish()         # -> final RecognitionResult
+    session.cancel()         # or: give up without a result
+
+cancel() may also be called from another thread while finish() runs; the
+result of that finish() is then discarded.
+"""
+import collections
+import json
+import os
+import threading
+import time
+
+import speech_recognition as sr
+
+from modules.audio_capture import SAMPLE_RATE, SAMPLE_WIDTH
+from modules.model_pool import registry
+
+try:
+    import vosk
+except ImportError:
+    vosk = None
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+VOSK_MODEL_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "vosk_model",
+    "vosk-model-small-en-us-0.15 (1)", "vosk-model-small-en-us-0.15")
+
+# text: lower-case transcript ("" if nothing was recognized)
+# confidence: 0.0 - 1.0
+# is_final: False for partial results while the user is still speaking
+# backend: name of the backend that produced it
+# latency: seconds from finish() (or the partial's accept()) to result
+RecognitionResult = collections.namedtuple(
+    "RecognitionResult", "text confidence is_final backend latency")
+
+# Vosk's out-of-grammar token
+UNKNOWN_WORD = "[unk]"
+
+
+def _strip_unk(text):
+    return " ".join(w for w in text.split() if w != UNKNOWN_WORD)
+
+
+class RecognizerBackend:
+    """Base class; subclasses implement start_session()"""
+
+    name = "base"
+
+    def start_session(self):
+        raise NotImplementedError
+
+    def recognize(self, pcm):
+        """
+        One-shot recognition of a complete utterance
+
+        Returns:
+            RecognitionResult: final result
+        """
+        session = self.start_session()
+        session.accept(pcm)
+        return session.finish()
+
+
+class BufferedSession:
+    """Session for batch-only backends: collects PCM until finish()"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._chunks = []
+        self._cancelled = False
+
+    def accept(self, pcm):
+        self._chunks.append(pcm)
+        return None
+
+    def finish(self):
+        started = time.monotonic()
+        if self._cancelled:
+            text, confidence = "", 0.0
+        else:
+            text, confidence = self.backend.transcribe(
+                b"".join(self._chunks))
+        return RecognitionResult(text, confidence, True, self.backend.name,
+                                 time.monotonic() - started)
+
+    def cancel(self):
+        """Skip the request (one already sent cannot be interrupted)"""
+        self._cancelled = True
+        self._chunks = []
+
+
+class VoskSession:
+    """
+    Incremental Kaldi decoding of one utterance.
+
+    With ``fallback`` set (grammar-constrained sessions) the PCM is kept,
+    and finish() re-decodes it with the open vocabulary when the grammar
+    result is empty, contains [unk] or is below min_confidence.
+    """
+
+    def __init__(self, backend, recognizer, name, fallback=False,
+                 release=None):
+        self.backend = backend
+        self.recognizer = recognizer
+        self.name = name
+        self.fallback = fallback
+        self._release = release     # returns the recognizer to the pool
+        self._lock = threading.Lock()   # finish() vs. cancel()
+        self._cancelled = False
+        self._pcm = []
+        self._segments = []     # finals of segments Vosk already endpointed
+        self._confidences = []
+
+    def accept(self, pcm):
+        started = time.monotonic()
+        if self.fallback:
+            self._pcm.append(pcm)
+        if self.recognizer.AcceptWaveform(pcm):
+            self._add_segment(json.loads(self.recognizer.Result()))
+            partial = ""
+        else:
+            partial = json.loads(self.recognizer.PartialResult()).get(
+                "partial", "")
+        text = " ".join(self._segments + ([partial] if partial else []))
+        return RecognitionResult(_strip_unk(text), self._confidence(), False,
+                                 self.name, time.monotonic() - started)
+
+    def finish(self):
+        started = time.monotonic()
+        with self._lock:
+            # FinalResult() also resets the decoder, so it can be pooled
+            self._add_segment(json.loads(self.recognizer.FinalResult()))
+            if self._release is not None:
+                self._release(self.recognizer)
+                self._release = None
+        text = " ".join(self._segments)
+        confidence = self._confidence()
+
+        if self.fallback and not self._cancelled and (
+                not text or UNKNOWN_WORD in text or
+                confidence < self.backend.min_confidence):
+            print(f"🔁 Low-confidence grammar result {text!r} "
+                  f"({confidence:.2f}), decoding open vocabulary")
+            result = self.backend.start_session(constrained=False).recognize(
+                b"".join(self._pcm))
+            return result._replace(latency=time.monotonic() - started)
+
+        return RecognitionResult(_strip_unk(text), confidence, True,
+                                 self.name, time.monotonic() - started)
+
+    def cancel(self):
+        """
+        Drop the utterance and return the recognizer to the pool; while
+        finish() runs, only its open-vocabulary retry is skipped
+        """
+        self._cancelled = True
+        if not self._lock.acquire(blocking=False):
+            return      # finish() releases the recognizer
+        try:
+            if self._release is None:
+                return
+            self.recognizer.FinalResult()
+            self._release(self.recognizer)
+            self._release = None
+        finally:
+            self._lock.release()
+
+    def recognize(self, pcm):
+        """Decode a complete utterance with this session"""
+        self.accept(pcm)
+        return self.finish()
+
+    def _add_segment(self, result):
+        text = result.get("text", "").strip()
+        if text:
+            self._segments.append(text)
+        self._confidences.extend(w.get("conf", 1.0)
+                                 for w in result.get("result", []))
+
+    def _confidence(self):
+        if not self._confidences:
+            return 0.0 if not self._segments else 1.0
+        return sum(self._confidences) / len(self._confidences)
+
+
+class VoskBackend(RecognizerBackend):
+    """
+    Offline streaming recognition with the bundled Vosk model.
+
+    After set_grammar(), sessions decode against that phrase list (plus
+    [unk]) by default, which is much cheaper than the full vocabulary,
+    and fall back to open vocabulary when confidence is low.
+    """
+
+    name = "vosk"
+
+    def __init__(self, model_path=VOSK_MODEL_PATH, rate=SAMPLE_RATE,
+                 grammar=None, min_confidence=0.6):
+        if vosk is None:
+            raise RuntimeError("vosk is not installed (pip install vosk)")
+        if not os.path.isdir(model_path):
+            raise RuntimeError(f"Vosk model not found: {model_path}")
+
+        vosk.SetLogLevel(-1)
+        self.model_path = model_path
+        self.rate = rate
+        self.min_confidence = min_confidence
+        self.grammar = None
+        self.set_grammar(grammar)
+        started = time.monotonic()
+        # Shared with every other VoskBackend on the same model. Not kept
+        # here: sessions get it from the registry, so an evicted model is
+        # freed (and reloaded on the next session)
+        registry.get_model(model_path, vosk.Model)
+        self.load_time = time.monotonic() - started
+
+    def set_grammar(self, phrases):
+        """Restrict decoding to ``phrases`` (None for open vocabulary)"""
+        if phrases:
+            self.grammar = json.dumps(list(phrases) + [UNKNOWN_WORD])
+        else:
+            self.grammar = None
+
+    def start_session(self, constrained=True):
+        grammar = self.grammar if constrained else None
+        key = (self.rate, grammar)
+
+        def release(recognizer):
+            registry.release(self.model_path, key, recognizer)
+
+        recognizer = registry.acquire(
+            self.model_path, key,
+            lambda model: self._create_recognizer(model, grammar))
+        if grammar:
+            return VoskSession(self, recognizer, "vosk-grammar",
+                               fallback=True, release=release)
+        return VoskSession(self, recognizer, self.name, release=release)
+
+    def prewarm(self, count=1):
+        """Put ``count`` ready decoders in the pool for each vocabulary"""
+        for grammar in {self.grammar, None}:
+            registry.prewarm(
+                self.model_path, (self.rate, grammar),
+                lambda model, g=grammar: self._create_recognizer(model, g),
+                count)
+
+    def _create_recognizer(self, model, grammar):
+        if grammar:
+            recognizer = vosk.KaldiRecognizer(model, self.rate, grammar)
+        else:
+            recognizer = vosk.KaldiRecognizer(model, self.rate)
+        recognizer.SetWords(True)
+        return recognizer
+
+
+class GoogleBackend(RecognizerBackend):
+    """
+    Google Web Speech API via speech_recognition (needs network).
+
+    A request already sent cannot be cancelled, so ``timeout`` bounds it;
+    keep it below the race timeout.
+    """
+
+    name = "google"
+
+    def __init__(self, language="en-US", rate=SAMPLE_RATE, timeout=5.0):
+        self.language = language
+        self.rate = rate
+        self._recognizer = sr.Recognizer()
+        self._recognizer.operation_timeout = timeout
+
+    def start_session(self):
+        return BufferedSession(self)
+
+    def transcribe(self, pcm):
+        """
+        Returns:
+            tuple: (text, confidence); ("", 0.0) if nothing was understood
+        """
+        audio = sr.AudioData(pcm, self.rate, SAMPLE_WIDTH)
+        try:
+            response = self._recognizer.recognize_google(
+                audio, language=self.language, show_all=True)
+        except (sr.RequestError, OSError) as e:     # OSError: timed out
+            print(f"❌ Speech recognition error: {e}")
+            return "", 0.0
+
+        alternatives = response.get("alternative", []) \
+            if isinstance(response, dict) else []
+        if not alternatives:
+            return "", 0.0
+        best = alternatives[0]
+        return best.get("transcript", "").lower(), \
+            best.get("confidence", 1.0)
+
+
+class HttpBackend(RecognizerBackend):
+    """
+    Any recognition server that takes raw PCM in a POST and answers with
+    JSON ``{"text": ..., "confidence": ...}`` (a self-hosted engine, or a
+    stand-in server for testing)
+    """
+
+    name = "http"
+
+    def __init__(self, url=None, rate=SAMPLE_RATE, timeout=5.0):
+        if requests is None:
+            raise RuntimeError("requests is not installed")
+        self.url = url or os.environ.get("EVA_STT_URL")
+        if not self.url:
+            raise RuntimeError("No recognition server URL (set EVA_STT_URL)")
+        self.rate = rate
+        self.timeout = timeout
+        # Keep-alive connection reused across utterances
+        self._session = requests.Session()
+
+    def start_session(self):
+        return BufferedSession(self)
+
+    def transcribe(self, pcm):
+        """
+        Returns:
+            tuple: (text, confidence); ("", 0.0) on any server error
+        """
+        headers = {"Content-Type":
+                   f"audio/l16; rate={self.rate}; channels=1"}
+        try:
+            response = self._session.post(self.url, data=pcm,
+                                          headers=headers,
+                                          timeout=self.timeout)
+            response.raise_for_status()
+            body = response.json()
+        except (requests.RequestException, ValueError) as e:
+            print(f"❌ Recognition server error: {e}")
+            return "", 0.0
+        return body.get("text", "").lower(), \
+            float(body.get("confidence", 1.0))
+
+
+def _streaming_http_backend():
+    from modules.streaming_stt import StreamingHttpBackend
+    return StreamingHttpBackend()
+
+
+BACKENDS = {
+    "vosk": VoskBackend,
+    "google": GoogleBackend,
+    "http": HttpBackend,
+    "http-stream": _streaming_http_backend,
+}
+
+
+def _create_backend(name, grammar=None):
+    backend = BACKENDS[name]()
+    if grammar and hasattr(backend, "set_grammar"):
+        backend.set_grammar(grammar)
+        print(f"✅ Command grammar: {len(grammar)} phrases")
+    if hasattr(backend, "prewarm"):
+        backend.prewarm()
+    print(f"✅ Speech backend: {name}")
+    return backend
+
+
+def load_backend(preferred=("vosk", "google"), grammar=None):
+    """
+    Instantiate the first backend in ``preferred`` that can be loaded
+
+    Args:
+        grammar: phrase list for backends that support constrained
+            decoding (see VoskBackend.set_grammar)
+
+    Returns:
+        RecognizerBackend: ready backend, or None if none could be loaded
+    """
+    for name in preferred:
+        try:
+            return _create_backend(name, grammar)
+        except Exception as e:
+            print(f"⚠️ Speech backend {name} unavailable: {e}")
+    return None
+
+
+def load_backends(names=("vosk", "google"), grammar=None):
+    """
+    Instantiate every backend in ``names`` that can be loaded
+
+    Returns:
+        list: ready backends, in the order given
+    """
+    backends = []
+    for name in names:
+        try:
+            backends.append(_create_backend(name, grammar))
+        except Exception as e:
+            print(f"⚠️ Speech backend {name} unavailable: {e}")
+    return backends
@@ -0,0 +1,259 @@
+"""
+Streaming STT - upload audio to a recognition server while the user is
+still speaking
+
+The request is opened on the first accept() (the VAD's speech_start) and
+the PCM is sent as a chunked, deflate-compressed body by a background
+thread; finish() only has to close the body and read the response:
+
+    POST /recognize
+    Transfer-Encoding: chunked
+    Content-Encoding: deflate
+    Content-Type: audio/l16; rate=16000; channels=1
+
+    -> {"text": "...", "confidence": 0.93}
+"""
+import http.client
+import json
+import os
+import queue
+import socket
+import threading
+import time
+import urllib.parse
+import zlib
+
+from modules.audio_capture import SAMPLE_RATE
+from modules.recognizers import RecognitionResult, RecognizerBackend
+
+_END = object()
+
+
+class ConnectionPool:
+    """Idle keep-alive connections to one host, reused across requests"""
+
+    def __init__(self, url, timeout=5.0, max_idle=2):
+        parts = urllib.parse.urlsplit(url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def get(self):
+        """
+        Returns:
+            tuple: (connection, reused) - reused connections may have been
+            closed by the server in the meantime
+        """
+        with self._lock:
+            if self._idle:
+                self.reused += 1
+                return self._idle.pop(), True
+            self.created += 1
+        if self.scheme == "https":
+            conn = http.client.HTTPSConnection(self.host, self.port,
+                                               timeout=self.timeout)
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port,
+                                              timeout=self.timeout)
+        return conn, False
+
+    def put(self, conn):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class StreamingSession:
+    """One utterance, streamed to the server as it is accepted"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._queue = queue.Queue()
+        self._pcm = []          # kept to retry on a stale pooled connection
+        self._sender = None
+        self._conn = None
+        self._reused = False
+        self._error = None
+        self._cancelled = False
+        self.opened_at = None   # time.monotonic() when the request started
+
+    def accept(self, pcm):
+        if self._sender is None:
+            self.opened_at = time.monotonic()
+            self._sender = threading.Thread(target=self._send, daemon=True,
+                                            name="stt-stream-sender")
+            self._sender.start()
+        self._pcm.append(pcm)
+        self._queue.put(pcm)
+        return None
+
+    def finish(self):
+        started = time.monotonic()
+        if self._sender is None:
+            return self._result("", 0.0, started)
+
+        self._queue.put(_END)
+        self._sender.join(self.backend.timeout)
+        if self._sender.is_alive():
+            print("❌ Streaming recognition timed out sending audio")
+            return self._result("", 0.0, started)
+        try:
+            if self._error is not None:
+                raise self._error
+            text, confidence = self._read_response(self._conn)
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            self._discard()
+            if self._cancelled:
+                return self._result("", 0.0, started)
+            if not self._reused:
+                print(f"❌ Streaming recognition error: {e}")
+                return self._result("", 0.0, started)
+            # The server closed the pooled connection while it was idle;
+            # resend the whole utterance on a fresh one
+            self.backend.retries += 1
+            text, confidence = self._resend()
+        return self._result(text, confidence, started)
+
+    def cancel(self):
+        """
+        Abort the upload (the server sees a truncated request) and drop
+        the connection, so a finish() waiting for the response returns
+        at once
+        """
+        self._cancelled = True
+        if self._sender is None:
+            return
+        self._queue.put(_END)
+        conn = self._conn
+        sock = getattr(conn, "sock", None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def recognize(self, pcm):
+        self.accept(pcm)
+        return self.finish()
+
+    def _send(self):
+        self._conn, self._reused = self.backend.pool.get()
+        try:
+            self._conn.request("POST", self.backend.path,
+                               body=self._body(), headers=self.backend.headers,
+                               encode_chunked=True)
+        except Exception as e:
+            self._error = e
+            if self._cancelled:
+                self._discard()
+
+    def _body(self):
+        """Deflate-compress queued PCM, flushing after every chunk"""
+        compressor = zlib.compressobj()
+        while True:
+            pcm = self._queue.get()
+            if self._cancelled:
+                raise ConnectionAbortedError("recognition cancelled")
+            if pcm is _END:
+                yield compressor.flush()
+                return
+            data = compressor.compress(pcm) + \
+                compressor.flush(zlib.Z_SYNC_FLUSH)
+            self.backend.bytes_sent += len(data)
+            self.backend.bytes_raw += len(pcm)
+            yield data
+
+    def _read_response(self, conn):
+        response = conn.getresponse()
+        body = response.read()
+        self._conn = None
+        if response.will_close or self._cancelled:
+            conn.close()
+        else:
+            self.backend.pool.put(conn)
+        if response.status != 200:
+            raise http.client.HTTPException(
+                f"HTTP {response.status} {response.reason}")
+        result = json.loads(body)
+        return result.get("text", "").lower(), \
+            float(result.get("confidence", 1.0))
+
+    def _resend(self):
+        conn, _ = self.backend.pool.get()
+        pcm = b"".join(self._pcm)
+        try:
+            conn.request("POST", self.backend.path,
+                         body=zlib.compress(pcm),
+                         headers=self.backend.headers)
+            return self._read_response(conn)
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            conn.close()
+            print(f"❌ Streaming recognition error: {e}")
+            return "", 0.0
+
+    def _discard(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _result(self, text, confidence, started):
+        return RecognitionResult(text, confidence, True, self.backend.name,
+                                 time.monotonic() - started)
+
+
+class StreamingHttpBackend(RecognizerBackend):
+    """
+    Recognition server that accepts a chunked, deflate-compressed PCM
+    upload (see module docstring), reached over pooled keep-alive
+    connections
+    """
+
+    name = "http-stream"
+
+    def __init__(self, url=None, rate=SAMPLE_RATE, timeout=5.0):
+        self.url = url or os.environ.get("EVA_STT_STREAM_URL")
+        if not self.url:
+            raise RuntimeError(
+                "No streaming recognition server URL (set EVA_STT_STREAM_URL)")
+        self.rate = rate
+        self.timeout = timeout
+        self.path = urllib.parse.urlsplit(self.url).path or "/"
+        self.headers = {
+            "Content-Type": f"audio/l16; rate={rate}; channels=1",
+            "Content-Encoding": "deflate",
+            "Connection": "keep-alive",
+        }
+        self.pool = ConnectionPool(self.url, timeout)
+        self.bytes_raw = 0
+        self.bytes_sent = 0
+        self.retries = 0
+
+    def start_session(self):
+        return StreamingSession(self)
+
+    def stats(self):
+        """
+        Returns:
+            dict: connection reuse, retry and compression counters
+        """
+        return {
+            'connections_created': self.pool.created,
+            'connections_reused': self.pool.reused,
+            'retries': self.retries,
+            'bytes_raw': self.bytes_raw,
+            'bytes_sent': self.bytes_sent,
+        }
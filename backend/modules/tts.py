@@ -0,0 +1,606 @@
+"""
+TTS - one long-lived worker thread that owns the pyttsx3 engine and
+speaks from a priority queue
+
+pyttsx3 engines are not safe to drive from several threads at once, so
+every utterance goes through SpeechWorker.say(). The worker runs the
+engine's external event loop and checks for a more urgent request
+between iterations, cutting the current utterance short with stop().
+That only works on drivers whose iterate() returns while they speak
+(espeak, nsss). The SAPI5 driver of pyttsx3 2.90 speaks synchronously
+inside iterate(), so live speech there always runs to the end of the
+utterance: neither preemption nor interrupt() can cut it. The worker
+notices this on the first utterance and reports it ('blocking_driver'
+in stats()). Speech played through the AudioPlayer (below) can be cut
+at the next stream write on every driver.
+
+With a PhraseCache and an AudioPlayer, phrases that were heard before
+are played from rendered PCM instead: no synthesis, just a write to an
+output stream that is already open. Phrases not in the cache are spoken
+live; the ones passed to prerender(), and replies spoken live more than
+once, are rendered into it while the worker is idle. Responses matching
+a ResponseTemplate are spliced from their cached segments instead.
+
+Longer responses are split into sentences (and long sentences into
+clauses) and streamed: chunk N+1 is rendered while chunk N plays, so the
+first audio only waits for the first sentence whatever the length of the
+answer, and an interruption takes effect at the next chunk boundary (or
+stream write) rather than at the end of the text.
+"""
+import collections
+import heapq
+import itertools
+import os
+import queue
+import re
+import tempfile
+import threading
+import time
+
+from modules.audio_files import read_audio, wav_complete
+from modules.recognition_race import LatencyHistogram
+from modules.tts_templates import crossfade_join, match_template
+
+try:
+    import pyttsx3
+except ImportError:
+    pyttsx3 = None
+
+# Lower number = more urgent
+PRIORITY_URGENT = 0     # acknowledgements, barge-in replies
+PRIORITY_NORMAL = 1     # command responses
+PRIORITY_LOW = 2        # chatter that may be dropped
+
+SENTENCE_END = re.compile(r"(?<=[.!?;:])\s+")
+CLAUSE_END = re.compile(r"(?<=,)\s+")
+
+
+def split_chunks(text, max_chars=120):
+    """
+    Split ``text`` into sentences, and sentences longer than
+    ``max_chars`` into runs of whole clauses
+
+    Returns:
+        list: non-empty chunks, in order
+    """
+    chunks = []
+    for sentence in SENTENCE_END.split(text.strip()):
+        if len(sentence) <= max_chars:
+            chunks.append(sentence)
+            continue
+        current = ""
+        for clause in CLAUSE_END.split(sentence):
+            if current and len(current) + len(clause) + 1 > max_chars:
+                chunks.append(current)
+                current = clause
+            else:
+                current = f"{current} {clause}".strip()
+        chunks.append(current)
+    return [chunk for chunk in chunks if chunk]
+
+
+class SpeechRequest:
+    """One queued utterance; ``done`` is set once it was spoken or dropped"""
+
+    def __init__(self, text, priority, max_age, key, seq):
+        self.text = text
+        self.priority = priority
+        self.max_age = max_age      # seconds it may wait in the queue
+        self.key = key              # newer requests with the same key win
+        self.seq = seq
+        self.created = time.monotonic()
+        self.done = threading.Event()
+        self.interrupt = False
+        self.outcome = None     # "spoken", "preempted", "stale",
+                                # "coalesced" or "failed"
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    def wait(self, timeout=None):
+        """
+        Returns:
+            bool: True if the request was handled within ``timeout``
+        """
+        return self.done.wait(timeout)
+
+
+class SpeechWorker:
+    """
+    Speaks queued requests one at a time, most urgent first.
+
+    A request that arrives with a more urgent priority than the one being
+    spoken preempts it (the interrupted one is dropped), as soon as the
+    driver lets the worker check (see the module docstring). Requests
+    that waited longer than their ``max_age`` are dropped, and a new
+    request with the same ``key`` replaces one still waiting in the
+    queue.
+    """
+
+    def __init__(self, configure=None, engine_factory=None, max_age=10.0,
+                 poll_interval=0.01, cache=None, player=None, templates=(),
+                 render_timeout=15.0):
+        self.configure = configure          # callback(engine), worker thread
+        self.engine_factory = engine_factory or \
+            (pyttsx3.init if pyttsx3 else None)
+        self.cache = cache          # PhraseCache, optional
+        self.player = player        # AudioPlayer, required to use the cache
+        self.templates = list(templates)    # ResponseTemplate, for splicing
+        # Render even single-sentence responses and play them through the
+        # player, so all speech reaches its listeners (barge-in reference)
+        self.render_all = False
+        self.max_age = max_age
+        self.poll_interval = poll_interval
+        self.render_timeout = render_timeout    # seconds per save_to_file
+        self._heap = []
+        self._latest = {}       # key -> seq of the newest request
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._thread = None
+        self._running = False
+        self._current = None
+        self._started_at = None     # when the current utterance began
+        self._finished = False
+        self._rendering = None      # engine name of the phrase being rendered
+        self._to_render = collections.deque(maxlen=512)
+        # Live replies are rendered once they were spoken this many times
+        self.render_after = 2
+        self._heard = collections.OrderedDict()     # reply -> times spoken
+        self.engine_ready = False
+        # True once iterate() was seen to speak a whole utterance before
+        # returning (SAPI5): live speech cannot be preempted
+        self.blocking_driver = None
+        self.time_to_first_audio = LatencyHistogram()   # say() -> audio
+        self.cached_time_to_first_audio = LatencyHistogram()
+        self.counts = {'spoken': 0, 'preempted': 0, 'stale': 0,
+                       'coalesced': 0, 'failed': 0}
+        self.spliced = 0        # responses played from template segments
+        self.streamed = 0       # responses rendered and played by chunk
+        self.render_timeouts = 0
+
+    # ---------------------------
+    # PUBLIC API
+    # ---------------------------
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name="tts-worker")
+        self._thread.start()
+
+    def stop(self):
+        """Stop the worker; queued requests are dropped"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def say(self, text, priority=PRIORITY_NORMAL, max_age=None, key=None):
+        """
+        Queue ``text`` without waiting for it to be spoken
+
+        Args:
+            max_age: seconds the request may wait before it is dropped
+                (default: the worker's max_age)
+            key: coalescing key; a later request with the same key
+                replaces this one if it has not started yet
+
+        Returns:
+            SpeechRequest: call .wait() on it to block until it was handled
+        """
+        with self._cond:
+            request = SpeechRequest(text, priority,
+                                    self.max_age if max_age is None
+                                    else max_age, key, next(self._seq))
+            if key is not None:
+                self._latest[key] = request.seq
+            heapq.heappush(self._heap, request)
+            self._cond.notify_all()
+        return request
+
+    def interrupt(self):
+        """
+        Stop whatever is being spoken now (the queue is kept); live
+        speech on a blocking driver still finishes its utterance
+
+        Returns:
+            bool: True if something was playing
+        """
+        with self._cond:
+            if self._current is None:
+                return False
+            self._current.interrupt = True
+            return True
+
+    def prerender(self, phrases):
+        """Render ``phrases`` into the cache the next time the worker is idle"""
+        if self.cache is None or self.player is None:
+            return
+        with self._cond:
+            self._to_render.extend(phrases)
+            self._cond.notify_all()
+
+    @property
+    def queue_depth(self):
+        with self._cond:
+            return len(self._heap)
+
+    @property
+    def speaking(self):
+        return self._current is not None
+
+    def stats(self):
+        """
+        Returns:
+            dict: queue depth, outcome counts and time-to-first-audio
+        """
+        with self._cond:
+            return {
+                'engine_ready': self.engine_ready,
+                'blocking_driver': self.blocking_driver,
+                'queue_depth': len(self._heap),
+                'speaking': self._current.text if self._current else None,
+                'counts': dict(self.counts),
+                'time_to_first_audio': self.time_to_first_audio.stats(),
+                'cached_time_to_first_audio':
+                    self.cached_time_to_first_audio.stats(),
+                'spliced': self.spliced,
+                'streamed': self.streamed,
+                'render_timeouts': self.render_timeouts,
+                'pending_renders': len(self._to_render),
+                'cache': self.cache.stats() if self.cache else None,
+                'player': self.player.stats() if self.player else None,
+            }
+
+    # ---------------------------
+    # WORKER THREAD
+    # ---------------------------
+    def _run(self):
+        engine = self._create_engine()
+        try:
+            while True:
+                request = self._next_request(
+                    wait=engine is None or not self._to_render)
+                if request is None:
+                    if not self._running:
+                        return
+                    self._render(engine, self._to_render.popleft())
+                    continue
+                if engine is None:
+                    # No TTS: show the text so the response is not lost
+                    print(f"EVA: {request.text}")
+                    with self._cond:
+                        self._current = None
+                        self._complete(request, "failed")
+                    continue
+                self._speak(engine, request)
+        finally:
+            if engine is not None:
+                try:
+                    engine.endLoop()
+                except Exception:
+                    pass
+
+    def _create_engine(self):
+        if self.engine_factory is None:
+            print("❌ TTS Error: pyttsx3 is not installed")
+            return None
+        try:
+            engine = self.engine_factory()
+            if self.configure:
+                self.configure(engine)
+            if self.cache is not None:
+                self.cache.voice = self._voice_key(engine)
+            engine.connect('started-utterance', self._on_started)
+            engine.connect('finished-utterance', self._on_finished)
+            engine.startLoop(False)
+            self.engine_ready = True
+            print("✅ TTS Engine initialized")
+            return engine
+        except Exception as e:
+            print(f"❌ TTS Error: {e}")
+            return None
+
+    @staticmethod
+    def _voice_key(engine):
+        try:
+            return repr([engine.getProperty(name)
+                         for name in ('voice', 'rate', 'volume')])
+        except Exception:
+            return ""
+
+    def _next_request(self, wait=True):
+        """
+        Pop the most urgent request that is still current
+
+        Returns:
+            SpeechRequest: or None once stopped (or when the queue is
+            empty and not ``wait``)
+        """
+        with self._cond:
+            while self._running:
+                while self._heap:
+                    request = heapq.heappop(self._heap)
+                    if request.key is not None and \
+                            self._latest.get(request.key) != request.seq:
+                        self._complete(request, "coalesced")
+                    elif time.monotonic() - request.created > \
+                            request.max_age:
+                        self._complete(request, "stale")
+                    else:
+                        if request.key is not None:
+                            del self._latest[request.key]
+                        self._current = request
+                        return request
+                if not wait:
+                    return None
+                self._cond.wait()
+            for request in self._heap:
+                self._complete(request, "stale")
+            self._heap = []
+            return None
+
+    def _speak(self, engine, request):
+        if self._play_cached(request):
+            return
+        if self.cache is not None and self.player is not None:
+            chunks = split_chunks(request.text)
+            if len(chunks) > 1 or self.render_all:
+                self._speak_streamed(engine, request, chunks)
+                return
+        self._started_at = None
+        self._finished = False
+        try:
+            print(f"🔊 Speaking: {request.text}")
+            engine.say(request.text, str(request.seq))
+            while not self._finished:
+                iterate_started = time.monotonic()
+                engine.iterate()
+                if self.blocking_driver is None:
+                    self._check_blocking(time.monotonic() - iterate_started)
+                if self._preempted(request):
+                    engine.stop()
+                    outcome = "preempted"
+                    break
+                time.sleep(self.poll_interval)
+            else:
+                outcome = "spoken"
+        except Exception as e:
+            print(f"Speak error: {e}")
+            outcome = "failed"
+        with self._cond:
+            self._current = None
+            self._complete(request, outcome)
+            if outcome == "spoken" and self.cache is not None and \
+                    self.player is not None and \
+                    match_template(self.templates, request.text) is None \
+                    and self._heard_again(request.text):
+                self._to_render.append(request.text)
+
+    def _heard_again(self, text, max_replies=512):
+        """
+        Count a reply spoken live (caller holds the lock)
+
+        Returns:
+            bool: True once it was spoken ``render_after`` times, so
+            one-off answers are not rendered
+        """
+        key = " ".join(text.split()).lower()
+        count = self._heard.pop(key, 0) + 1
+        self._heard[key] = count
+        if len(self._heard) > max_replies:
+            self._heard.popitem(last=False)
+        return count >= self.render_after
+
+    def _check_blocking(self, seconds, threshold=0.25):
+        """
+        Classify the driver from the first iterate() of a live utterance:
+        one that returns with the utterance already finished speaks
+        synchronously
+        """
+        self.blocking_driver = self._finished and seconds > threshold
+        if self.blocking_driver:
+            print("⚠️ TTS driver speaks synchronously: live speech cannot "
+                  "be interrupted until the utterance ends")
+
+    def _play_cached(self, request):
+        """
+        Play ``request`` from the phrase cache
+
+        Returns:
+            bool: False if it is not cached (or could not be played)
+        """
+        if self.cache is None or self.player is None:
+            return False
+        pcm = self.cache.get(request.text)
+        if pcm is None:
+            pcm = self._splice(request.text)
+        if pcm is None:
+            return False
+
+        def on_start():
+            latency = time.monotonic() - request.created
+            self.time_to_first_audio.record(latency)
+            self.cached_time_to_first_audio.record(latency)
+
+        try:
+            print(f"🔊 Speaking (cached): {request.text}")
+            completed = self.player.play(
+                pcm, should_stop=lambda: self._preempted(request),
+                on_start=on_start)
+        except Exception as e:
+            print(f"Playback error: {e}")
+            return False
+        with self._cond:
+            self._current = None
+            self._complete(request, "spoken" if completed else "preempted")
+        return True
+
+    def _splice(self, text):
+        """
+        Returns:
+            bytes: ``text`` joined from cached template segments, or None
+            (missing segments are queued for rendering)
+        """
+        segments = match_template(self.templates, text)
+        if segments is None:
+            return None
+        pcms = [self.cache.get(segment, segment=True) for segment in segments]
+        missing = [segment for segment, pcm in zip(segments, pcms)
+                   if pcm is None]
+        if missing:
+            with self._cond:
+                self._to_render.extend(missing)
+            return None
+        self.spliced += 1
+        return crossfade_join(pcms, self.player.rate)
+
+    def _speak_streamed(self, engine, request, chunks):
+        """
+        Render ``chunks`` one after the other on this thread while a
+        playback thread plays the ones already rendered
+        """
+        rendered = queue.Queue()
+        played = {'first': True, 'completed': False}
+        def preempted():
+            return self._preempted(request)
+
+        def on_start():
+            if played['first']:
+                played['first'] = False
+                self.time_to_first_audio.record(time.monotonic() -
+                                                request.created)
+
+        def playback():
+            try:
+                while True:
+                    pcm = rendered.get()
+                    if pcm is None:
+                        played['completed'] = True
+                        return
+                    if not self.player.play(pcm, should_stop=preempted,
+                                            on_start=on_start):
+                        return
+            except Exception as e:
+                print(f"Playback error: {e}")
+
+        print(f"🔊 Speaking ({len(chunks)} chunks): {request.text}")
+        player = threading.Thread(target=playback, daemon=True,
+                                  name="tts-playback")
+        player.start()
+        outcome = "spoken"
+        try:
+            for chunk in chunks:
+                # The whole reply was already looked up (and counted) by
+                # _play_cached()
+                pcm = self.cache.get(chunk, segment=True) or \
+                    self._splice(chunk) or \
+                    self._synthesize(engine, chunk, preempted)
+                if pcm is None:
+                    outcome = "preempted"
+                    break
+                rendered.put(pcm)
+        except Exception as e:
+            print(f"Speak error: {e}")
+            outcome = "failed"
+        rendered.put(None)
+        player.join()
+        if outcome == "spoken" and not played['completed']:
+            outcome = "preempted"
+        self.streamed += 1
+        with self._cond:
+            self._current = None
+            self._complete(request, outcome)
+
+    def _render(self, engine, text):
+        """
+        Render ``text`` into the cache while idle. Gives way (and retries
+        later) as soon as a request is queued.
+        """
+        if text in self.cache:
+            return
+        try:
+            if self._synthesize(engine, text, self._render_interrupted) \
+                    is None:
+                self._to_render.appendleft(text)
+        except Exception as e:
+            print(f"TTS render error: {e}")
+
+    def _render_interrupted(self):
+        with self._cond:
+            return bool(self._heap) or not self._running
+
+    def _synthesize(self, engine, text, abort):
+        """
+        Render ``text`` to a file with the engine and cache its PCM
+
+        Args:
+            abort: callable checked while rendering; when it returns True
+                the engine is stopped
+
+        Returns:
+            bytes: PCM at the player's rate, or None if aborted
+
+        Raises:
+            TimeoutError: the engine did not finish within render_timeout
+        """
+        fd, path = tempfile.mkstemp(prefix="eva-tts-")
+        os.close(fd)
+        self._rendering = f"render-{next(self._seq)}"
+        self._finished = False
+        started = time.monotonic()
+        try:
+            engine.save_to_file(text, path, self._rendering)
+            while True:
+                engine.iterate()
+                # SAPI5 never reports the end of a save_to_file(): the
+                # render is done once the file is
+                if self._finished or wav_complete(path):
+                    break
+                if abort():
+                    engine.stop()
+                    return None
+                if time.monotonic() - started > self.render_timeout:
+                    engine.stop()
+                    self.render_timeouts += 1
+                    raise TimeoutError(f"rendering took over "
+                                       f"{self.render_timeout:g}s: {text!r}")
+                time.sleep(self.poll_interval)
+            pcm = read_audio(path, self.player.rate)
+            self.cache.put(text, pcm, time.monotonic() - started)
+            return pcm
+        finally:
+            self._rendering = None
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _preempted(self, request):
+        with self._cond:
+            if request.interrupt or not self._running:
+                return True
+            return bool(self._heap) and \
+                self._heap[0].priority < request.priority
+
+    # Engine callbacks, named after the request's seq; a late callback
+    # for a stopped utterance must not affect the next one
+    def _on_started(self, name):
+        request = self._current
+        if request is not None and name == str(request.seq):
+            self._started_at = time.monotonic()
+            self.time_to_first_audio.record(self._started_at -
+                                            request.created)
+
+    def _on_finished(self, name, completed):
+        request = self._current
+        if name == self._rendering or \
+                (request is not None and name == str(request.seq)):
+            self._finished = True
+
+    def _complete(self, request, outcome):
+        request.outcome = outcome
+        self.counts[outcome] += 1
+        request.done.set()
@@ -0,0 +1,215 @@
+"""
+TTS Cache - rendered audio of phrases EVA says again and again
+
+Acknowledgements and common answers are rendered to PCM once (through the
+engine's save_to_file) and kept in a bounded LRU in memory, backed by a
+bounded LRU of WAV files on disk that survives restarts.
+"""
+import collections
+import hashlib
+import os
+import threading
+import wave
+
+from modules.audio_files import write_wav
+from modules.audio_player import PLAYBACK_RATE
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".eva", "tts_cache")
+
+
+def phrase_key(text, voice=""):
+    """
+    Returns:
+        str: sha1 of the voice settings and the (whitespace / case
+        normalised) text
+    """
+    text = " ".join(text.split()).lower()
+    return hashlib.sha1(f"{voice}\n{text}".encode("utf-8")).hexdigest()
+
+
+class PhraseCache:
+    """
+    Two-tier LRU of rendered phrases, bounded by bytes in each tier.
+
+    ``voice`` identifies the engine's voice, rate and volume; the worker
+    sets it once the engine is configured, so a voice change never plays
+    audio rendered with the old one.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_memory_bytes=8 << 20,
+                 max_disk_bytes=64 << 20, rate=PLAYBACK_RATE):
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.rate = rate
+        self.voice = ""
+        self._memory = collections.OrderedDict()    # key -> pcm
+        self._disk = collections.OrderedDict()      # key -> file size
+        self._lock = threading.Lock()
+        self.memory_bytes = 0
+        self.disk_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.segment_hits = 0       # splice lookups, kept out of hit_rate
+        self.segment_misses = 0
+        self.evictions = 0
+        self.renders = 0
+        self.render_seconds = 0.0
+        if cache_dir:
+            self._load_index()
+
+    def _load_index(self):
+        """Index the WAV files already on disk, least recently used first"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        files = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".wav"):
+                continue
+            try:
+                info = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            files.append((info.st_mtime, name[:-4], info.st_size))
+        for _, key, size in sorted(files):
+            self._disk[key] = size
+            self.disk_bytes += size
+        self._evict_disk()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".wav")
+
+    def __contains__(self, text):
+        key = phrase_key(text, self.voice)
+        with self._lock:
+            return key in self._memory or key in self._disk
+
+    def get(self, text, segment=False):
+        """
+        Args:
+            segment: part of a reply (a template segment or a streamed
+                chunk); counted in segment_hits / segment_misses, so the
+                hit rate only reflects whole replies
+
+        Returns:
+            bytes: rendered mono 16-bit PCM at ``rate``, or None
+        """
+        key = phrase_key(text, self.voice)
+        with self._lock:
+            pcm = self._memory.get(key)
+            if pcm is not None:
+                self._memory.move_to_end(key)
+                self._count(segment, True)
+                return pcm
+            on_disk = key in self._disk
+
+        if on_disk:
+            try:
+                path = self._path(key)
+                with wave.open(path, "rb") as f:
+                    pcm = f.readframes(f.getnframes())
+                os.utime(path)      # mtime orders the disk LRU
+            except Exception as e:
+                print(f"TTS cache read error: {e}")
+                pcm = None
+
+        with self._lock:
+            if pcm is None:
+                if on_disk:
+                    self._drop_disk(key)
+                self._count(segment, False)
+                return None
+            self._count(segment, True)
+            if not segment:
+                self.disk_hits += 1
+            self._disk.move_to_end(key)
+            self._store_memory(key, pcm)
+            return pcm
+
+    def _count(self, segment, hit):
+        if segment:
+            if hit:
+                self.segment_hits += 1
+            else:
+                self.segment_misses += 1
+        elif hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def put(self, text, pcm, render_seconds=0.0):
+        """Store a rendered phrase in memory and on disk"""
+        if not pcm:
+            return
+        key = phrase_key(text, self.voice)
+        with self._lock:
+            self.renders += 1
+            self.render_seconds += render_seconds
+            self._store_memory(key, pcm)
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        try:
+            write_wav(path + ".tmp", pcm, self.rate)
+            os.replace(path + ".tmp", path)
+            size = os.path.getsize(path)
+        except Exception as e:
+            print(f"TTS cache write error: {e}")
+            return
+        with self._lock:
+            self.disk_bytes += size - self._disk.pop(key, 0)
+            self._disk[key] = size
+            self._evict_disk()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self.memory_bytes = 0
+            for key in list(self._disk):
+                self._drop_disk(key)
+
+    def _store_memory(self, key, pcm):
+        self.memory_bytes += len(pcm) - len(self._memory.pop(key, b""))
+        self._memory[key] = pcm
+        while self.memory_bytes > self.max_memory_bytes and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self.memory_bytes -= len(evicted)
+            self.evictions += 1
+
+    def _evict_disk(self):
+        while self.disk_bytes > self.max_disk_bytes and self._disk:
+            self._drop_disk(next(iter(self._disk)))
+            self.evictions += 1
+
+    def _drop_disk(self, key):
+        self.disk_bytes -= self._disk.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def stats(self):
+        """
+        Returns:
+            dict: hit rate, bytes held in each tier and render time
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'memory_entries': len(self._memory),
+                'memory_bytes': self.memory_bytes,
+                'disk_entries': len(self._disk),
+                'disk_bytes': self.disk_bytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups
+                else None,
+                'segment_hits': self.segment_hits,
+                'segment_misses': self.segment_misses,
+                'evictions': self.evictions,
+                'renders': self.renders,
+                'mean_render_ms': round(self.render_seconds /
+                                        self.renders * 1000, 1)
+                if self.renders else None,
+            }
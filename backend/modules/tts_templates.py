@@ -0,0 +1,197 @@
+"""
+TTS Templates - speak dynamic responses from prerendered segments
+
+A response template such as "The current time is {time}" is a fixed
+carrier phrase plus slots whose values come from a small vocabulary
+(hours, minutes, AM/PM, weekdays...). Every segment is rendered once into
+the PhraseCache; at playback time the segments of the actual response are
+looked up and joined with short crossfades, so no announcement of the
+time or date needs live synthesis.
+"""
+import calendar
+import datetime
+import re
+import string
+
+import numpy as np
+
+from modules.audio_player import PLAYBACK_RATE
+
+
+# ---------------------------
+# SLOT TYPES
+# ---------------------------
+class TimeSlot:
+    """get_time() values, e.g. "02:30 PM" -> "2", "30", "PM" """
+
+    pattern = r"(\d{1,2}):(\d{2}) ?([AP]M)"
+    groups = re.compile(pattern).groups
+
+    @staticmethod
+    def _minute(minute):
+        if minute == 0:
+            return "o'clock"
+        return f"oh {minute}" if minute < 10 else str(minute)
+
+    def split(self, match):
+        hour, minute, period = match
+        return [str(int(hour)), self._minute(int(minute)), period]
+
+    def vocabulary(self):
+        return ([str(hour) for hour in range(1, 13)] +
+                [self._minute(minute) for minute in range(60)] +
+                ["AM", "PM"])
+
+
+class DateSlot:
+    """
+    get_date() values, e.g. "Monday, January 15, 2024" -> "Monday",
+    "January", "15", "2024"
+    """
+
+    pattern = r"([A-Z][a-z]+), ([A-Z][a-z]+) (\d{1,2}), (\d{4})"
+    groups = re.compile(pattern).groups
+
+    def split(self, match):
+        weekday, month, day, year = match
+        return [weekday, month, str(int(day)), year]
+
+    def vocabulary(self):
+        year = datetime.date.today().year
+        return (list(calendar.day_name) + list(calendar.month_name)[1:] +
+                [str(day) for day in range(1, 32)] +
+                [str(year), str(year + 1)])
+
+
+SLOT_TYPES = {'time': TimeSlot(), 'date': DateSlot()}
+
+
+class ResponseTemplate:
+    """
+    One response format string from the command registry, split into
+    carrier phrases and typed slots
+    """
+
+    def __init__(self, template):
+        self.template = template
+        self.parts = []     # carrier text or slot type, in order
+        regex = []
+        for text, field, _, _ in string.Formatter().parse(template):
+            if text.strip():
+                self.parts.append(text.strip())
+            regex.append(re.escape(text))
+            if field is not None:
+                slot = SLOT_TYPES[field]
+                self.parts.append(slot)
+                regex.append(slot.pattern)
+        self._regex = re.compile("".join(regex) + "$")
+
+    @property
+    def has_slots(self):
+        return any(not isinstance(part, str) for part in self.parts)
+
+    def phrases(self):
+        """
+        Returns:
+            list: every segment this template can be spoken from
+        """
+        phrases = []
+        for part in self.parts:
+            phrases.extend([part] if isinstance(part, str)
+                           else part.vocabulary())
+        return phrases
+
+    def segments(self, text):
+        """
+        Returns:
+            list: the segment phrases that say ``text``, or None if
+            ``text`` was not produced by this template
+        """
+        match = self._regex.match(text)
+        if match is None:
+            return None
+        groups = iter(match.groups())
+        segments = []
+        for part in self.parts:
+            if isinstance(part, str):
+                segments.append(part)
+            else:
+                segments.extend(part.split(
+                    [next(groups) for _ in range(part.groups)]))
+        return segments
+
+
+def load_templates(templates):
+    """
+    Returns:
+        list: ResponseTemplate for each of ``templates`` that has slots
+        (fixed responses are cached as whole phrases instead)
+    """
+    loaded = [ResponseTemplate(template) for template in templates]
+    return [template for template in loaded if template.has_slots]
+
+
+def prerender_phrases(templates):
+    """
+    Returns:
+        list: unique phrases to render for ``templates``: fixed responses
+        whole, slotted ones as their carrier and slot segments
+    """
+    phrases = []
+    for template in map(ResponseTemplate, templates):
+        for phrase in (template.phrases() if template.has_slots
+                       else [template.template]):
+            if phrase not in phrases:
+                phrases.append(phrase)
+    return phrases
+
+
+def match_template(templates, text):
+    """
+    Returns:
+        list: segment phrases from the first template matching ``text``,
+        or None
+    """
+    for template in templates:
+        segments = template.segments(text)
+        if segments is not None:
+            return segments
+    return None
+
+
+# ---------------------------
+# SPLICING
+# ---------------------------
+def _trim_silence(samples, rate, silence_db=40.0, pad_ms=10):
+    """Cut leading / trailing engine silence, keeping ``pad_ms``"""
+    if not len(samples):
+        return samples
+    level = np.abs(samples)
+    loud = np.nonzero(level > level.max() * 10 ** (-silence_db / 20))[0]
+    if not len(loud):
+        return samples[:0]
+    pad = int(rate * pad_ms / 1000)
+    return samples[max(0, loud[0] - pad):loud[-1] + pad + 1]
+
+
+def crossfade_join(segments, rate=PLAYBACK_RATE, fade_ms=15):
+    """
+    Join mono 16-bit PCM segments, overlapping each boundary by
+    ``fade_ms`` with a linear crossfade
+
+    Returns:
+        bytes: PCM
+    """
+    fade = int(rate * fade_ms / 1000)
+    out = np.zeros(0, dtype=np.float32)
+    for pcm in segments:
+        samples = _trim_silence(
+            np.frombuffer(pcm, dtype=np.int16).astype(np.float32), rate)
+        overlap = min(fade, len(out), len(samples))
+        if overlap:
+            ramp = np.linspace(0.0, 1.0, overlap, dtype=np.float32)
+            mixed = out[-overlap:] * (1 - ramp) + samples[:overlap] * ramp
+            out = np.concatenate([out[:-overlap], mixed, samples[overlap:]])
+        else:
+            out = np.concatenate([out, samples])
+    return np.clip(out, -32768, 32767).astype(np.int16).tobytes()
@@ -0,0 +1,197 @@
+"""
+VAD - frame-level voice activity detection and utterance segmentation
+"""
+import collections
+import time
+
+import numpy as np
+
+from modules.audio_capture import SAMPLE_RATE, SAMPLE_WIDTH
+
+SPEECH_START = "speech_start"
+SPEECH_FRAMES = "speech_frames"
+SPEECH_END = "speech_end"
+
+# kind: one of the constants above
+# audio: PCM bytes (pre-roll + onset for SPEECH_START, empty for SPEECH_END)
+# timestamp: time.monotonic() when the event was produced
+VADEvent = collections.namedtuple("VADEvent", "kind audio timestamp")
+
+
+def frame_features(samples, frame_samples):
+    """
+    Per-frame RMS energy and zero-crossing rate, computed for all frames
+    of a chunk at once
+
+    Returns:
+        tuple: (rms, zcr) float arrays with one value per whole frame
+    """
+    n_frames = len(samples) // frame_samples
+    if n_frames == 0:
+        return np.zeros(0), np.zeros(0)
+
+    frames = samples[:n_frames * frame_samples].reshape(n_frames,
+                                                        frame_samples)
+    frames = frames.astype(np.float32)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    signs = np.signbit(frames)
+    zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+    return rms, zcr
+
+
+class VADSegmenter:
+    """
+    Turns a continuous 16-bit mono PCM stream into speech_start /
+    speech_frames / speech_end events.
+
+    A frame is voiced when its energy is above the noise floor
+    threshold and its zero-crossing rate looks like speech rather than
+    hiss; very loud frames count regardless of ZCR so fricatives are not
+    lost. Speech starts after ``start_frames`` voiced frames in a row and
+    ends after ``hangover_ms`` without voice (or at ``max_utterance_s``).
+    The last ``preroll_ms`` before the onset are included in the
+    speech_start event so the first syllable is not clipped.
+
+    Each call stops at a speech_end: the rest of the chunk is kept and
+    segmented first by the next call, so a following onset is not lost.
+    """
+
+    def __init__(self, noise_floor=None, rate=SAMPLE_RATE, frame_ms=20,
+                 start_frames=3, hangover_ms=400, preroll_ms=300,
+                 max_utterance_s=10.0, energy_threshold=300.0,
+                 max_zcr=0.35, loud_ratio=2.0):
+        self.noise_floor = noise_floor          # NoiseFloorTracker or None
+        self.rate = rate
+        self.frame_samples = int(rate * frame_ms / 1000)
+        self.frame_bytes = self.frame_samples * SAMPLE_WIDTH
+        self.start_frames = start_frames
+        self.hangover_frames = max(1, int(hangover_ms / frame_ms))
+        self.max_frames = int(max_utterance_s * 1000 / frame_ms)
+        self.energy_threshold = energy_threshold  # used without a tracker
+        self.max_zcr = max_zcr
+        self.loud_ratio = loud_ratio
+
+        self._preroll = collections.deque(
+            maxlen=max(start_frames, int(preroll_ms / frame_ms)))
+        self._partial = b""
+        self.reset()
+
+    @property
+    def in_speech(self):
+        return self._in_speech
+
+    def reset(self, keep_pending=False):
+        """
+        Forget any utterance in progress; with ``keep_pending``, audio
+        left over after the last speech_end is still segmented next
+        """
+        self._in_speech = False
+        self._voiced_run = 0
+        self._silent_run = 0
+        self._speech_frames = 0
+        self._preroll.clear()
+        if not keep_pending:
+            self._partial = b""
+
+    def threshold(self):
+        if self.noise_floor is not None:
+            return self.noise_floor.energy_threshold
+        return self.energy_threshold
+
+    def process(self, chunk):
+        """
+        Feed PCM bytes of any length (empty to segment what is pending)
+
+        Returns:
+            list: VADEvent objects produced by this chunk, in order, up to
+            and including the first speech_end
+        """
+        data = self._partial + chunk
+        usable = len(data) - len(data) % self.frame_bytes
+        self._partial = data[usable:]
+        if not usable:
+            return []
+
+        samples = np.frombuffer(data[:usable], dtype=np.int16)
+        rms, zcr = frame_features(samples, self.frame_samples)
+        threshold = self.threshold()
+        voiced = (rms > threshold) & \
+            ((zcr < self.max_zcr) | (rms > threshold * self.loud_ratio))
+
+        events = []
+        speech = []
+        now = time.monotonic()
+
+        for i, is_voiced in enumerate(voiced):
+            frame = data[i * self.frame_bytes:(i + 1) * self.frame_bytes]
+
+            if not self._in_speech:
+                self._preroll.append(frame)
+                self._voiced_run = self._voiced_run + 1 if is_voiced else 0
+                if self._voiced_run >= self.start_frames:
+                    self._in_speech = True
+                    self._silent_run = 0
+                    self._speech_frames = len(self._preroll)
+                    events.append(VADEvent(SPEECH_START,
+                                           b"".join(self._preroll), now))
+                    self._preroll.clear()
+                continue
+
+            speech.append(frame)
+            self._speech_frames += 1
+            self._silent_run = 0 if is_voiced else self._silent_run + 1
+
+            if self._silent_run >= self.hangover_frames or \
+                    self._speech_frames >= self.max_frames:
+                events.append(VADEvent(SPEECH_FRAMES, b"".join(speech), now))
+                events.append(VADEvent(SPEECH_END, b"", now))
+                self._in_speech = False
+                self._voiced_run = 0
+                self._partial = data[(i + 1) * self.frame_bytes:]
+                return events
+
+        if speech:
+            events.append(VADEvent(SPEECH_FRAMES, b"".join(speech), now))
+        return events
+
+
+def capture_utterance(microphone, segmenter, timeout=5.0, on_event=None,
+                      initial_audio=b""):
+    """
+    Read a MicrophoneStream's ring buffer through the segmenter until one
+    utterance has ended
+
+    Args:
+        timeout: seconds to wait for speech to start
+        on_event: optional callback(VADEvent), called as events arrive so
+            decoding can begin while the user is still speaking
+        initial_audio: PCM already taken from the ring buffer (e.g. what
+            followed the wake word), segmented before anything new.
+            Without it, audio the previous call read past its speech_end
+            is segmented first
+
+    Returns:
+        bytes: PCM of the utterance (pre-roll included), or None if no
+        speech started within ``timeout``
+    """
+    segmenter.reset(keep_pending=not initial_audio)
+    deadline = time.monotonic() + timeout
+    audio = []
+    pending = [initial_audio] if initial_audio else [b""]
+
+    while True:
+        if not segmenter.in_speech and time.monotonic() > deadline:
+            return None
+
+        chunk = pending.pop() if pending else microphone.ring.get(timeout=0.5)
+        if chunk is None:
+            if not microphone.is_running:
+                return None
+            continue
+
+        for event in segmenter.process(chunk):
+            if on_event is not None:
+                on_event(event)
+            if event.kind == SPEECH_END:
+                return b"".join(audio)
+            audio.append(event.audio)
@@ -0,0 +1,502 @@
+"""
+Wake Word - always-on keyword spotting on the raw microphone stream
+
+Two spotters, tried in this order by load_wake_detector():
+
+* TemplateSpotter: MFCC frames matched against a few recordings of the
+  wake word with subsequence DTW. Cheap, needs WAV templates.
+* GrammarSpotter: a Vosk recognizer whose grammar only contains the wake
+  phrases, run on the shared model.
+
+Record templates with ``python eva.py enroll`` (see enroll()).
+
+Only audio after the detected end of the wake word is handed on, so the
+main recognizer never sees background conversation.
+"""
+import argparse
+import collections
+import functools
+import glob
+import json
+import os
+import sys
+import time
+import wave
+
+import numpy as np
+
+from modules.audio_capture import SAMPLE_RATE, SAMPLE_WIDTH
+from modules.model_pool import registry
+from modules.recognizers import UNKNOWN_WORD, VOSK_MODEL_PATH
+
+try:
+    import vosk
+except ImportError:
+    vosk = None
+
+WAKE_TEMPLATE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "wake_templates")
+
+
+# ---------------------------
+# FEATURES
+# ---------------------------
+@functools.lru_cache(maxsize=4)
+def _mel_filterbank(rate, n_fft, n_mels):
+    def to_mel(hz):
+        return 2595 * np.log10(1 + hz / 700)
+
+    def to_hz(mel):
+        return 700 * (10 ** (mel / 2595) - 1)
+
+    edges = to_hz(np.linspace(to_mel(0), to_mel(rate / 2), n_mels + 2))
+    bins = np.floor((n_fft + 1) * edges / rate).astype(int)
+    bank = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        for k in range(left, center):
+            bank[m - 1, k] = (k - left) / max(center - left, 1)
+        for k in range(center, right):
+            bank[m - 1, k] = (right - k) / max(right - center, 1)
+    return bank
+
+
+@functools.lru_cache(maxsize=4)
+def _dct_matrix(n_mels, n_ceps):
+    n = np.arange(n_mels)
+    return np.cos(np.pi / n_mels * (n + 0.5) *
+                  np.arange(n_ceps)[:, None]).astype(np.float32)
+
+
+def mfcc(samples, rate=SAMPLE_RATE, frame_ms=25, hop_ms=10, n_mels=26,
+         n_ceps=13, n_fft=512):
+    """
+    MFCCs of int16 samples, without c0 (so loudness does not matter)
+
+    Returns:
+        np.ndarray: (frames, n_ceps - 1) float32
+    """
+    frame = int(rate * frame_ms / 1000)
+    hop = int(rate * hop_ms / 1000)
+    if len(samples) < frame:
+        return np.zeros((0, n_ceps - 1), dtype=np.float32)
+
+    x = samples.astype(np.float32)
+    x = np.append(x[0], x[1:] - 0.97 * x[:-1])       # pre-emphasis
+    n_frames = 1 + (len(x) - frame) // hop
+    index = np.arange(frame)[None, :] + hop * np.arange(n_frames)[:, None]
+    frames = x[index] * np.hamming(frame).astype(np.float32)
+
+    power = np.abs(np.fft.rfft(frames, n_fft)) ** 2 / n_fft
+    mel = np.log(power @ _mel_filterbank(rate, n_fft, n_mels).T + 1e-6)
+    return (mel @ _dct_matrix(n_mels, n_ceps).T)[:, 1:]
+
+
+def _cosine_cost(template, frames):
+    a = template / (np.linalg.norm(template, axis=1, keepdims=True) + 1e-9)
+    b = frames / (np.linalg.norm(frames, axis=1, keepdims=True) + 1e-9)
+    return 1.0 - a @ b.T
+
+
+def dtw_last_row(cost, open_begin=True):
+    """
+    DTW accumulated cost of matching all template rows, for every end
+    column. With ``open_begin`` the match may start at any column
+    (subsequence DTW), so the last row scores "template ends here".
+
+    Returns:
+        np.ndarray: accumulated cost per column, divided by template length
+    """
+    rows, cols = cost.shape
+    prev = cost[0].copy() if open_begin else np.cumsum(cost[0])
+    for i in range(1, rows):
+        # diagonal / vertical step, then the horizontal steps as a
+        # min-plus prefix scan so the row stays vectorised
+        step = prev.copy()
+        step[1:] = np.minimum(prev[1:], prev[:-1])
+        step += cost[i]
+        prefix = np.concatenate([[0.0], np.cumsum(cost[i][1:])])
+        prev = prefix + np.minimum.accumulate(step - prefix)
+    return prev / rows
+
+
+# ---------------------------
+# SPOTTERS
+# ---------------------------
+class TemplateSpotter:
+    """
+    Matches the incoming MFCC stream against recorded wake word
+    templates. Scoring runs every ``score_every`` frames and only while
+    the recent audio is above the noise floor, so silence costs almost
+    nothing.
+    """
+
+    kind = "template"
+
+    def __init__(self, templates, threshold=None, rate=SAMPLE_RATE,
+                 noise_floor=None, score_every=10, hop_ms=10,
+                 energy_threshold=300.0):
+        if not templates:
+            raise ValueError("At least one wake word template is needed")
+        self.templates = templates          # list of MFCC arrays
+        self.rate = rate
+        self.noise_floor = noise_floor
+        self.energy_threshold = energy_threshold
+        self.hop = int(rate * hop_ms / 1000)
+        self.frame = int(rate * 0.025)      # mfcc() frame length
+        self.score_every = score_every
+        self.window = int(1.5 * max(len(t) for t in templates))
+        self.threshold = threshold or self.calibrate(templates)
+        self.last_score = None
+        self.reset()
+
+    @staticmethod
+    def calibrate(templates, margin=1.25, minimum=0.25):
+        """
+        Detection threshold from how far the templates are from each
+        other, but never below ``minimum`` (near-identical recordings
+        would otherwise make it too strict to ever fire)
+        """
+        distances = [dtw_last_row(_cosine_cost(a, b), open_begin=False)[-1]
+                     for i, a in enumerate(templates)
+                     for b in templates[i + 1:]]
+        return max([minimum] + [d * margin for d in distances])
+
+    @classmethod
+    def from_directory(cls, directory=WAKE_TEMPLATE_DIR, **kwargs):
+        """Load every 16-bit mono WAV in ``directory`` as a template"""
+        templates = []
+        for path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+            with wave.open(path, "rb") as wav:
+                pcm = wav.readframes(wav.getnframes())
+            templates.append(mfcc(np.frombuffer(pcm, dtype=np.int16)))
+        return cls(templates, **kwargs)
+
+    def reset(self):
+        self._samples = np.zeros(0, dtype=np.int16)
+        self._features = np.zeros((0, self.templates[0].shape[1]),
+                                  dtype=np.float32)
+        self._loud = np.zeros(0, dtype=bool)
+        self._pending = 0
+        self._frames = 0        # feature frames since reset
+        self._armed = None      # (score, frame) of the best match so far
+
+    def process(self, pcm):
+        """
+        Returns:
+            int: samples received after the end of the wake word if it
+            was detected in this chunk, else None
+        """
+        self._samples = np.concatenate(
+            [self._samples, np.frombuffer(pcm, dtype=np.int16)])
+        features = mfcc(self._samples, self.rate)
+        if not len(features):
+            return None
+        consumed = len(features) * self.hop
+        loud = self._frame_rms(self._samples[:consumed]) > self._threshold()
+        self._samples = self._samples[consumed:]
+
+        self._features = np.concatenate([self._features, features])
+        self._features = self._features[-self.window:]
+        self._loud = np.concatenate([self._loud, loud])[-self.window:]
+        self._frames += len(features)
+        self._pending += len(features)
+        if self._pending < self.score_every:
+            return None
+        new, self._pending = self._pending, 0
+
+        best = None
+        if self._loud.any():
+            scores = np.min([dtw_last_row(_cosine_cost(t, self._features))
+                             for t in self.templates], axis=0)
+            recent = scores[-new:]
+            end = int(np.argmin(recent))
+            self.last_score = float(recent[end])
+            best = (self.last_score, self._frames - new + end)
+
+        # A match scores under the threshold before the word is over;
+        # wait until the score stops improving to locate its end
+        if best is not None and best[0] <= self.threshold and \
+                (self._armed is None or best[0] < self._armed[0]):
+            self._armed = best
+            return None
+        if self._armed is None:
+            return None
+        _, end_frame = self._armed
+        self._armed = None
+        received = self._frames * self.hop + len(self._samples)
+        return max(0, received - (end_frame * self.hop + self.frame))
+
+    def _frame_rms(self, samples):
+        frames = samples[:len(samples) // self.hop * self.hop]
+        frames = frames.reshape(-1, self.hop).astype(np.float32)
+        return np.sqrt(np.mean(frames * frames, axis=1))
+
+    def _threshold(self):
+        if self.noise_floor is not None:
+            return self.noise_floor.energy_threshold
+        return self.energy_threshold
+
+
+class GrammarSpotter:
+    """
+    Vosk recognizer restricted to the wake phrases (plus [unk]), on the
+    model shared with the main backend. A partial containing the keyword
+    is confirmed with the word timings of the final result.
+    """
+
+    kind = "grammar"
+
+    def __init__(self, model, phrases, rate=SAMPLE_RATE, min_confidence=0.5):
+        self.rate = rate
+        self.min_confidence = min_confidence
+        # The last word of each phrase ("eva" for "hey eva") is the keyword
+        self.keywords = {phrase.split()[-1] for phrase in phrases}
+        self.recognizer = vosk.KaldiRecognizer(
+            model, rate, json.dumps(list(phrases) + [UNKNOWN_WORD]))
+        self.recognizer.SetWords(True)
+        self.last_score = None
+        self._fed = 0       # samples since the recognizer was created
+
+    @classmethod
+    def from_model_path(cls, phrases, model_path=VOSK_MODEL_PATH, **kwargs):
+        if vosk is None:
+            raise RuntimeError("vosk is not installed (pip install vosk)")
+        if not os.path.isdir(model_path):
+            raise RuntimeError(f"Vosk model not found: {model_path}")
+        vosk.SetLogLevel(-1)
+        return cls(registry.get_model(model_path, vosk.Model), phrases,
+                   **kwargs)
+
+    def reset(self):
+        # Word times keep counting from the recognizer's creation, so
+        # only the decoder state is cleared here
+        self.recognizer.FinalResult()
+
+    def process(self, pcm):
+        """
+        Returns:
+            int: samples received after the end of the wake word if it
+            was detected in this chunk, else None
+        """
+        self._fed += len(pcm) // SAMPLE_WIDTH
+        if self.recognizer.AcceptWaveform(pcm):
+            result = json.loads(self.recognizer.Result())
+        else:
+            partial = json.loads(self.recognizer.PartialResult()).get(
+                "partial", "")
+            if not self.keywords & set(partial.split()):
+                return None
+            result = json.loads(self.recognizer.FinalResult())
+
+        hits = [w for w in result.get("result", [])
+                if w.get("word") in self.keywords]
+        if not hits:
+            return None
+        self.last_score = hits[-1].get("conf", 1.0)
+        if self.last_score < self.min_confidence:
+            return None
+        end = int(hits[-1].get("end", 0) * self.rate)
+        return min(max(0, self._fed - end), self._fed)
+
+
+# ---------------------------
+# DETECTOR
+# ---------------------------
+class WakeWordDetector:
+    """
+    Feeds microphone chunks to a spotter and keeps the last few seconds
+    of PCM, so the audio after the wake word can be carried over to the
+    recognizer
+    """
+
+    def __init__(self, spotter, history_s=2.0, rate=SAMPLE_RATE):
+        self.spotter = spotter
+        self.rate = rate
+        self.max_history = int(history_s * rate) * SAMPLE_WIDTH
+        self._history = collections.deque()
+        self._history_bytes = 0
+        self.detections = 0
+        self.chunks = 0
+        self.cpu_seconds = 0.0
+
+    def process(self, chunk):
+        """
+        Returns:
+            bytes: PCM following the wake word if it was detected (may be
+            empty), else None
+        """
+        self._history.append(chunk)
+        self._history_bytes += len(chunk)
+        while self._history_bytes - len(self._history[0]) >= self.max_history:
+            self._history_bytes -= len(self._history.popleft())
+
+        started = time.process_time()
+        samples_after = self.spotter.process(chunk)
+        self.cpu_seconds += time.process_time() - started
+        self.chunks += 1
+        if samples_after is None:
+            return None
+
+        self.detections += 1
+        keep = samples_after * SAMPLE_WIDTH
+        carry = b"".join(self._history)[-keep:] if keep else b""
+        self._history.clear()
+        self._history_bytes = 0
+        self.spotter.reset()
+        return carry
+
+    def recent(self, seconds):
+        """
+        Returns:
+            bytes: the last ``seconds`` of PCM read from the microphone
+            (at most ``history_s``)
+        """
+        keep = int(seconds * self.rate) * SAMPLE_WIDTH
+        return b"".join(self._history)[-keep:] if keep > 0 else b""
+
+    def wait(self, microphone, timeout=None, stop=None):
+        """
+        Read the microphone ring buffer until the wake word is heard
+
+        Args:
+            stop: callable checked before every chunk; True ends the wait
+                (the chunks not read yet stay in the ring buffer)
+
+        Returns:
+            bytes: carried-over PCM, or None on timeout / stop / stopped
+            stream
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while deadline is None or time.monotonic() < deadline:
+            if stop is not None and stop():
+                return None
+            chunk = microphone.ring.get(timeout=0.5)
+            if chunk is None:
+                if not microphone.is_running:
+                    return None
+                continue
+            carry = self.process(chunk)
+            if carry is not None:
+                return carry
+        return None
+
+    def stats(self):
+        return {
+            'spotter': self.spotter.kind,
+            'detections': self.detections,
+            'chunks': self.chunks,
+            'cpu_seconds': round(self.cpu_seconds, 3),
+            'last_score': self.spotter.last_score,
+        }
+
+
+def load_wake_detector(phrases, template_dir=WAKE_TEMPLATE_DIR,
+                       noise_floor=None):
+    """
+    Template spotter if there are recordings in ``template_dir``,
+    otherwise the Vosk grammar spotter
+
+    Returns:
+        WakeWordDetector: or None if neither can be loaded
+    """
+    if glob.glob(os.path.join(template_dir, "*.wav")):
+        try:
+            spotter = TemplateSpotter.from_directory(
+                template_dir, noise_floor=noise_floor)
+            print(f"✅ Wake word: {len(spotter.templates)} templates, "
+                  f"threshold {spotter.threshold:.3f}")
+            return WakeWordDetector(spotter)
+        except Exception as e:
+            print(f"⚠️ Wake word templates unusable: {e}")
+    try:
+        spotter = GrammarSpotter.from_model_path(phrases)
+        print(f"✅ Wake word: Vosk grammar {sorted(spotter.keywords)}")
+        return WakeWordDetector(spotter)
+    except Exception as e:
+        print(f"⚠️ Wake word spotter unavailable: {e}")
+    return None
+
+
+def save_template(pcm, directory=WAKE_TEMPLATE_DIR, rate=SAMPLE_RATE):
+    """
+    Write one recording of the wake word (e.g. from capture_utterance)
+    as a template
+
+    Returns:
+        str: path of the new WAV file
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"wake_{int(time.time() * 1000)}.wav")
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(SAMPLE_WIDTH)
+        wav.setframerate(rate)
+        wav.writeframes(pcm)
+    return path
+
+
+# ---------------------------
+# ENROLMENT
+# ---------------------------
+def enroll(count=3, directory=WAKE_TEMPLATE_DIR, replace=False,
+           timeout=5.0):
+    """
+    Record ``count`` utterances of the wake word from the microphone as
+    templates, so load_wake_detector() uses the TemplateSpotter
+
+    Returns:
+        TemplateSpotter: loaded from ``directory`` after recording
+    """
+    from modules.audio_capture import MicrophoneStream
+    from modules.noise_floor import NoiseFloorTracker
+    from modules.vad import VADSegmenter, capture_utterance
+
+    if replace:
+        for path in glob.glob(os.path.join(directory, "wake_*.wav")):
+            os.remove(path)
+
+    microphone = MicrophoneStream()
+    noise_floor = NoiseFloorTracker()
+    microphone.add_listener(noise_floor.update)
+    segmenter = VADSegmenter(noise_floor, hangover_ms=300,
+                             max_utterance_s=2.5)
+    microphone.start()
+    try:
+        print("🤫 Measuring background noise, stay quiet...")
+        time.sleep(1.5)
+        saved = 0
+        while saved < count:
+            print(f"🎙️ Say the wake word ({saved + 1}/{count})")
+            pcm = capture_utterance(microphone, segmenter, timeout=timeout)
+            if pcm is None:
+                print("⏱️ Nothing heard, try again")
+                continue
+            print(f"✅ Saved {save_template(pcm, directory)}")
+            saved += 1
+    finally:
+        microphone.stop()
+
+    spotter = TemplateSpotter.from_directory(directory)
+    print(f"✅ {len(spotter.templates)} templates, "
+          f"threshold {spotter.threshold:.3f}")
+    return spotter
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="eva.py enroll",
+        description="Record wake word templates for the keyword spotter")
+    parser.add_argument("-n", "--count", type=int, default=3,
+                        help="recordings to make (default: 3)")
+    parser.add_argument("--dir", default=WAKE_TEMPLATE_DIR,
+                        help="template directory")
+    parser.add_argument("--replace", action="store_true",
+                        help="delete the existing templates first")
+    args = parser.parse_args(argv)
+    enroll(args.count, args.dir, args.replace)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
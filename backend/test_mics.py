@@ -1,3 +1,4 @@
+import pyaudio
 import speech_recognition as sr
 
 MIC_INDEX = 5  # from your test_mics.py
@@ -6,8 +7,11 @@ r = sr.Recognizer()
 
 print(f"[TEST] Using device index: {MIC_INDEX}")
 print("[TEST] Listing microphones:")
-for i, name in enumerate(sr.Microphone.list_microphone_names()):
-    print(f"  {i}: {name}")
+audio = pyaudio.PyAudio()
+devices = audio.snapshot_devices()
+audio.terminate()
+for device in devices.input_devices():
+    print(f"  {device['index']}: {device['name']}")
 
 with sr.Microphone(device_index=MIC_INDEX) as source:
     print("\n[TEST] Adjusting for ambient noise (0.5s)...")
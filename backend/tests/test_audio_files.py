@@ -0,0 +1,58 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                ".."))
+
+from modules.audio_files import aifc_custom, read_audio, wav_complete, \
+    write_wav
+
+RATE = 16000
+
+
+class AudioFilesTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.pcm = (np.arange(1600, dtype=np.int16) * 17).tobytes()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def write_aifc(self, comptype):
+        path = os.path.join(self.dir, f"{comptype.decode()}.aifc")
+        with aifc_custom.open(path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(RATE)
+            f.setcomptype(comptype, b"little endian")
+            # Frames are passed big-endian, as for uncompressed AIFF
+            f.writeframes(np.frombuffer(self.pcm, dtype=np.int16)
+                          .astype(">i2").tobytes())
+        return path
+
+    def test_sowt_in_either_case(self):
+        for comptype in (b"sowt", b"SOWT"):
+            self.assertEqual(read_audio(self.write_aifc(comptype), RATE),
+                             self.pcm, comptype)
+
+    def test_wav_complete(self):
+        path = os.path.join(self.dir, "speech.wav")
+        write_wav(path, self.pcm, RATE)
+        self.assertTrue(wav_complete(path))
+
+        with open(path, "rb") as f:
+            data = f.read()
+        with open(path, "wb") as f:
+            f.write(data[:-100])        # still being written
+        self.assertFalse(wav_complete(path))
+        open(path, "wb").close()
+        self.assertFalse(wav_complete(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
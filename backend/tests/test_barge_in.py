@@ -0,0 +1,65 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                ".."))
+
+from modules.barge_in import BargeInDetector
+
+RATE = 16000
+FRAME = RATE // 50          # 20 ms
+REFERENCE_RMS = 3000.0
+
+
+class StandInNoiseFloor:
+    energy_threshold = 100.0
+
+
+def tone(rms, hz=400):
+    """20 ms of a sine (a whole number of cycles) with the given RMS"""
+    t = np.arange(FRAME) / RATE
+    signal = np.sin(2 * np.pi * hz * t) * rms * np.sqrt(2)
+    return signal.astype(np.int16).tobytes()
+
+
+class BargeInDetectorTests(unittest.TestCase):
+    def setUp(self):
+        self.interrupts = 0
+        self.detector = BargeInDetector(StandInNoiseFloor(),
+                                        on_barge_in=self.interrupt,
+                                        rate=RATE, initial_gain=0.5)
+
+    def interrupt(self):
+        self.interrupts += 1
+        return True
+
+    def frames(self, mic_levels):
+        """EVA plays a steady reference while the mic hears each level"""
+        for level in mic_levels:
+            self.detector.reference(tone(REFERENCE_RMS))
+            self.detector.process(tone(level))
+
+    def test_echo_alone_does_not_trigger(self):
+        # A louder echo than expected, but within the margin: learned
+        self.frames([0.8 * REFERENCE_RMS] * 100)
+
+        self.assertEqual(self.interrupts, 0)
+        self.assertGreater(self.detector.echo_gain, 0.75)
+
+    def test_user_speech_triggers_once(self):
+        echo = 0.5 * REFERENCE_RMS
+        self.frames([echo] * 50)
+        # The voice fades in below the margin before it is 8.6 dB louder
+        # than the echo; the onset must not raise the expected echo
+        self.frames([1.4 * echo, 1.8 * echo] + [2.7 * echo] * 20)
+
+        self.assertEqual(self.interrupts, 1)
+        self.assertEqual(self.detector.stats()['barge_ins'], 1)
+        self.assertLess(self.detector.echo_gain, 0.6)
+
+
+if __name__ == '__main__':
+    unittest.main()
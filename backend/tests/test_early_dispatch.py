@@ -0,0 +1,84 @@
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                ".."))
+
+from modules.command_handler import EarlyDispatcher
+
+
+class EarlyDispatcherTests(unittest.TestCase):
+    def setUp(self):
+        self.ran = []
+        self.block = None       # (command, event it waits for)
+        self.dispatcher = EarlyDispatcher(run=self.handle)
+
+    def handle(self, command):
+        if self.block and command == self.block[0]:
+            self.block[1].wait(5.0)
+        self.ran.append(command)
+        return f"ran {command}"
+
+    def dispatch(self, partial):
+        self.dispatcher.start()
+        dispatched = [self.dispatcher.partial(partial)
+                      for _ in range(self.dispatcher.stable_partials)]
+        self.assertEqual(dispatched[-1], True)
+
+    def test_same_command_reuses_early_response(self):
+        self.dispatch("open youtube")
+        response = self.dispatcher.resolve("open youtube please")
+
+        self.assertEqual(response, "ran open youtube")
+        self.assertIsNotNone(self.dispatcher.answered_at)
+        stats = self.dispatcher.stats()
+        self.assertEqual(stats['confirmed'], 1)
+        self.assertIsNotNone(stats['mean_saved_ms'])
+
+    def test_other_command_is_a_mismatch(self):
+        self.dispatch("open youtube")
+        self.assertIsNone(self.dispatcher.resolve("open google"))
+        self.assertEqual(self.dispatcher.stats()['mismatched'], 1)
+
+    def test_no_command_is_a_mismatch(self):
+        self.dispatch("open youtube")
+        self.assertIsNone(self.dispatcher.resolve("what a nice day"))
+        self.assertIsNone(self.dispatcher.resolve(""))
+
+        stats = self.dispatcher.stats()
+        self.assertEqual(stats['confirmed'], 0)
+        # Time saved only counts for early responses that stood
+        self.assertIsNone(stats['mean_saved_ms'])
+
+    def test_mismatch_cancels_a_dispatch_not_started(self):
+        busy = threading.Event()
+        self.block = ("open youtube", busy)
+        self.dispatch("open youtube")       # occupies the only worker
+        self.dispatcher.start()
+        self.dispatch("open google")
+
+        try:
+            self.assertIsNone(self.dispatcher.resolve("open github"))
+        finally:
+            busy.set()
+        self.dispatcher._executor.shutdown(wait=True)
+        self.assertEqual(self.ran, ["open youtube"])
+        self.assertEqual(self.dispatcher.stats()['cancelled'], 1)
+
+    def test_resolved_once(self):
+        self.dispatch("open youtube")
+        self.assertIsNone(self.dispatcher.resolve(""))
+        self.assertIsNone(self.dispatcher.resolve("open youtube"))
+        stats = self.dispatcher.stats()
+        self.assertEqual((stats['mismatched'], stats['confirmed']), (1, 0))
+
+    def test_nothing_dispatched(self):
+        self.dispatcher.start()
+        self.assertIsNone(self.dispatcher.resolve("open youtube"))
+        self.assertEqual(self.ran, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
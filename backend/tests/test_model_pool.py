@@ -0,0 +1,39 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                ".."))
+
+from modules import model_pool
+from modules.model_pool import ModelRegistry
+
+
+def load_64mb(path):
+    return b"\x01" * (64 << 20)
+
+
+class ModelRegistryTests(unittest.TestCase):
+    def test_stats_report_load_time_and_resident_size(self):
+        registry = ModelRegistry()
+        registry.get_model("model-a", load_64mb)
+
+        stats = registry.stats()['models']['model-a']
+        self.assertGreaterEqual(stats['load_time'], 0)
+        if model_pool.psutil is None:
+            self.assertIsNone(stats['resident_bytes'])
+        else:
+            self.assertGreater(stats['resident_bytes'], 32 << 20)
+
+    def test_evicted_model_is_reloaded(self):
+        registry = ModelRegistry()
+        registry.get_model("model-a", load_64mb)
+        registry.evict("model-a")
+
+        session = registry.acquire("model-a", "key", len)
+        self.assertEqual(session, 64 << 20)
+        self.assertEqual(registry.stats()['reloads'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                ".."))
+
+from modules.noise_floor import NoiseFloorTracker
+
+
+def chunk(rms, samples=1024):
+    return np.full(samples, rms, dtype=np.int16).tobytes()
+
+
+class NoiseFloorTrackerTests(unittest.TestCase):
+    def setUp(self):
+        self.tracker = NoiseFloorTracker(initial_floor=100.0)
+        for _ in range(self.tracker.warmup_chunks):
+            self.tracker.update(chunk(100))
+
+    def test_warmup_converges(self):
+        self.assertAlmostEqual(self.tracker.noise_floor, 100.0, delta=1.0)
+
+    def test_rewarm_rise_is_clamped(self):
+        # Long TTS playback: loud enough to count as speech throughout
+        for _ in range(self.tracker.rewarm_chunks):
+            self.tracker.update(chunk(3000))
+        self.assertEqual(self.tracker.stats()['rewarms'], 1)
+
+        # Its tail runs into the re-warm
+        for _ in range(self.tracker.warmup_chunks):
+            self.tracker.update(chunk(3000))
+        limit = 100.0 * self.tracker.rewarm_max_rise ** \
+            self.tracker.warmup_chunks
+        self.assertLessEqual(self.tracker.noise_floor, limit + 1e-6)
+        self.assertLess(self.tracker.energy_threshold, 3000)
+
+
+if __name__ == '__main__':
+    unittest.main()
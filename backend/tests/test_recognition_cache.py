@@ -0,0 +1,166 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                ".."))
+
+from modules.recognition_cache import (CachedRecognizer, fingerprint,
+                                       fingerprint_distance)
+from modules.recognizers import (BufferedSession, RecognitionResult,
+                                 RecognizerBackend)
+
+RATE = 16000
+
+
+def utterance(seed, stretch=1.0, lead_s=0.2):
+    """Speech-like test signal: voiced syllables with a random pitch,
+    length and loudness (some with fricative noise), and pauses"""
+    rng = np.random.default_rng(seed)
+    parts = [np.zeros(int(RATE * lead_s))]
+    for syllable in range(rng.integers(3, 6)):
+        n = int(RATE * rng.uniform(0.12, 0.3) * stretch)
+        t = np.arange(n) / RATE
+        f0 = rng.uniform(100, 220)
+        envelope = np.sin(np.pi * np.arange(n) / n) ** rng.uniform(0.5, 2)
+        voiced = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 8))
+        voiced *= envelope * rng.uniform(1500, 5000)
+        if rng.random() < 0.4:
+            hiss = np.random.default_rng(seed * 7 + syllable).normal(0, 1, n)
+            voiced += hiss * envelope * rng.uniform(500, 2000)
+        parts.append(voiced)
+        parts.append(np.zeros(int(RATE * rng.uniform(0.03, 0.12) * stretch)))
+    parts.append(np.zeros(int(RATE * 0.3)))
+    return np.concatenate(parts)
+
+
+def to_pcm(signal, noise_rms=0.0, seed=0):
+    if noise_rms:
+        signal = signal + np.random.default_rng(seed).normal(
+            0, noise_rms, len(signal))
+    return np.clip(signal, -32768, 32767).astype(np.int16).tobytes()
+
+
+class StandInSession(BufferedSession):
+    """Streams ``partial`` as its partial transcript (None: no partials)"""
+
+    def accept(self, pcm):
+        super().accept(pcm)
+        if self.backend.partial is None:
+            return None
+        return RecognitionResult(self.backend.partial, 0.9, False,
+                                 self.backend.name, 0.0)
+
+
+class StandInBackend(RecognizerBackend):
+    name = "stand-in"
+
+    def __init__(self, text="open youtube"):
+        self.text = text
+        self.partial = text
+        self.requests = 0
+
+    def start_session(self):
+        return StandInSession(self)
+
+    def transcribe(self, pcm):
+        self.requests += 1
+        return self.text, 0.95
+
+
+class FingerprintTests(unittest.TestCase):
+    def setUp(self):
+        self.original = fingerprint(to_pcm(utterance(1)), RATE)
+        self.cache = CachedRecognizer(StandInBackend())
+
+    def assertNear(self, pcm):
+        distance = fingerprint_distance(self.original, fingerprint(pcm, RATE))
+        self.assertLessEqual(distance, self.cache.max_distance)
+
+    def test_noisy_repeat_matches(self):
+        self.assertNear(to_pcm(utterance(1), noise_rms=30, seed=1))
+        self.assertNear(to_pcm(utterance(1), noise_rms=100, seed=2))
+
+    def test_louder_quieter_and_shifted_repeats_match(self):
+        self.assertNear(to_pcm(utterance(1) * 0.3, noise_rms=30, seed=3))
+        self.assertNear(to_pcm(utterance(1) * 2, noise_rms=30, seed=4))
+        self.assertNear(to_pcm(utterance(1, lead_s=0.45), noise_rms=30,
+                               seed=5))
+        self.assertNear(to_pcm(utterance(1, stretch=1.05), noise_rms=30,
+                               seed=6))
+
+    def test_different_utterances_do_not_match(self):
+        for seed in range(2, 30):
+            other = fingerprint(to_pcm(utterance(seed), noise_rms=30), RATE)
+            self.assertGreater(fingerprint_distance(self.original, other),
+                               self.cache.max_distance, seed)
+
+    def test_silence_has_no_fingerprint(self):
+        self.assertIsNone(fingerprint(to_pcm(np.zeros(RATE)), RATE))
+        self.assertIsNone(fingerprint(b"\x00\x00", RATE))
+
+
+class CachedRecognizerTests(unittest.TestCase):
+    def setUp(self):
+        self.backend = StandInBackend()
+        self.cache = CachedRecognizer(self.backend)
+
+    def test_noisy_repeat_is_a_hit(self):
+        first = self.cache.recognize(to_pcm(utterance(1), 30, seed=1))
+        again = self.cache.recognize(to_pcm(utterance(1), 30, seed=2))
+
+        self.assertEqual(first.backend, "stand-in")
+        self.assertEqual(again.backend, "cache")
+        self.assertEqual(again.text, "open youtube")
+        self.assertEqual(self.backend.requests, 1)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_disagreeing_partial_is_decoded(self):
+        self.cache.recognize(to_pcm(utterance(1), 30, seed=1))
+        # Sounds the same, but the decoder hears other words
+        self.backend.text = self.backend.partial = "open github"
+        again = self.cache.recognize(to_pcm(utterance(1), 30, seed=2))
+
+        self.assertEqual(again.text, "open github")
+        self.assertEqual(again.backend, "stand-in")
+        self.assertEqual(self.backend.requests, 2)
+        self.assertEqual(self.cache.stats()['unconfirmed'], 1)
+
+    def test_no_partial_is_decoded(self):
+        self.backend.partial = None
+        self.cache.recognize(to_pcm(utterance(1), 30, seed=1))
+        again = self.cache.recognize(to_pcm(utterance(1), 30, seed=2))
+
+        self.assertEqual(again.backend, "stand-in")
+        self.assertEqual(self.backend.requests, 2)
+
+    def test_different_utterance_is_a_miss(self):
+        self.cache.recognize(to_pcm(utterance(1), 30, seed=1))
+        other = self.cache.recognize(to_pcm(utterance(2), 30, seed=2))
+
+        self.assertEqual(other.backend, "stand-in")
+        self.assertEqual(self.backend.requests, 2)
+        self.assertEqual(self.cache.stats()['entries'], 2)
+
+    def test_repeat_replaces_its_entry(self):
+        for seed in range(3):
+            self.cache.store(
+                fingerprint(to_pcm(utterance(1), 30, seed=seed), RATE),
+                RecognitionResult("open youtube", 0.95, True, "stand-in",
+                                  0.0))
+        self.assertEqual(self.cache.stats()['entries'], 1)
+
+    def test_lengths_far_apart_are_not_compared(self):
+        short = fingerprint(to_pcm(utterance(1)), RATE)
+        long = fingerprint(to_pcm(utterance(1, stretch=2.0)), RATE)
+        self.cache.store(short, RecognitionResult("open youtube", 0.95,
+                                                  True, "stand-in", 0.0))
+
+        self.assertEqual(self.cache._nearest(long), (None, float("inf")))
+        self.assertIsNotNone(self.cache._nearest(short)[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
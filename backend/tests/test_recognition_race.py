@@ -0,0 +1,139 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                ".."))
+
+from modules.recognition_race import RacingBackend
+from modules.recognizers import RecognitionResult, RecognizerBackend
+
+
+class StandInSession:
+    """finish() takes ``delay`` seconds unless cancelled first"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.cancelled = threading.Event()
+
+    def accept(self, pcm):
+        return None
+
+    def finish(self):
+        started = time.monotonic()
+        if self.cancelled.wait(self.backend.delay):
+            text, confidence = "", 0.0
+        else:
+            text, confidence = self.backend.text, self.backend.confidence
+        self.backend.finish_time = time.monotonic() - started
+        return RecognitionResult(text, confidence, True, self.backend.name,
+                                 self.backend.finish_time)
+
+    def cancel(self):
+        self.cancelled.set()
+
+
+class StandInBackend(RecognizerBackend):
+    def __init__(self, name, delay, text="open youtube", confidence=0.9):
+        self.name = name
+        self.delay = delay
+        self.text = text
+        self.confidence = confidence
+        self.finish_time = None
+        self.sessions = []
+
+    def start_session(self):
+        session = StandInSession(self)
+        self.sessions.append(session)
+        return session
+
+
+class StuckSession(StandInSession):
+    """A request already sent: cancel() does not stop it"""
+
+    def finish(self):
+        self.backend.release.wait(5.0)
+        return RecognitionResult("", 0.0, True, self.backend.name, 0.0)
+
+
+class StuckBackend(StandInBackend):
+    def __init__(self, name):
+        super().__init__(name, 0.0)
+        self.release = threading.Event()
+
+    def start_session(self):
+        session = StuckSession(self)
+        self.sessions.append(session)
+        return session
+
+
+class RecognitionRaceTests(unittest.TestCase):
+    def setUp(self):
+        self.fast = StandInBackend("fast", 0.01)
+        self.slow = StandInBackend("slow", 5.0)
+        self.race = RacingBackend([self.fast, self.slow], timeout=2.0)
+
+    def tearDown(self):
+        for backend in (self.fast, self.slow):
+            for session in backend.sessions:
+                session.cancel()
+        self.race.shutdown()
+
+    def test_running_loser_is_cancelled(self):
+        result = self.race.recognize(b"\x00\x00" * 160)
+
+        self.assertEqual(result.text, "open youtube")
+        self.assertTrue(self.slow.sessions[0].cancelled.wait(1.0))
+        # The loser stopped decoding instead of running its full delay
+        deadline = time.monotonic() + 1.0
+        while self.slow.finish_time is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertIsNotNone(self.slow.finish_time)
+        self.assertLess(self.slow.finish_time, 1.0)
+
+        stats = self.race.stats()['backends']
+        self.assertEqual(stats['fast']['wins'], 1)
+        self.assertEqual(stats['slow']['cancelled'], 1)
+        # The cut-short decode is not counted as a latency sample
+        self.assertEqual(stats['slow']['completed'], 0)
+
+    def test_timeout_cancels_every_session(self):
+        self.fast.confidence = 0.5
+        race = RacingBackend([self.fast, self.slow], timeout=0.2)
+        try:
+            result = race.recognize(b"\x00\x00" * 160)
+        finally:
+            race.shutdown()
+
+        # Nothing confident: the best result so far is returned
+        self.assertEqual(result.confidence, 0.5)
+        self.assertTrue(self.slow.sessions[0].cancelled.is_set())
+        self.assertEqual(race.stats()['backends']['slow']['timeouts'], 1)
+
+    def test_stuck_backend_cannot_take_every_worker(self):
+        stuck = StuckBackend("stuck")
+        race = RacingBackend([self.fast, stuck], timeout=2.0,
+                             max_in_flight=2)
+        try:
+            for _ in range(5):
+                result = race.recognize(b"\x00\x00" * 160)
+                self.assertEqual(result.text, "open youtube")
+            stats = race.stats()['backends']
+            self.assertEqual(stats['stuck']['in_flight'], 2)
+            self.assertEqual(stats['stuck']['skipped'], 3)
+            self.assertEqual(stats['fast']['wins'], 5)
+        finally:
+            stuck.release.set()
+            race.shutdown()
+
+        deadline = time.monotonic() + 1.0
+        while race.stats()['backends']['stuck']['in_flight'] and \
+                time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(race.stats()['backends']['stuck']['in_flight'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
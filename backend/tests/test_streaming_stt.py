@@ -0,0 +1,127 @@
+import http.server
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+import zlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                ".."))
+
+from modules.streaming_stt import StreamingHttpBackend
+
+
+class RecognitionHandler(http.server.BaseHTTPRequestHandler):
+    """Stand-in recognition server: inflates the chunked upload and
+    answers with the number of PCM bytes it received"""
+
+    protocol_version = "HTTP/1.1"   # keep-alive
+
+    def do_POST(self):
+        server = self.server
+        server.requests.append({
+            'client': self.client_address,
+            'chunked': self.headers.get("Transfer-Encoding") == "chunked",
+            'encoding': self.headers.get("Content-Encoding"),
+        })
+        try:
+            pcm = zlib.decompress(self._read_chunked())
+        except (OSError, ValueError, zlib.error):
+            server.truncated += 1
+            self.close_connection = True
+            return
+        body = json.dumps({"text": f"{len(pcm)} bytes",
+                           "confidence": 0.9}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_chunked(self):
+        data = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                raise ValueError("connection closed mid-request")
+            size = int(line.split(b";")[0], 16)
+            chunk = self.rfile.read(size + 2)
+            if len(chunk) < size + 2:
+                raise ValueError("connection closed mid-chunk")
+            if size == 0:
+                return b"".join(data)
+            data.append(chunk[:-2])
+
+    def log_message(self, *args):
+        pass
+
+
+class StreamingHttpBackendTests(unittest.TestCase):
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0),
+                                                      RecognitionHandler)
+        self.server.daemon_threads = True
+        self.server.requests = []
+        self.server.truncated = 0
+        threading.Thread(target=self.server.serve_forever,
+                         daemon=True).start()
+        host, port = self.server.server_address
+        self.backend = StreamingHttpBackend(
+            f"http://{host}:{port}/recognize", timeout=5.0)
+
+    def tearDown(self):
+        self.backend.pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def stream(self, chunks):
+        session = self.backend.start_session()
+        for chunk in chunks:
+            session.accept(chunk)
+        return session.finish()
+
+    def test_chunked_deflate_upload(self):
+        chunks = [bytes([i]) * 640 for i in range(50)]
+        result = self.stream(chunks)
+
+        self.assertEqual(result.text, "32000 bytes")
+        self.assertEqual(result.backend, "http-stream")
+        request = self.server.requests[0]
+        self.assertTrue(request['chunked'])
+        self.assertEqual(request['encoding'], "deflate")
+        stats = self.backend.stats()
+        self.assertEqual(stats['bytes_raw'], 32000)
+        self.assertLess(stats['bytes_sent'], stats['bytes_raw'])
+
+    def test_connection_is_reused(self):
+        for _ in range(3):
+            self.assertEqual(self.stream([b"\x00" * 640]).text, "640 bytes")
+
+        stats = self.backend.stats()
+        self.assertEqual(stats['connections_created'], 1)
+        self.assertEqual(stats['connections_reused'], 2)
+        clients = {request['client'] for request in self.server.requests}
+        self.assertEqual(len(clients), 1)
+
+    def test_cancel_then_next_session(self):
+        session = self.backend.start_session()
+        session.accept(b"\x00" * 640)
+        deadline = time.monotonic() + 2.0
+        while not self.server.requests and time.monotonic() < deadline:
+            time.sleep(0.01)
+        session.cancel()
+
+        # The cancelled request is never answered, and its connection is
+        # not handed to the next session
+        self.assertEqual(self.stream([b"\x01" * 1280]).text, "1280 bytes")
+        deadline = time.monotonic() + 2.0
+        while not self.server.truncated and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.server.truncated, 1)
+        self.assertEqual(len(self.server.requests), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import collections
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+import wave
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                ".."))
+
+from modules.tts import SpeechWorker
+from modules.tts_cache import PhraseCache
+
+RATE = 16000
+
+
+class SapiLikeEngine:
+    """Stand-in for pyttsx3's SAPI5 driver: iterate() runs a queued
+    command to the end, and save_to_file() never fires finished-utterance"""
+
+    def __init__(self, speak_s=0.05, render_s=0.05, writes=True):
+        self.speak_s = speak_s
+        self.render_s = render_s
+        self.writes = writes        # False: a render that never completes
+        self.stops = 0
+        self._queue = collections.deque()
+        self._callbacks = collections.defaultdict(list)
+
+    def connect(self, topic, callback):
+        self._callbacks[topic].append(callback)
+
+    def startLoop(self, use_driver_loop=True):
+        pass
+
+    def endLoop(self):
+        pass
+
+    def getProperty(self, name):
+        return {'voice': "stand-in", 'rate': 200, 'volume': 1.0}[name]
+
+    def say(self, text, name=None):
+        self._queue.append(("say", text, name, None))
+
+    def save_to_file(self, text, path, name=None):
+        self._queue.append(("save", text, name, path))
+
+    def stop(self):
+        self.stops += 1
+        self._queue.clear()
+
+    def iterate(self):
+        if not self._queue:
+            return
+        kind, text, name, path = self._queue.popleft()
+        if kind == "say":
+            for callback in self._callbacks['started-utterance']:
+                callback(name)
+            time.sleep(self.speak_s)
+            for callback in self._callbacks['finished-utterance']:
+                callback(name, True)
+        elif self.writes:
+            time.sleep(self.render_s)
+            with wave.open(path, "wb") as f:
+                f.setnchannels(1)
+                f.setsampwidth(2)
+                f.setframerate(22050)
+                f.writeframes(b"\x10\x00" * (2205 * len(text.split())))
+        else:
+            self._queue.append((kind, text, name, path))
+
+
+class StandInPlayer:
+    rate = RATE
+
+    def __init__(self):
+        self.played = []
+
+    def play(self, pcm, should_stop=None, on_start=None):
+        if on_start:
+            on_start()
+        self.played.append(pcm)
+        return True
+
+    def stats(self):
+        return {}
+
+
+class SpeechWorkerTests(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = PhraseCache(cache_dir=self.cache_dir, rate=RATE)
+        self.player = StandInPlayer()
+        self.engine = SapiLikeEngine()
+        self.worker = None
+
+    def tearDown(self):
+        if self.worker is not None:
+            self.worker.stop()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def start(self, **kwargs):
+        self.worker = SpeechWorker(engine_factory=lambda: self.engine,
+                                   cache=self.cache, player=self.player,
+                                   **kwargs)
+        self.worker.start()
+
+    def wait_until(self, condition, timeout=3.0):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return condition()
+
+    def test_streamed_reply_completes(self):
+        self.start()
+        request = self.worker.say("First sentence here. And a second one.")
+
+        self.assertTrue(request.wait(3.0))
+        self.assertEqual(request.outcome, "spoken")
+        self.assertEqual(len(self.player.played), 2)
+        stats = self.cache.stats()
+        self.assertEqual(stats['renders'], 2)
+        # One lookup for the reply; its chunks are counted as segments
+        self.assertEqual((stats['hits'], stats['misses']), (0, 1))
+        self.assertEqual(stats['segment_misses'], 2)
+
+    def test_prerender_fills_the_cache(self):
+        self.start()
+        self.worker.prerender(["okay", "done"])
+
+        self.assertTrue(self.wait_until(
+            lambda: self.cache.stats()['renders'] == 2))
+        self.assertIn("okay", self.cache)
+        request = self.worker.say("okay")
+        self.assertTrue(request.wait(3.0))
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_only_repeated_replies_are_rendered(self):
+        self.start()
+        for text in ("just once", "twice", "twice"):
+            self.worker.say(text).wait(3.0)
+
+        self.assertTrue(self.wait_until(lambda: "twice" in self.cache))
+        self.assertNotIn("just once", self.cache)
+
+    def test_render_timeout(self):
+        self.engine.writes = False
+        self.start(render_timeout=0.2)
+        request = self.worker.say("Never rendered. Not this either.")
+
+        self.assertTrue(request.wait(3.0))
+        self.assertEqual(request.outcome, "failed")
+        self.assertEqual(self.worker.stats()['render_timeouts'], 1)
+        self.assertGreaterEqual(self.engine.stops, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
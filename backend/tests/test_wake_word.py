@@ -0,0 +1,55 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                ".."))
+
+from modules.audio_capture import AudioRingBuffer
+from modules.wake_word import WakeWordDetector
+
+RATE = 16000
+CHUNK = 1024
+
+
+class SilentSpotter:
+    """Never hears the wake word"""
+
+    kind = "stand-in"
+    last_score = None
+
+    def process(self, chunk):
+        return None
+
+    def reset(self):
+        pass
+
+
+class StandInMicrophone:
+    is_running = True
+
+    def __init__(self, chunks):
+        self.ring = AudioRingBuffer(64)
+        for chunk in chunks:
+            self.ring.put(chunk)
+
+
+class WakeWordDetectorTests(unittest.TestCase):
+    def test_stop_leaves_the_rest_in_the_ring(self):
+        chunks = [bytes([i]) * CHUNK * 2 for i in range(5)]
+        microphone = StandInMicrophone(chunks)
+        detector = WakeWordDetector(SilentSpotter(), rate=RATE)
+
+        carry = detector.wait(microphone, timeout=2.0,
+                              stop=lambda: detector.chunks == 2)
+        self.assertIsNone(carry)
+        self.assertEqual(len(microphone.ring), 3)
+        # What the spotter read can be handed on to the recognizer
+        self.assertEqual(detector.recent(2 * CHUNK / RATE),
+                         chunks[0] + chunks[1])
+        self.assertEqual(detector.recent(CHUNK / RATE), chunks[1])
+        self.assertEqual(detector.recent(0), b"")
+
+
+if __name__ == '__main__':
+    unittest.main()
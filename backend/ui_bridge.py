@@ -1,11 +1,71 @@
 """
 UI Bridge - Connects Frontend to Backend (FIXED)
 """
+import collections
+import os
+import re
 import threading
-import speech_recognition as sr
-import pyttsx3
-from modules.command_handler import handle_command
+import time
+from modules.command_handler import (handle_command, command_grammar,
+                                     match_command, response_templates,
+                                     EarlyDispatcher)
 from modules.get_time_date import get_time, get_date
+from modules.audio_capture import MicrophoneStream
+from modules.noise_floor import NoiseFloorTracker
+from modules.vad import VADSegmenter, capture_utterance
+from modules.recognition_race import LatencyHistogram, load_racing_backend
+from modules.recognition_cache import CachedRecognizer
+from modules.wake_word import load_wake_detector
+from modules.tts import SpeechWorker, PRIORITY_NORMAL, PRIORITY_URGENT
+from modules.tts_cache import PhraseCache
+from modules.tts_templates import load_templates, prerender_phrases
+from modules.audio_player import AudioPlayer
+from modules.barge_in import BargeInDetector
+from modules.model_pool import registry
+
+WAKE_PHRASES = ["eva", "hey eva"]
+# Longest phrase first, so "hey eva" is stripped as a whole
+WAKE_PATTERN = re.compile(r"\b(?:%s)\b" % "|".join(
+    re.escape(p) for p in sorted(WAKE_PHRASES, key=len, reverse=True)))
+# Seconds to wait for the command to continue after the wake word
+# before asking for it with a follow-up listen
+SINGLE_PASS_TIMEOUT = 1.0
+# Backends decoded in parallel; the first confident result wins.
+# "http-stream" is used when EVA_STT_STREAM_URL points at a server.
+# Google gets every utterance, so it only joins when EVA_STT_GOOGLE=1.
+STT_BACKENDS = ("vosk", "http-stream") + \
+    (("google",) if os.environ.get("EVA_STT_GOOGLE") == "1" else ())
+# Transcripts of recently heard utterances kept for reuse (0 disables)
+RECOGNITION_CACHE_SIZE = 256
+# Rendered once so they play instantly the first time they are needed
+# (command responses are added from the registry)
+PRERENDERED_PHRASES = ["Yes, I'm listening"]
+# Longest speak(wait=True) blocks for, so a stuck TTS engine cannot hang
+# the listening loop
+SPEAK_WAIT_TIMEOUT = 20.0
+
+# text: the command with the wake phrase stripped
+# mode: "single_pass" (said together with the wake word), "follow_up"
+#     or "barge_in" (said over EVA's speech, wake word optional)
+# wake_time: time.monotonic() when the wake word was heard (the user
+#     started talking, for barge_in)
+# response: set if the command was already run from a partial transcript
+WakeCommand = collections.namedtuple("WakeCommand",
+                                     "text mode wake_time response")
+SINGLE_PASS = "single_pass"
+FOLLOW_UP = "follow_up"
+BARGE_IN = "barge_in"
+
+
+def strip_wake_phrase(text):
+    """
+    Returns:
+        str: what follows the first wake phrase in ``text`` (all of
+        ``text`` if it has none)
+    """
+    parts = WAKE_PATTERN.split(text.lower(), maxsplit=1)
+    return parts[-1].strip(" ,.!?")
+
 
 class EVABridge:
     """Bridge between Web UI and EVA backend"""
@@ -13,78 +73,359 @@ class EVABridge:
     def __init__(self):
         print("🔧 Initializing EVA Bridge...")
         
-        # Initialize TTS engine
-        try:
-            self.engine = pyttsx3.init()
-            self.configure_voice()
-            print("✅ TTS Engine initialized")
-        except Exception as e:
-            print(f"❌ TTS Error: {e}")
-            self.engine = None
+        # One worker thread owns the TTS engine and speaks from a
+        # priority queue; repeated phrases and the registered responses
+        # (time, date... spliced from segments) play from rendered audio
+        phrase_cache, player = self._load_phrase_cache()
+        templates = response_templates()
+        self.tts = SpeechWorker(configure=self.configure_voice,
+                                cache=phrase_cache, player=player,
+                                templates=load_templates(templates))
+        self.tts.start()
+        self.tts.prerender(PRERENDERED_PHRASES +
+                           prerender_phrases(templates))
         
-        # Initialize speech recognizer
-        self.recognizer = sr.Recognizer()
-        self.recognizer.energy_threshold = 4000  # Adjust for sensitivity
-        self.recognizer.dynamic_energy_threshold = True
+        # Load the speech backends once (offline Vosk, raced against any
+        # opted-in server), decoding against the wake word + registered
+        # commands by default
+        self.stt = load_racing_backend(
+            STT_BACKENDS, grammar=WAKE_PHRASES + command_grammar())
+        if self.stt is not None and RECOGNITION_CACHE_SIZE:
+            self.stt = CachedRecognizer(self.stt, RECOGNITION_CACHE_SIZE)
+        # Optional callback(text) for partial transcripts while speaking
+        self.on_partial = None
+        # Optional callback() when the wake word is heard
+        self.on_wake_word = None
+        # Wake word -> response ready, per WakeCommand mode
+        self.response_latency = {SINGLE_PASS: LatencyHistogram(),
+                                 FOLLOW_UP: LatencyHistogram(),
+                                 BARGE_IN: LatencyHistogram()}
+        # Commands run from stable partials; their response is held until
+        # the final transcript confirms it (see _wake_command)
+        self.early_dispatcher = EarlyDispatcher(run=self.process_command)
         print("✅ Speech Recognizer initialized")
+        
+        # Keep one microphone stream open for the whole session
+        self.microphone = MicrophoneStream()
+        self.noise_floor = NoiseFloorTracker()
+        self.microphone.add_listener(self.noise_floor.update)
+        # Utterance boundaries come from the VAD, not recognizer.listen()
+        self.vad = VADSegmenter(self.noise_floor, max_utterance_s=5)
+        # Always-on keyword spotter; only audio after "eva" is recognized
+        self.wake_detector = load_wake_detector(
+            WAKE_PHRASES, noise_floor=self.noise_floor)
+        # Full duplex: speech over EVA's own voice stops playback, and the
+        # user's utterance is recognized as the next command
+        self.barge_in = None
+        self._barged_in = threading.Event()
+        if self.tts.player is not None:
+            self.barge_in = BargeInDetector(self.noise_floor,
+                                            on_barge_in=self._on_barge_in)
+            self.tts.player.add_listener(self.barge_in.reference)
+            self.tts.player.on_stopped = self.barge_in.playback_stopped
+            self.microphone.add_listener(self.barge_in.process)
+            self.tts.render_all = True
+        self.start_microphone()
     
-    def configure_voice(self):
-        """Configure TTS settings"""
+    def start_microphone(self):
+        """Open the persistent capture stream (no-op if already running)"""
         try:
-            if self.engine:
-                voices = self.engine.getProperty('voices')
-                if len(voices) > 1:
-                    self.engine.setProperty('voice', voices[1].id)  # Female
-                self.engine.setProperty('rate', 175)
-                self.engine.setProperty('volume', 1.0)
+            self.microphone.start()
+            print("✅ Microphone stream started")
+            return True
         except Exception as e:
-            print(f"Voice config error: {e}")
+            print(f"❌ Microphone Error: {e}")
+            return False
     
-    def speak(self, text):
-        """Text to speech"""
+    def _load_phrase_cache(self):
+        """
+        Returns:
+            tuple: (PhraseCache, AudioPlayer), or (None, None) if the
+            output device or the cache directory is unavailable
+        """
         try:
-            if self.engine:
-                print(f"🔊 Speaking: {text}")
-                self.engine.say(text)
-                self.engine.runAndWait()
+            player = AudioPlayer()
+            player.start()
+            phrase_cache = PhraseCache()
+            print("✅ TTS phrase cache ready")
+            return phrase_cache, player
         except Exception as e:
-            print(f"Speak error: {e}")
+            print(f"⚠️ TTS phrase cache disabled: {e}")
+            return None, None
     
-    def listen(self):
-        """Listen for voice input - FIXED VERSION"""
+    def configure_voice(self, engine):
+        """Configure TTS settings (called on the TTS worker thread)"""
         try:
-            with sr.Microphone() as source:
-                print("🎤 Microphone active...")
-                
-                # Adjust for ambient noise
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.3)
-                
-                print("👂 Listening for speech...")
-                
-                # Listen with timeout
-                audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=5)
-                
-                print("🔄 Processing speech...")
-                
-                # Recognize speech using Google
-                try:
-                    text = self.recognizer.recognize_google(audio, language='en-US')
-                    print(f"✅ Recognized: {text}")
-                    return text.lower()
-                except sr.UnknownValueError:
-                    print("⚠️ Could not understand audio")
+            voices = engine.getProperty('voices')
+            if len(voices) > 1:
+                engine.setProperty('voice', voices[1].id)  # Female
+            engine.setProperty('rate', 175)
+            engine.setProperty('volume', 1.0)
+        except Exception as e:
+            print(f"Voice config error: {e}")
+    
+    def speak(self, text, priority=PRIORITY_NORMAL, wait=False, key=None):
+        """
+        Text to speech, queued on the TTS worker
+        
+        Args:
+            priority: PRIORITY_URGENT preempts anything less urgent
+            wait: block until the text was spoken (or dropped), for at
+                most SPEAK_WAIT_TIMEOUT seconds
+            key: a newer request with the same key replaces this one if
+                it has not started yet
+        
+        Returns:
+            SpeechRequest: the queued request
+        """
+        request = self.tts.say(text, priority, key=key)
+        if wait and not request.wait(SPEAK_WAIT_TIMEOUT):
+            print(f"⚠️ TTS still busy after {SPEAK_WAIT_TIMEOUT:g}s, "
+                  f"not waiting for: {text}")
+        return request
+    
+    def wait_for_wake_word(self, timeout=1.0):
+        """
+        Block until the keyword spotter hears the wake word
+
+        Returns:
+            bytes: PCM that followed the wake word, to pass to listen(),
+            or None on timeout or barge-in (always None without a spotter)
+        """
+        if self.wake_detector is None:
+            return None
+        if not self.microphone.is_running and not self.start_microphone():
+            return None
+        carry = self.wake_detector.wait(self.microphone, timeout,
+                                        stop=self._barged_in.is_set)
+        if carry is not None:
+            print("✅ Wake word detected")
+            if self.on_wake_word:
+                self.on_wake_word()
+        return carry
+    
+    def next_command(self, timeout=1.0):
+        """
+        Wait for the wake word and return the command that goes with it.
+        
+        "hey eva open youtube" in one breath is recognized in a single
+        pass; a follow-up listen (after "Yes, I'm listening") only happens
+        when nothing follows the wake word.
+        
+        With a keyword spotter, speech without the wake word is never
+        recognized, so commands need it, except when they are said over
+        EVA's speech (barge-in). Without one (no templates and no Vosk
+        model), a known command is also taken on its own.
+        
+        Returns:
+            WakeCommand: or None if no wake word / command was heard
+        """
+        if self.wake_detector is not None:
+            carry = self.wait_for_wake_word(timeout)
+            if carry is None:
+                if self._barged_in.is_set():
+                    return self._barge_in_command()
+                return None
+            wake_time = time.monotonic()
+            heard = self.listen(initial_audio=carry,
+                                timeout=SINGLE_PASS_TIMEOUT,
+                                dispatch_early=True)
+        else:
+            # No spotter: recognize whole utterances and look for the
+            # wake phrase in the text
+            wake_time = time.monotonic()
+            heard = self.listen(dispatch_early=True, wake_in_text=True)
+            if not heard:
+                return None
+            if not WAKE_PATTERN.search(heard):
+                # Everything is recognized anyway, so a known command
+                # still works without the wake word, as it always has
+                # (with a spotter, only audio after the wake word is)
+                if match_command(heard) is None:
+                    self.early_dispatcher.resolve(heard)
                     return None
-                except sr.RequestError as e:
-                    print(f"❌ Speech recognition error: {e}")
+                return self._wake_command(heard, SINGLE_PASS, wake_time)
+            if self.on_wake_word:
+                self.on_wake_word()
+        
+        command = strip_wake_phrase(heard) if heard else ""
+        if command:
+            return self._wake_command(command, SINGLE_PASS, wake_time)
+        
+        # Only the wake word was said (an early dispatch was wrong):
+        # acknowledge and listen again. The
+        # acknowledgement is spoken to completion and dropped from the
+        # capture buffer so it is not recognized as the command (unless
+        # the user barged in, then the buffer holds the command).
+        self.early_dispatcher.resolve("")
+        ack = self.speak("Yes, I'm listening", PRIORITY_URGENT, wait=True)
+        if ack.outcome != "preempted":
+            self.microphone.ring.clear()
+            self.vad.reset()
+        command = self.listen(dispatch_early=True)
+        if not command:
+            return None
+        command = strip_wake_phrase(command)
+        return self._wake_command(command, FOLLOW_UP, wake_time)
+    
+    def _on_barge_in(self):
+        """
+        The user talked over EVA (capture thread): stop the speech, and
+        with a spotter take what they say as the next command
+        """
+        interrupted = self.tts.interrupt()
+        if interrupted and self.wake_detector is not None:
+            self._barged_in.set()
+        return interrupted
+    
+    def _barge_in_command(self):
+        """
+        Recognize what the user said over EVA's speech, wake word or not.
+        The spotter has already read its start from the capture buffer;
+        that is passed on to listen() ahead of the rest.
+        
+        Returns:
+            WakeCommand: or None if nothing was understood
+        """
+        onset = self.barge_in.last_onset
+        preroll = self.microphone.chunk / self.microphone.rate
+        initial_audio = self.wake_detector.recent(
+            time.monotonic() - onset + preroll)
+        print("✋ Listening to the barge-in")
+        heard = self.listen(initial_audio=initial_audio,
+                            timeout=SINGLE_PASS_TIMEOUT, dispatch_early=True)
+        command = strip_wake_phrase(heard) if heard else ""
+        if not command:
+            self.early_dispatcher.resolve("")
+            return None
+        return self._wake_command(command, BARGE_IN, onset)
+    
+    def _wake_command(self, command, mode, wake_time):
+        """
+        WakeCommand with the early response, if it stands; its latency is
+        recorded here, otherwise by the caller once the command is
+        answered (so each command is counted once)
+        """
+        response = self.early_dispatcher.resolve(command)
+        wake_command = WakeCommand(command, mode, wake_time, response)
+        if response is not None:
+            self.record_response(wake_command,
+                                 self.early_dispatcher.answered_at)
+        return wake_command
+    
+    def record_response(self, wake_command, answered_at=None):
+        """
+        Record wake-to-response latency once a command was answered (at
+        ``answered_at``, default now)
+        """
+        answered_at = answered_at or time.monotonic()
+        latency = answered_at - wake_command.wake_time
+        self.response_latency[wake_command.mode].record(latency)
+        print(f"⏱️ Wake-to-response: {latency * 1000:.0f} ms "
+              f"({wake_command.mode})")
+    
+    def listen(self, initial_audio=b"", timeout=5, dispatch_early=False,
+               wake_in_text=False):
+        """
+        Listen for voice input from the persistent microphone stream
+        
+        ``initial_audio`` is PCM already read from the stream (what
+        followed the wake word, or the start of a barge-in); it is
+        recognized first. ``timeout`` is
+        how long to wait for speech to start. With ``dispatch_early``,
+        partials are passed to the EarlyDispatcher (only once they
+        contain the wake phrase if ``wake_in_text``); check its result
+        with early_dispatcher.resolve(). Without a final transcript an
+        early dispatch is resolved (dropped) here.
+        """
+        # This reads whatever a barge-in left in the capture buffer
+        self._barged_in.clear()
+        text = self._listen(initial_audio, timeout, dispatch_early,
+                            wake_in_text)
+        if dispatch_early and not text:
+            self.early_dispatcher.resolve("")
+        return text
+    
+    def _listen(self, initial_audio, timeout, dispatch_early, wake_in_text):
+        try:
+            if not self.microphone.is_running and not self.start_microphone():
+                return None
+            
+            if self.stt is None:
+                print("❌ No speech recognition backend available")
+                return None
+            
+            print("👂 Listening for speech...")
+            
+            # Decode while the user speaks; the VAD ends the phrase
+            session = self.stt.start_session()
+            last_partial = [""]
+            self.early_dispatcher.start()
+            
+            def on_event(event):
+                if not event.audio:
+                    return
+                result = session.accept(event.audio)
+                if not result or not result.text:
+                    return
+                if result.text != last_partial[0]:
+                    last_partial[0] = result.text
+                    if self.on_partial:
+                        self.on_partial(result.text)
+                if dispatch_early and (not wake_in_text or
+                                       WAKE_PATTERN.search(result.text)):
+                    self.early_dispatcher.partial(
+                        strip_wake_phrase(result.text))
+            
+            try:
+                pcm = capture_utterance(self.microphone, self.vad,
+                                        timeout=timeout, on_event=on_event,
+                                        initial_audio=initial_audio)
+                if pcm is None:
+                    print("⏱️ Listening timeout")
                     return None
+                print("🔄 Processing speech...")
+                result, session = session.finish(), None
+            finally:
+                # Hand a pooled decoder back when nothing was decoded
+                if session is not None:
+                    session.cancel()
+            
+            if not result.text:
+                print("⚠️ Could not understand audio")
+                return None
+            
+            print(f"✅ Recognized: {result.text} "
+                  f"({result.backend}, {result.latency * 1000:.0f} ms)")
+            return result.text.lower()
                 
-        except sr.WaitTimeoutError:
-            print("⏱️ Listening timeout")
-            return None
         except Exception as e:
             print(f"❌ Listen error: {e}")
             return None
     
+    def audio_stats(self):
+        """Capture, noise-floor and recognition metrics for monitoring"""
+        return {
+            'capture': {
+                'running': self.microphone.is_running,
+                'chunks_captured': self.microphone.chunks_captured,
+                'buffered_chunks': len(self.microphone.ring),
+                'dropped_chunks': self.microphone.ring.dropped,
+                'driver': self.microphone.driver_stats(),
+            },
+            'noise_floor': self.noise_floor.stats(),
+            'models': registry.stats(),
+            'recognition': self.stt.stats()
+            if hasattr(self.stt, 'stats') else None,
+            'wake_word': self.wake_detector.stats()
+            if self.wake_detector else None,
+            'wake_to_response': {mode: hist.stats() for mode, hist
+                                 in self.response_latency.items()},
+            'early_dispatch': self.early_dispatcher.stats(),
+            'tts': self.tts.stats(),
+            'barge_in': self.barge_in.stats() if self.barge_in else None,
+        }
+    
     def process_command(self, command):
         """Process command through backend"""
         try: